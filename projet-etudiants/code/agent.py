@@ -0,0 +1,179 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import json
+import random
+import numpy as np
+from stats import SearchStats
+
+
+class Config:
+    """
+    Hyperparameters of an agent. Each agent has its own subclass listing its hyperparameters and their default values in
+        DEFAULTS (None for a value computed from the instance by the solver). A config can be built from keyword
+        arguments, a JSON file or 'name=value' strings given on the command line.
+    """
+
+    DEFAULTS = {}
+
+    def __init__(self, **values):
+        """
+        :param values: hyperparameters different from their default value
+        """
+        for name, value in self.DEFAULTS.items():
+            setattr(self, name, value)
+        self.update(**values)
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        :param path: JSON file with an object {hyperparameter: value}
+        :return: a config with the values of the file (default values for the other hyperparameters)
+        """
+        with open(path) as file:
+            values = json.load(file)
+        if not isinstance(values, dict):
+            raise Exception("%s must contain a JSON object {hyperparameter: value}" % path)
+        return cls(**values)
+
+    def update(self, **values):
+        """
+        Change the value of some hyperparameters
+        """
+        for name, value in values.items():
+            if name not in self.DEFAULTS:
+                raise Exception("Unknown hyperparameter %s, expected one of: %s" % (name, ", ".join(self.DEFAULTS)))
+            setattr(self, name, value)
+
+    def parse(self, assignments):
+        """
+        Change the value of some hyperparameters from the command line
+        :param assignments: list of 'name=value' strings, the value is read as JSON (e.g. 0.1, true, null) or kept as a string
+        """
+        for assignment in assignments:
+            name, separator, text = assignment.partition('=')
+            if not separator:
+                raise Exception("Hyperparameter %s must be given as name=value" % assignment)
+            try:
+                value = json.loads(text)
+            except ValueError:
+                value = text
+            self.update(**{name.strip(): value})
+
+    def to_dict(self):
+        """
+        :return: dictionary {hyperparameter: value}
+        """
+        return {name: getattr(self, name) for name in self.DEFAULTS}
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join("%s=%r" % item for item in self.to_dict().items()))
+
+
+class Agent:
+    """
+    Solver with a step by step interface, so an application can run the search at its own pace: setup() prepares the
+        search on an instance, each step() runs one iteration of the solver, best() gives the best solution found so far
+        and stats() the progress of the search. An agent only keeps its own state (the instance is shared, not copied),
+        so several agents can run side by side on the same instance: the states of the random generators are swapped
+        at each step.
+        A subclass is registered with registry.register() and implements iterate(), a generator running the search and
+        yielding (best solution, best cost) after each iteration.
+    """
+
+    CONFIG = Config
+    supportsCheckpoint = False # the search can start from a checkpoint and save its best solution (see Checkpoint)
+    islandSearch = None # function (eternity_puzzle, seed, migration) run by each island of the island model (see island.py)
+
+    def __init__(self, config=None):
+        """
+        :param config: hyperparameters of the agent (default values if None)
+        """
+        self.config = config if config is not None else self.CONFIG()
+        self.eternity_puzzle = None
+        self.search = None
+
+    def setup(self, eternity_puzzle, seed=1, stats=None, checkpoint=None):
+        """
+        Prepare the search, nothing is computed before the first step
+        :param eternity_puzzle: object describing the input
+        :param seed: seed of the random generators
+        :param stats: SearchStats recording the progress of the search (a new one if None)
+        :param checkpoint: Checkpoint hook (only if supportsCheckpoint)
+        """
+        if checkpoint is not None and not self.supportsCheckpoint:
+            raise Exception("The %s agent does not support checkpoints" % type(self).__name__)
+        self.eternity_puzzle = eternity_puzzle
+        self.searchStats = stats if stats is not None else SearchStats()
+        self.search = self.iterate(eternity_puzzle, seed, self.searchStats, checkpoint)
+        self.randomState = None # (random state, numpy random state) between 2 steps
+        self.bestSolution = None
+        self.bestScore = None
+        self.isFinished = False
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        """
+        Generator running the search, implemented by each agent
+        :return: yields (best solution, best cost) after each iteration and returns the final (solution, cost)
+        """
+        raise NotImplementedError
+
+    def step(self):
+        """
+        Run one iteration of the search
+        :return: True if the search can continue, False if it is finished (time limit, optimal solution, ...)
+        """
+        if self.search is None:
+            raise Exception("setup() must be called before step()")
+        if self.isFinished:
+            return False
+
+        # The random generators are global: this agent gets back its own states, whatever the other agents did
+        if self.randomState is not None:
+            random.setstate(self.randomState[0])
+            np.random.set_state(self.randomState[1])
+        try:
+            self.bestSolution, self.bestScore = next(self.search)
+        except StopIteration as stop:
+            self.bestSolution, self.bestScore = stop.value
+            self.isFinished = True
+        self.randomState = (random.getstate(), np.random.get_state())
+
+        return not self.isFinished
+
+    def best(self):
+        """
+        :return: a tuple (solution, cost) of the best solution found so far, (None, None) before the first step
+        """
+        if self.bestSolution is None:
+            return None, None
+        return list(self.bestSolution), self.bestScore
+
+    def stats(self):
+        """
+        :return: SearchStats of the search
+        """
+        return self.searchStats
+
+    def solve(self, eternity_puzzle, seed=1, stats=None, checkpoint=None):
+        """
+        Run the whole search (the random generators are not swapped, as in the solve_* functions)
+        :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
+            cost is the cost of the solution
+        """
+        self.setup(eternity_puzzle, seed, stats, checkpoint)
+        self.bestSolution, self.bestScore = run_search(self.search)
+        self.isFinished = True
+        return self.bestSolution, self.bestScore
+
+
+def run_search(search):
+    """
+    Run a search generator (see Agent.iterate) until the end
+    :return: the final (solution, cost) returned by the generator
+    """
+    while True:
+        try:
+            next(search)
+        except StopIteration as stop:
+            return stop.value
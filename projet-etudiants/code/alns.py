@@ -0,0 +1,104 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+
+
+class OperatorWeights:
+    """
+    Adaptive choice of the operators of an ALNS. An operator is chosen by roulette wheel (probability proportional to its
+        weight). Every `segmentLength` iterations, the weight of each operator used during the segment moves towards its
+        improvement per CPU second relative to the best operator of the segment:
+        weight = (1 - reactionFactor) * weight + reactionFactor * relative performance
+        The weights never go below `minWeight`, so an operator that stopped working is still tried from time to time.
+    """
+
+    def __init__(self, names, reactionFactor=0.2, segmentLength=25, minWeight=0.05):
+        """
+        :param names: names of the operators
+        :param reactionFactor: weight of the last segment in the update of the weights (0: fixed weights)
+        :param segmentLength: number of iterations between two updates of the weights
+        :param minWeight: minimum weight of an operator
+        """
+        self.names = list(names)
+        self.reactionFactor = reactionFactor
+        self.segmentLength = segmentLength
+        self.minWeight = minWeight
+        self.weights = {name: 1. for name in self.names}
+        # Statistics of the whole search
+        self.calls = {name: 0 for name in self.names}
+        self.improvements = {name: 0 for name in self.names} # number of iterations improving the solution
+        self.gains = {name: 0 for name in self.names} # number of conflicts removed
+        self.seconds = {name: 0. for name in self.names} # CPU seconds
+        # Statistics of the current segment
+        self.nbRecorded = 0
+        self.segmentGains = {}
+        self.segmentSeconds = {}
+
+    @classmethod
+    def merge(cls, operatorWeights):
+        """
+        :param operatorWeights: OperatorWeights of several searches with the same operators (e.g. the workers of a pool)
+        :return: OperatorWeights with the statistics of all the searches summed and the mean weight of each operator
+        """
+        merged = cls(operatorWeights[0].names)
+        for name in merged.names:
+            merged.weights[name] = sum(weights.weights[name] for weights in operatorWeights) / len(operatorWeights)
+            merged.calls[name] = sum(weights.calls[name] for weights in operatorWeights)
+            merged.improvements[name] = sum(weights.improvements[name] for weights in operatorWeights)
+            merged.gains[name] = sum(weights.gains[name] for weights in operatorWeights)
+            merged.seconds[name] = sum(weights.seconds[name] for weights in operatorWeights)
+        return merged
+
+    def choose(self):
+        """
+        :return: name of an operator chosen by roulette wheel
+        """
+        return random.choices(self.names, weights=[self.weights[name] for name in self.names])[0]
+
+    def record(self, name, gain, seconds):
+        """
+        Record an iteration of the operator `name` (the weights are updated at the end of each segment)
+        :param gain: number of conflicts removed by the iteration (0 if the solution was not improved)
+        :param seconds: CPU seconds of the iteration
+        """
+        self.calls[name] += 1
+        self.gains[name] += gain
+        self.seconds[name] += seconds
+        if gain > 0:
+            self.improvements[name] += 1
+        self.segmentGains[name] = self.segmentGains.get(name, 0) + gain
+        self.segmentSeconds[name] = self.segmentSeconds.get(name, 0.) + seconds
+
+        self.nbRecorded += 1
+        if self.nbRecorded % self.segmentLength == 0:
+            self.update()
+
+    def update(self):
+        """
+        Update the weights of the operators used during the segment and start a new segment
+        """
+        performances = {name: gain / max(self.segmentSeconds[name], 1e-9) for name, gain in self.segmentGains.items()}
+        bestPerformance = max(performances.values(), default=0.)
+        for name, performance in performances.items():
+            relative = performance / bestPerformance if bestPerformance > 0 else 0.
+            self.weights[name] = max(self.minWeight, (1 - self.reactionFactor) * self.weights[name]
+                                     + self.reactionFactor * relative)
+        self.segmentGains = {}
+        self.segmentSeconds = {}
+
+    def summary(self):
+        """
+        :return: dictionary {operator: {weight, calls, improvements, gain, seconds}} for the telemetry
+        """
+        return {name: {'weight': round(self.weights[name], 3), 'calls': self.calls[name],
+                       'improvements': self.improvements[name], 'gain': self.gains[name],
+                       'seconds': round(self.seconds[name], 3)} for name in self.names}
+
+    def report(self):
+        """
+        :return: one line per operator describing its statistics, for the log of the search
+        """
+        return ["%-12s weight %.3f, %d calls, %d improvements, %d conflicts removed, %.1f CPU s (%.2f conflicts / CPU s)" %
+                (name, self.weights[name], self.calls[name], self.improvements[name], self.gains[name], self.seconds[name],
+                 self.gains[name] / max(self.seconds[name], 1e-9)) for name in self.names]
@@ -0,0 +1,96 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as scipy_linear_sum_assignment
+except ImportError: # scipy is optional, the pure Python Hungarian algorithm is used instead
+    scipy_linear_sum_assignment = None
+
+
+def hungarian(cost):
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials, O(n^3)), used when scipy is not installed
+    :param cost: matrix (n, n) of costs, as nested lists
+    :return: list `assigned` where assigned[row] is the column of `row` in an assignment of minimum cost
+    """
+    n = len(cost)
+    infinity = float('inf')
+    u = [0] * (n + 1) # potentials of the rows
+    v = [0] * (n + 1) # potentials of the columns
+    rowOf = [0] * (n + 1) # rowOf[column]: row (1-indexed) assigned to the column, 0 if free
+    previous = [0] * (n + 1)
+
+    for row in range(1, n + 1):
+        rowOf[0] = row
+        column = 0
+        minSlack = [infinity] * (n + 1)
+        used = [False] * (n + 1)
+        # Shortest augmenting path from `row` to a free column
+        while rowOf[column] != 0:
+            used[column] = True
+            currentRow = rowOf[column]
+            delta = infinity
+            nextColumn = 0
+            costRow = cost[currentRow - 1]
+            for j in range(1, n + 1):
+                if not used[j]:
+                    slack = costRow[j - 1] - u[currentRow] - v[j]
+                    if slack < minSlack[j]:
+                        minSlack[j] = slack
+                        previous[j] = column
+                    if minSlack[j] < delta:
+                        delta = minSlack[j]
+                        nextColumn = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[rowOf[j]] += delta
+                    v[j] -= delta
+                else:
+                    minSlack[j] -= delta
+            column = nextColumn
+        # Augment along the path
+        while column != 0:
+            previousColumn = previous[column]
+            rowOf[column] = rowOf[previousColumn]
+            column = previousColumn
+
+    assigned = [0] * n
+    for column in range(1, n + 1):
+        if rowOf[column] != 0:
+            assigned[rowOf[column] - 1] = column - 1
+    return assigned
+
+
+def solve_assignment(cost):
+    """
+    :param cost: array (n, n) of costs
+    :return: array `assigned` where assigned[row] is the column of `row` in an assignment of minimum cost
+        (scipy.optimize.linear_sum_assignment if scipy is installed, hungarian() otherwise)
+    """
+    cost = np.asarray(cost)
+    if scipy_linear_sum_assignment is not None:
+        _, assigned = scipy_linear_sum_assignment(cost)
+        return assigned
+    return np.array(hungarian(cost.tolist()), dtype=np.int64)
+
+
+def get_placement_costs(eternity_puzzle, cells, pieces, solution):
+    """
+    Cost of each piece at each cell when the neighbours of the cells are fixed (the cells must be pairwise non-adjacent,
+        so the cost of a placement does not depend on the other placements)
+    :param eternity_puzzle: object describing the input
+    :param cells: list of the positions to fill
+    :param pieces: list of the pieces (any rotation) to place, as many as `cells`
+    :param solution: current solution, the cells are ignored
+    :return: a tuple (costs, rotations, placed) where costs[c, p] is the minimum number of conflicts of the piece `p` at
+        cells[c] over its rotations, rotations[c, p] the rotation reaching it (see generate_rotation) and
+        placed[p, r] the colors of the piece `p` after `r` turns
+    """
+    placed = np.array([eternity_puzzle.generate_rotation(piece) for piece in pieces], dtype=np.int16) # (piece, rotation, side)
+    facing = np.array([eternity_puzzle.get_facing_colors(k, solution) for k in cells], dtype=np.int16) # (cell, side)
+    conflicts = (placed[None, :, :, :] != facing[:, None, None, :]).sum(axis=3) # (cell, piece, rotation)
+    rotations = conflicts.argmin(axis=2)
+    costs = np.take_along_axis(conflicts, rotations[:, :, None], axis=2)[:, :, 0]
+    return costs, rotations, placed
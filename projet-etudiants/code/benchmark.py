@@ -0,0 +1,221 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import argparse
+import contextlib
+import csv
+import datetime
+import glob
+import io
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import eternity_puzzle
+import registry
+from stats import SearchStats
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+AGENTS = registry.get_agent_names()
+
+CSV_FIELDS = ['commit', 'instance', 'agent', 'seed', 'time_limit', 'n_conflict', 'feasible', 'valid', 'time_to_first',
+              'time_to_best', 'solving_time', 'n_evaluations', 'evaluations_per_sec', 'peak_memory_mb']
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Run the agents on the instances with several seeds and a fixed time budget")
+
+    parser.add_argument('--instances', type=str, nargs='+',
+                        default=sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instances', 'eternity_*.txt'))))
+    parser.add_argument('--agents', type=str, nargs='+', default=AGENTS, choices=AGENTS)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--time-limit', type=float, default=60., help="time budget of each run in seconds")
+    parser.add_argument('--targets', type=int, nargs='+', default=[0], help="number of conflicts for the time-to-target columns")
+    parser.add_argument('--jobs', type=int, default=1, help="number of runs in parallel (1 for comparable timings)")
+    parser.add_argument('--outfile', type=str, default='benchmark', help="prefix of the .csv and .json result files")
+    parser.add_argument('--verbose', action='store_true', help="keep the output of the agents")
+
+    return parser.parse_args()
+
+
+def get_commit():
+    """
+    :return: hash of the current git commit (with a "-dirty" suffix if the tree has uncommitted changes), None outside of git
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=directory, capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + '-dirty' if status else commit
+
+
+def get_peak_memory():
+    """
+    :return: peak resident memory of the current process in MB, None if it is not available
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return maxrss / 1024 ** 2 if sys.platform == 'darwin' else maxrss / 1024
+
+
+def time_to_target(trajectory, target):
+    """
+    :param trajectory: list of (elapsed seconds, best score) (see SearchStats)
+    :param target: number of conflicts to reach
+    :return: number of seconds to reach a score <= `target`, None if it has not been reached
+    """
+    for elapsed, score in trajectory:
+        if score <= target:
+            return elapsed
+    return None
+
+
+def run_agent(e, agent, seed, timeLimit, stats):
+    """
+    Run `agent` on the instance with a time budget
+    :param e: object describing the input
+    :param agent: name of the agent (see AGENTS)
+    :param seed: seed of the random generator
+    :param timeLimit: time budget in seconds
+    :param stats: SearchStats filled by the agent
+    :return: a tuple (solution, cost)
+    """
+    config = registry.get_agent(agent).CONFIG()
+    if 'timeLimit' in config.DEFAULTS:
+        config.update(timeLimit=timeLimit)
+    if 'nbTrial' in config.DEFAULTS:
+        # As many random trials as possible in the time budget
+        config.update(nbTrial=10 ** 12)
+    return registry.create_agent(agent, config).solve(e, seed, stats)
+
+
+def run_benchmark(instance, agent, seed, timeLimit, targets, verbose):
+    """
+    One run of the benchmark, executed in its own process so that the peak memory only depends on this run
+    :param instance: path of the instance file
+    :param agent: name of the agent (see AGENTS)
+    :param seed: seed of the random generator
+    :param timeLimit: time budget in seconds
+    :param targets: numbers of conflicts for the time-to-target columns
+    :param verbose: keep the output of the agent
+    :return: dictionary with the results of the run (see CSV_FIELDS) and the trajectory of the best score
+    """
+    e = eternity_puzzle.EternityPuzzle(instance)
+
+    stats = SearchStats()
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        solution, n_conflict = run_agent(e, agent, seed, timeLimit, stats)
+    solvingTime = stats.elapsed()
+    stats.improve(n_conflict)
+
+    result = {
+        'instance': os.path.basename(instance),
+        'agent': agent,
+        'seed': seed,
+        'time_limit': timeLimit,
+        'n_conflict': n_conflict,
+        'feasible': n_conflict == 0,
+        'valid': e.verify_solution(solution),
+        'time_to_first': stats.trajectory[0][0],
+        'time_to_best': stats.trajectory[-1][0],
+        'solving_time': solvingTime,
+        'n_evaluations': stats.nbEvaluations,
+        'evaluations_per_sec': stats.nbEvaluations / max(solvingTime, 1e-9),
+        'peak_memory_mb': get_peak_memory(),
+        'trajectory': stats.trajectory,
+    }
+    for target in targets:
+        result['time_to_target_%d' % target] = time_to_target(stats.trajectory, target)
+
+    return result
+
+
+def run_benchmark_star(args):
+    return run_benchmark(*args)
+
+
+def get_time_to_target_curves(results):
+    """
+    Time-to-target curves: for each instance, agent and number of conflicts reached by a run, the sorted times of the runs
+        to reach it (the runs that never reached it are not included, their number is the number of seeds minus the
+        length of the list)
+    :param results: list of the results of the runs (see run_benchmark)
+    :return: dictionary instance -> agent -> target -> sorted list of seconds
+    """
+    curves = {}
+    for result in results:
+        curve = curves.setdefault(result['instance'], {}).setdefault(result['agent'], {})
+        for _, score in result['trajectory']:
+            curve.setdefault(score, [])
+    for result in results:
+        curve = curves[result['instance']][result['agent']]
+        for target in curve:
+            elapsed = time_to_target(result['trajectory'], target)
+            if elapsed is not None:
+                curve[target].append(elapsed)
+    for agents in curves.values():
+        for agent, curve in agents.items():
+            agents[agent] = {target: sorted(curve[target]) for target in sorted(curve)}
+    return curves
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+
+    commit = get_commit()
+    runs = [(instance, agent, seed, args.time_limit, args.targets, args.verbose)
+            for instance in args.instances for agent in args.agents for seed in args.seeds]
+
+    print("***********************************************************")
+    print("[INFO] Start the benchmark of Eternity II")
+    print("[INFO] instances: %s" % ", ".join(os.path.basename(instance) for instance in args.instances))
+    print("[INFO] agents: %s" % ", ".join(args.agents))
+    print("[INFO] seeds: %s" % ", ".join(str(seed) for seed in args.seeds))
+    print("[INFO] time limit: %s seconds per run, %d runs, %d jobs" % (args.time_limit, len(runs), args.jobs))
+    print("[INFO] commit: %s" % commit)
+    print("***********************************************************")
+
+    start_time = time.time()
+
+    # A new process for each run: no state shared between the runs and a peak memory per run
+    results = []
+    with multiprocessing.get_context('spawn').Pool(args.jobs, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_benchmark_star, runs):
+            result['commit'] = commit
+            results.append(result)
+            print("[INFO] %s %s seed %d: %d conflicts (best after %.1f s), %d evaluations/sec, %.0f MB" %
+                  (result['instance'], result['agent'], result['seed'], result['n_conflict'], result['time_to_best'],
+                   result['evaluations_per_sec'], result['peak_memory_mb'] or 0))
+
+    ### RESULTS ###
+    targetFields = ['time_to_target_%d' % target for target in args.targets]
+    with open(args.outfile + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS + targetFields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+    with open(args.outfile + '.json', 'w') as f:
+        json.dump({
+            'commit': commit,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'time_limit': args.time_limit,
+            'seeds': args.seeds,
+            'runs': results,
+            'time_to_target': get_time_to_target_curves(results),
+        }, f, indent=1)
+
+    print("***********************************************************")
+    print("[INFO] Benchmark finished in %.1f minutes" % ((time.time() - start_time) / 60))
+    print("[INFO] results: %s.csv, %s.json" % (args.outfile, args.outfile))
+    print("***********************************************************")
@@ -0,0 +1,224 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import argparse
+import numpy as np
+
+# Binary file: a 16 bytes header followed by uint8 matrices of the colors (NORTH, SOUTH, WEST, EAST) of the pieces.
+# An instance file holds 1 board: the 4 rotations of each piece, in the order of the instance (matrix
+# (board_size ** 2, 4, 4), the piece_table of EternityPuzzle, mapped without any copy). A solution file holds any number
+# of boards: the pieces at each position, rotations applied (matrix (n_boards, board_size ** 2, 4)).
+MAGIC = b'E2BF'
+VERSION = 2
+INSTANCE = 0
+SOLUTIONS = 1
+HEADER = np.dtype([('magic', 'S4'), ('version', '<u1'), ('kind', '<u1'), ('board_size', '<u2'), ('n_boards', '<u4'),
+                   ('reserved', '<u4')])
+
+# ROTATION_SIDES[r] are the sides of the initial piece giving (NORTH, SOUTH, WEST, EAST) = (0, 1, 2, 3) after `r` turns
+# (see EternityPuzzle.generate_rotation)
+ROTATION_SIDES = [[0, 1, 2, 3], [2, 3, 1, 0], [1, 0, 3, 2], [3, 2, 0, 1]]
+
+
+def rotate_pieces(pieces):
+    """
+    :param pieces: array-like (n_piece, 4) of the colors of the pieces
+    :return: array (n_piece, 4, 4) of uint8, the colors of each piece after 0, 1, 2 and 3 turns
+    """
+    return np.asarray(pieces, dtype=np.uint8)[:, ROTATION_SIDES]
+
+
+def is_binary(path):
+    """
+    :return: True if `path` is a file in the binary format
+    """
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def read_header(path):
+    """
+    :return: the header of the binary file `path` (fields of HEADER)
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) == 0 or header['magic'][0] != MAGIC:
+        raise Exception("%s is not a binary Eternity II file" % path)
+    if header['version'][0] != VERSION:
+        raise Exception("%s has version %d, version %d expected" % (path, header['version'][0], VERSION))
+    return header[0]
+
+
+def read_instance(path):
+    """
+    Map the pieces of a binary instance file without reading them: the pages are loaded on access and shared by all the
+        processes mapping the same file
+    :return: a tuple (board size, read-only memmap (board_size ** 2, 4, 4) of uint8, the colors of each piece after
+        0, 1, 2 and 3 turns)
+    """
+    header = read_header(path)
+    if header['kind'] != INSTANCE:
+        raise Exception("%s is not a binary instance file" % path)
+    boardSize = int(header['board_size'])
+    return boardSize, np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.itemsize, shape=(boardSize ** 2, 4, 4))
+
+
+def read_boards(path, kind=None):
+    """
+    Map the boards of a binary file without reading them (see read_instance)
+    :param path: binary file
+    :param kind: INSTANCE or SOLUTIONS to check the kind of the file, None to accept both
+    :return: a tuple (board size, read-only memmap (n_boards, board_size ** 2, 4) of uint8), the board of an instance
+        file is its pieces without rotation
+    """
+    header = read_header(path)
+    if kind is not None and header['kind'] != kind:
+        raise Exception("%s is not a binary %s file" % (path, 'instance' if kind == INSTANCE else 'solution'))
+    if header['kind'] == INSTANCE:
+        boardSize, pieceTable = read_instance(path)
+        return boardSize, pieceTable[None, :, 0]
+    boardSize = int(header['board_size'])
+    nbBoards = int(header['n_boards'])
+    if nbBoards == 0:
+        return boardSize, np.empty((0, boardSize ** 2, 4), dtype=np.uint8)
+    return boardSize, np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.itemsize, shape=(nbBoards, boardSize ** 2, 4))
+
+
+def write_boards(path, boards, kind, append=False):
+    """
+    :param path: binary file
+    :param boards: array-like (n_boards, board_size ** 2, 4) of colors (the pieces of the instance for INSTANCE, their
+        rotations are written with them)
+    :param kind: INSTANCE or SOLUTIONS
+    :param append: add the boards at the end of an existing solution file (created if it does not exist)
+    """
+    boards = np.asarray(boards)
+    if boards.ndim != 3 or boards.shape[2] != 4:
+        raise Exception("Boards must have the shape (n_boards, n_piece, 4), not %s" % (boards.shape,))
+    if boards.size > 0 and (boards.min() < 0 or boards.max() > 255):
+        raise Exception("Colors must be between 0 and 255 in the binary format")
+    boardSize = int(round(boards.shape[1] ** 0.5))
+    if boardSize ** 2 != boards.shape[1]:
+        raise Exception("%d pieces do not make a square board" % boards.shape[1])
+    if kind == INSTANCE and (append or len(boards) != 1):
+        raise Exception("An instance file holds exactly 1 board")
+    data = rotate_pieces(boards[0]) if kind == INSTANCE else boards.astype(np.uint8)
+
+    try:
+        header = read_header(path) if append else None
+    except FileNotFoundError:
+        header = None
+
+    if header is None:
+        header = np.zeros(1, dtype=HEADER)[0]
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        header['kind'] = kind
+        header['board_size'] = boardSize
+        with open(path, 'wb') as file:
+            file.write(header.tobytes())
+            file.write(data.tobytes())
+        nbBoards = len(boards)
+    else:
+        if header['kind'] != kind or header['board_size'] != boardSize:
+            raise Exception("Boards of size %d can not be appended to %s" % (boardSize, path))
+        nbBoards = int(header['n_boards']) + len(boards)
+        with open(path, 'r+b') as file:
+            file.seek(HEADER.itemsize + int(header['n_boards']) * boards.shape[1] * 4)
+            file.write(data.tobytes())
+            file.truncate()
+
+    # The number of boards is written last: an interrupted append leaves a valid file with the previous boards
+    header['n_boards'] = nbBoards
+    with open(path, 'r+b') as file:
+        file.write(header.tobytes())
+
+
+def read_text_instance(path):
+    """
+    :return: a tuple (board size, array (board_size ** 2, 4) of the colors of the pieces) of a text instance file
+    """
+    with open(path) as file:
+        tokens = file.read().split()
+    boardSize = int(tokens[0])
+    pieces = np.array(list(map(int, tokens[1:])), dtype=np.int64).reshape(-1, 4)
+    if len(pieces) != boardSize ** 2:
+        raise Exception("%s has %d pieces, %d expected" % (path, len(pieces), boardSize ** 2))
+    return boardSize, pieces
+
+
+def read_text_solution(path):
+    """
+    :return: a tuple (board size, array (board_size ** 2, 4) of the pieces at each position) of a solution file
+        written by print_solution()
+    """
+    with open(path) as file:
+        tokens = file.read().split()
+    boardSize = int(tokens[1]) # tokens[0] is the number of conflicts
+    solution = np.array(list(map(int, tokens[2:])), dtype=np.int64).reshape(-1, 4)
+    if len(solution) != boardSize ** 2:
+        raise Exception("%s has %d pieces, %d expected" % (path, len(solution), boardSize ** 2))
+    return boardSize, solution
+
+
+def write_text_instance(path, pieces):
+    """
+    Write the pieces `pieces` (array-like (n_piece, 4)) in the text instance format
+    """
+    pieces = np.asarray(pieces)
+    with open(path, 'w') as file:
+        file.write(str(int(round(len(pieces) ** 0.5))) + '\n')
+        file.write('\n'.join(' '.join(map(str, piece)) for piece in pieces.tolist()))
+
+
+def count_conflicts(board):
+    """
+    :param board: array (board_size ** 2, 4) of the pieces at each position
+    :return: number of conflicts of the board (same count as get_total_n_conflict)
+    """
+    boardSize = int(round(len(board) ** 0.5))
+    grid = np.asarray(board).reshape(boardSize, boardSize, 4) # [j row, i column, side]
+    return int((grid[:, 1:, 2] != grid[:, :-1, 3]).sum() + (grid[1:, :, 1] != grid[:-1, :, 0]).sum()
+               + (grid[:, 0, 2] != 0).sum() + (grid[:, -1, 3] != 0).sum() + (grid[0, :, 1] != 0).sum()
+               + (grid[-1, :, 0] != 0).sum())
+
+
+def is_text_solution(path):
+    """
+    :return: True if the text file `path` is a solution (first line: number of conflicts, second line: board size),
+        False if it is an instance (first line: board size, then the pieces)
+    """
+    with open(path) as file:
+        file.readline()
+        return len(file.readline().split()) == 1
+
+
+def convert(inputPath, outputPath):
+    """
+    Convert a binary file to the text format or a text file (instance or solution) to the binary format.
+        A binary solution file with several boards is converted to one text file per board (`outputPath` must contain
+        a %d for the index of the board).
+    """
+    if is_binary(inputPath):
+        header = read_header(inputPath)
+        _, boards = read_boards(inputPath)
+        if header['kind'] == INSTANCE:
+            write_text_instance(outputPath, boards[0])
+            return
+        for index, board in enumerate(boards):
+            path = outputPath % index if len(boards) > 1 else outputPath
+            with open(path, 'w') as file:
+                file.write(str(count_conflicts(board)) + '\n' + str(header['board_size']) + '\n')
+                file.write('\n'.join(' '.join(map(str, piece)) + ' ' for piece in board.tolist()))
+    elif is_text_solution(inputPath):
+        write_boards(outputPath, read_text_solution(inputPath)[1][None], SOLUTIONS)
+    else:
+        write_boards(outputPath, read_text_instance(inputPath)[1][None], INSTANCE)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert Eternity II instances and solutions between the text and the binary formats")
+    parser.add_argument('input', type=str)
+    parser.add_argument('output', type=str)
+    args = parser.parse_args()
+
+    convert(args.input, args.output)
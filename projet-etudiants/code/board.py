@@ -0,0 +1,100 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import numpy as np
+
+
+class Board:
+    """
+    Array representation of a solution: `pieces[k]` is the index (in `piece_list`) of the piece placed at position `k`
+        and `rotations[k]` the number of turns applied to it (same order as in generate_rotation).
+        The colors are read in `piece_table`, so a board never stores any tuple.
+    """
+
+    def __init__(self, eternity_puzzle, pieces=None, rotations=None):
+        """
+        :param eternity_puzzle: object describing the input
+        :param pieces: piece index for each position (identity permutation by default)
+        :param rotations: number of turns for each position (no rotation by default)
+        """
+        self.eternity_puzzle = eternity_puzzle
+        n_piece = eternity_puzzle.n_piece
+
+        if pieces is None:
+            self.pieces = np.arange(n_piece, dtype=np.uint16)
+        else:
+            self.pieces = np.asarray(pieces, dtype=np.uint16)
+
+        if rotations is None:
+            self.rotations = np.zeros(n_piece, dtype=np.uint8)
+        else:
+            self.rotations = np.asarray(rotations, dtype=np.uint8)
+
+        assert (len(self.pieces) == n_piece and len(self.rotations) == n_piece)
+
+    @classmethod
+    def from_solution(cls, eternity_puzzle, solution):
+        """
+        Build a board from a solution in the list of tuples format
+        :param eternity_puzzle: object describing the input
+        :param solution: list of the pieces (rotations applied)
+        :return: the board
+        """
+        # All the (piece, rotation) giving each rotated piece
+        candidates = {}
+        for piece, rotated_pieces in enumerate(eternity_puzzle.piece_table.tolist()):
+            for rotation, rotated_piece in enumerate(rotated_pieces):
+                candidates.setdefault(tuple(rotated_piece), []).append((piece, rotation))
+
+        pieces = np.empty(eternity_puzzle.n_piece, dtype=np.uint16)
+        rotations = np.empty(eternity_puzzle.n_piece, dtype=np.uint8)
+        used = set()
+        for k, rotated_piece in enumerate(solution):
+            # A piece can appear several times in the instance, take the first one not used yet
+            for piece, rotation in candidates.get(tuple(rotated_piece), []):
+                if piece not in used:
+                    break
+            else:
+                raise Exception("Piece %s at position %d is not in the instance" % (rotated_piece, k))
+            used.add(piece)
+            pieces[k] = piece
+            rotations[k] = rotation
+
+        return cls(eternity_puzzle, pieces, rotations)
+
+    def to_solution(self):
+        """
+        :return: the board in the list of tuples format (used by print_solution, display_solution, ...)
+        """
+        return [tuple(piece) for piece in self.colors().tolist()]
+
+    def colors(self):
+        """
+        :return: array (n_piece, 4) with the colors (NORTH, SOUTH, WEST, EAST) of each position
+        """
+        return self.eternity_puzzle.piece_table[self.pieces, self.rotations]
+
+    def get_n_conflict(self):
+        """
+        :return: number of conflicts of the board
+        """
+        return int(self.eternity_puzzle.get_total_n_conflict_batch(self.colors()[np.newaxis])[0])
+
+    def rotate(self, k, rotation):
+        """
+        Turn the piece at position `k` `rotation` more times
+        """
+        self.rotations[k] = (self.rotations[k] + rotation) % 4
+
+    def swap(self, k1, k2):
+        """
+        Exchange the pieces (and their rotations) at positions `k1` and `k2`
+        """
+        self.pieces[[k1, k2]] = self.pieces[[k2, k1]]
+        self.rotations[[k1, k2]] = self.rotations[[k2, k1]]
+
+    def copy(self):
+        """
+        :return: an independent copy of the board
+        """
+        return Board(self.eternity_puzzle, self.pieces.copy(), self.rotations.copy())
@@ -0,0 +1,156 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import copy
+import os
+import pickle
+import random
+import time
+import numpy as np
+import binary_format
+from board import Board
+
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint:
+    """
+    Checkpoint hook given to a solver. The solver reports its new best solutions with improve() and calls tick() regularly;
+        the best solution, the state of the random generators and the statistics of the search are written to `path`
+        every `interval` seconds (only if the best solution has changed) and at the end of the search with save().
+        A checkpoint, a solution file written by print_solution() or a binary solution file (see binary_format.py) can be
+        loaded as the starting solution of the search.
+    """
+
+    def __init__(self, eternity_puzzle, path=None, interval=60., resume=None):
+        """
+        :param eternity_puzzle: object describing the input
+        :param path: checkpoint file, None to never write a checkpoint
+        :param interval: minimum number of seconds between two checkpoints
+        :param resume: checkpoint or solution file to start from, None to start from scratch
+        """
+        self.eternity_puzzle = eternity_puzzle
+        self.path = path
+        self.interval = interval
+        self.nextSave = time.time() + interval
+        self.bestSolution = None
+        self.bestScore = None
+        self.isSaved = True
+        self.incumbent = None # starting solution of the search
+        self.randomState = None # (random state, numpy random state) of the checkpoint to resume from
+        self.stats = None # statistics of the search saved in the checkpoint to resume from
+        if resume is not None:
+            self.load(resume)
+
+    def load(self, path):
+        """
+        Load the starting solution of the search from a checkpoint, a solution file written by print_solution() or a binary
+            solution file (its best solution)
+        """
+        with open(path, 'rb') as file:
+            isCheckpoint = file.read(1) == pickle.PROTO # pickle protocol 2 and above starts with the PROTO opcode
+
+        if binary_format.is_binary(path):
+            boardSize, boards = binary_format.read_boards(path, binary_format.SOLUTIONS)
+            if len(boards) == 0:
+                raise Exception("%s has no solution" % path)
+            solution = min(boards, key=binary_format.count_conflicts)
+        elif isCheckpoint:
+            with open(path, 'rb') as file:
+                data = pickle.load(file)
+            if data['version'] != CHECKPOINT_VERSION:
+                raise Exception("Checkpoint %s has version %s, version %s expected" % (path, data['version'], CHECKPOINT_VERSION))
+            boardSize = data['board_size']
+            self.randomState = data['random_state']
+            self.stats = data['stats']
+        else:
+            boardSize, solution = binary_format.read_text_solution(path)
+
+        if boardSize != self.eternity_puzzle.board_size:
+            raise Exception("%s is a solution for a board of size %s, not %s" % (path, boardSize, self.eternity_puzzle.board_size))
+
+        if isCheckpoint:
+            board = Board(self.eternity_puzzle, np.frombuffer(data['pieces'], dtype=np.uint16),
+                          np.frombuffer(data['rotations'], dtype=np.uint8))
+        else:
+            # Raises an exception if the pieces are not the pieces of the instance
+            board = Board.from_solution(self.eternity_puzzle, [tuple(piece) for piece in solution.tolist()])
+
+        self.incumbent = board.to_solution()
+        score = self.eternity_puzzle.get_total_n_conflict(self.incumbent)
+        self.bestSolution = list(self.incumbent)
+        self.bestScore = score
+
+    def restore_random(self):
+        """
+        Restore the state of the random generators saved in the checkpoint to resume from (no-op otherwise)
+        """
+        if self.randomState is not None:
+            random.setstate(self.randomState[0])
+            np.random.set_state(self.randomState[1])
+
+    def restore_stats(self, stats):
+        """
+        Continue the statistics of the search saved in the checkpoint to resume from in `stats` (no-op otherwise)
+        """
+        if self.stats is not None:
+            stats.resume(self.stats)
+
+    def for_worker(self):
+        """
+        :return: a copy of the hook for a worker of a pool: same starting solution, but no file written and no random state
+            or statistics restored (each worker keeps its own seed, the statistics are continued by the parent)
+        """
+        workerCheckpoint = copy.copy(self)
+        workerCheckpoint.path = None
+        workerCheckpoint.randomState = None
+        workerCheckpoint.stats = None
+        return workerCheckpoint
+
+    def improve(self, solution, score):
+        """
+        Record `solution` if it is better than the best solution recorded
+        :param solution: solution found by the search (copied)
+        :param score: number of conflicts of `solution`
+        """
+        if self.bestScore is None or score < self.bestScore:
+            self.bestScore = score
+            self.bestSolution = list(solution)
+            self.isSaved = False
+
+    def tick(self, stats=None):
+        """
+        Write a checkpoint if the best solution has changed and the last checkpoint is older than `interval` seconds
+        :param stats: SearchStats of the search (optional)
+        """
+        if not self.isSaved and time.time() >= self.nextSave:
+            self.save(stats)
+
+    def save(self, stats=None):
+        """
+        Write a checkpoint with the best solution recorded. The file is replaced atomically: a killed process leaves the
+            previous checkpoint or the new one, never a partial file.
+        :param stats: SearchStats of the search (optional)
+        """
+        self.nextSave = time.time() + self.interval
+        if self.path is None or self.bestSolution is None:
+            return
+
+        board = Board.from_solution(self.eternity_puzzle, self.bestSolution)
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'board_size': self.eternity_puzzle.board_size,
+            'score': self.bestScore,
+            'pieces': board.pieces.tobytes(),
+            'rotations': board.rotations.tobytes(),
+            'random_state': (random.getstate(), np.random.get_state()),
+            'stats': None if stats is None else stats.to_checkpoint(),
+        }
+
+        tmpPath = self.path + '.tmp'
+        with open(tmpPath, 'wb') as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmpPath, self.path)
+        self.isSaved = True
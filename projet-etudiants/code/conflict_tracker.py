@@ -0,0 +1,124 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+
+MAX_CONFLICTS = 4 # a position has at most one conflict per side
+
+
+class ConflictTracker:
+    """
+    Number of conflicts of each position of a solution, kept up to date when pieces are placed, removed or turned (only
+        the changed positions and their neighbours are recomputed, see refresh). The positions are kept in buckets by
+        number of conflicts (0 to 4), so the k worst positions or a random conflicting position are found without
+        scanning the board. An unassigned position ((-1, -1, -1, -1), see destroy in solver_advanced) has no conflict.
+    """
+
+    def __init__(self, eternity_puzzle, solution):
+        """
+        :param eternity_puzzle: object describing the input
+        :param solution: solution tracked (the tracker does not copy it, call refresh() after each change)
+        """
+        self.eternity_puzzle = eternity_puzzle
+        self.conflicts = [0] * eternity_puzzle.n_piece
+        self.buckets = [[] for _ in range(MAX_CONFLICTS + 1)] # buckets[c]: positions with `c` conflicts
+        self.position = [0] * eternity_puzzle.n_piece # index of each position in its bucket
+        self.reset(solution)
+
+    def reset(self, solution):
+        """
+        Track a new solution (all the positions are recomputed)
+        """
+        self.buckets = [[] for _ in range(MAX_CONFLICTS + 1)]
+        for k in range(self.eternity_puzzle.n_piece):
+            n_conflict = self.get_local_n_conflict(k, solution)
+            self.conflicts[k] = n_conflict
+            self.position[k] = len(self.buckets[n_conflict])
+            self.buckets[n_conflict].append(k)
+
+    def get_local_n_conflict(self, k, solution):
+        """
+        :return: number of conflicts of position `k` in `solution`, 0 if it is unassigned
+        """
+        if solution[k][0] == -1:
+            return 0
+        return self.eternity_puzzle.get_local_n_conflict(k, solution)
+
+    def set_n_conflict(self, k, n_conflict):
+        """
+        Move position `k` to the bucket `n_conflict` (O(1): the last position of its old bucket takes its place)
+        """
+        old = self.conflicts[k]
+        if old == n_conflict:
+            return
+        bucket = self.buckets[old]
+        last = bucket.pop()
+        if last != k:
+            bucket[self.position[k]] = last
+            self.position[last] = self.position[k]
+        self.position[k] = len(self.buckets[n_conflict])
+        self.buckets[n_conflict].append(k)
+        self.conflicts[k] = n_conflict
+
+    def refresh(self, cells, solution):
+        """
+        Update the tracker after pieces were placed, removed or turned at the positions `cells` of `solution`
+            (the conflicts of the positions and of their neighbours are recomputed)
+        """
+        size = self.eternity_puzzle.board_size
+        n_piece = self.eternity_puzzle.n_piece
+        affected = set()
+        for k in cells:
+            affected.add(k)
+            i = k % size
+            if i > 0:
+                affected.add(k - 1)
+            if i < size - 1:
+                affected.add(k + 1)
+            if k >= size:
+                affected.add(k - size)
+            if k + size < n_piece:
+                affected.add(k + size)
+        for k in affected:
+            self.set_n_conflict(k, self.get_local_n_conflict(k, solution))
+
+    def worst(self, nbCells):
+        """
+        :return: list of `nbCells` positions with the most conflicts (ties broken randomly in the last bucket used)
+        """
+        selected = []
+        for n_conflict in range(MAX_CONFLICTS, -1, -1):
+            bucket = self.buckets[n_conflict]
+            missing = nbCells - len(selected)
+            if len(bucket) <= missing:
+                selected.extend(bucket)
+            else:
+                selected.extend(random.sample(bucket, missing))
+            if len(selected) == nbCells:
+                break
+        return selected
+
+    def conflicting(self):
+        """
+        :return: list of the positions with at least one conflict
+        """
+        return [k for bucket in self.buckets[1:] for k in bucket]
+
+    def nb_conflicting(self):
+        """
+        :return: number of positions with at least one conflict
+        """
+        return sum(len(bucket) for bucket in self.buckets[1:])
+
+    def sample_conflicting(self):
+        """
+        :return: a position with at least one conflict chosen uniformly, None if there is none
+        """
+        nbConflicting = self.nb_conflicting()
+        if nbConflicting == 0:
+            return None
+        index = random.randrange(nbConflicting)
+        for bucket in self.buckets[1:]:
+            if index < len(bucket):
+                return bucket[index]
+            index -= len(bucket)
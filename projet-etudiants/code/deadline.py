@@ -0,0 +1,61 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import time
+
+
+class Deadline:
+    """
+    Stopping criteria of a search: a wall-clock time limit and a target number of conflicts. The solvers call expired()
+        in their inner loops: the monotonic clock is only read every `checkInterval` calls, and `checkInterval` adapts
+        to the cost of an iteration so that the clock is read about every `resolution` seconds. The search stops at most
+        about `resolution` seconds after the deadline, whatever the cost of its iterations.
+    """
+
+    def __init__(self, seconds=None, targetConflicts=0, resolution=0.005):
+        """
+        :param seconds: time limit in seconds (None for no limit)
+        :param targetConflicts: the search stops as soon as it has a solution with at most this number of conflicts
+            (None to never stop on the score)
+        :param resolution: number of seconds between two reads of the clock
+        """
+        self.startTime = time.monotonic()
+        self.endTime = None if seconds is None else self.startTime + seconds
+        self.targetConflicts = targetConflicts
+        self.resolution = resolution
+        self.checkInterval = 1 # number of calls to expired() between two reads of the clock
+        self.countdown = 1
+        self.lastCheck = self.startTime
+        self.isExpired = seconds is not None and seconds <= 0
+
+    def expired(self):
+        """
+        :return: True if the time limit is exceeded (amortized: the clock is not read at each call)
+        """
+        self.countdown -= 1
+        if self.countdown > 0 or self.endTime is None:
+            return self.isExpired
+
+        now = time.monotonic()
+        sinceLastCheck = now - self.lastCheck
+        if sinceLastCheck < self.resolution / 2:
+            self.checkInterval *= 2
+        elif sinceLastCheck > self.resolution and self.checkInterval > 1:
+            self.checkInterval //= 2
+        self.lastCheck = now
+        self.countdown = self.checkInterval
+        if now >= self.endTime:
+            self.isExpired = True
+        return self.isExpired
+
+    def reached(self, score):
+        """
+        :return: True if `score` (number of conflicts) reaches the target
+        """
+        return self.targetConflicts is not None and score <= self.targetConflicts
+
+    def remaining(self):
+        """
+        :return: number of seconds before the time limit (None if there is no limit)
+        """
+        return None if self.endTime is None else max(0., self.endTime - time.monotonic())
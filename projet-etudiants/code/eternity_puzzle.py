@@ -1,17 +1,11 @@
 # Myriam KIRIAKOS 1888929
 # Marco NOVAES 2166579
 
-from tkinter import S
-import matplotlib
-import matplotlib.patches as patches
-import matplotlib.pyplot as plt
-from matplotlib.path import Path
-from matplotlib.lines import Line2D
+import functools
 import numpy as np
 import random
-
-import math
-import copy
+import binary_format
+from piece_index import PieceIndex
 
 GRAY = 0
 BLACK = 23
@@ -23,30 +17,67 @@ SOUTH = 1
 WEST = 2
 EAST = 3
 
+# Classes of the pieces (number of GRAY sides) and of the positions (number of sides on the border of the board)
+INTERIOR = 0
+EDGE = 1
+CORNER = 2
 
-class EternityPuzzle:
-
-    def __init__(self, instance_file):
-
-        with open(instance_file) as file:
-            lines = file.readlines()
-
-            self.board_size = int(lines[0])
-            self.n_piece = self.board_size ** 2
-            self.n_internal_connection = 2 * self.board_size * (self.board_size - 1)
-            self.n_total_connection = self.n_internal_connection + self.board_size * 4
+# ROTATION_SIDES[r] are the sides of the initial piece giving (NORTH, SOUTH, WEST, EAST) after `r` turns (see generate_rotation)
+ROTATION_SIDES = binary_format.ROTATION_SIDES
 
-            flatten = lambda l: [item for sublist in l for item in sublist]
 
-            self.piece_list = [(int(x.split()[0]), int(x.split()[1]), int(x.split()[2]), int(x.split()[3])) for line in
-                               lines[1:] for x in line.strip().split('\n')]
-
-            self.n_color = max(flatten(self.piece_list)) + 1
+class EternityPuzzle:
 
-            assert (len(self.piece_list) == self.n_piece)
+    def __init__(self, instance_file):
 
-            for p in self.piece_list:
-                assert (len(p) == 4)
+        # piece_table[p][r] gives the colors (NORTH, SOUTH, WEST, EAST) of piece `p` after `r` turns: computed for a text
+        # instance, mapped without copy for a binary instance (see binary_format.py)
+        if binary_format.is_binary(instance_file):
+            self.board_size, self.piece_table = binary_format.read_instance(instance_file)
+        else:
+            self.board_size, pieces = binary_format.read_text_instance(instance_file)
+            self.piece_table = binary_format.rotate_pieces(pieces)
+        pieces = self.piece_table[:, 0] # view of the pieces without rotation
+
+        self.n_piece = self.board_size ** 2
+        self.n_internal_connection = 2 * self.board_size * (self.board_size - 1)
+        self.n_total_connection = self.n_internal_connection + self.board_size * 4
+
+        self.n_color = int(pieces.max()) + 1
+
+        assert (len(pieces) == self.n_piece)
+
+        # border_mask[k][side] is True if `side` of position `k` is on the border of the board (must be GRAY)
+        border = np.zeros((self.board_size, self.board_size, 4), dtype=bool)  # [j ligne, i colonne, side]
+        border[-1, :, NORTH] = True
+        border[0, :, SOUTH] = True
+        border[:, 0, WEST] = True
+        border[:, -1, EAST] = True
+        self.border_mask = border.reshape(self.n_piece, 4)
+
+        # piece_class[p]: INTERIOR, EDGE or CORNER, position_class[k]: same for the position `k`
+        self.piece_class = [min(int(n_gray), CORNER) for n_gray in (pieces == GRAY).sum(axis=1)]
+        self.position_class = self.border_mask.sum(axis=1).tolist()
+        # border_sides[k]: bit `side` set if `side` of position `k` is on the border
+        side_bits = 1 << np.arange(4)
+        self.border_sides = (self.border_mask * side_bits).sum(axis=1).tolist()
+        # frame_rotation[p][border_sides]: the only rotation of the frame piece `p` with its GRAY sides exactly on
+        # `border_sides` (its forced orientation in the frame slots with these border sides), empty for interior pieces
+        gray_sides = ((self.piece_table == GRAY) * side_bits).sum(axis=2).tolist()
+        self.frame_rotation = [{} if self.piece_class[p] == INTERIOR else {mask: r for r, mask in enumerate(gray_sides[p])}
+                               for p in range(self.n_piece)]
+
+    @functools.cached_property
+    def piece_list(self):
+        # Pieces of the instance as tuples (NORTH, SOUTH, WEST, EAST), built on the first access only: the agents working
+        # on piece_table do not copy a large mapped instance
+        return list(map(tuple, self.piece_table[:, 0].tolist()))
+
+    @functools.cached_property
+    def piece_index(self):
+        # Index of the pieces by the colors of their sides, used to fill a position without testing every piece.
+        # Built on the first access only: the agents that do not use it load large instances faster
+        return PieceIndex(self)
 
     def generate_rotation(self, piece):
 
@@ -57,6 +88,24 @@ class EternityPuzzle:
 
         return [initial_shape, rotation_90, rotation_180, rotation_270]
 
+    def get_frame_piece(self, piece, k):
+        """
+        :param piece: piece in any rotation
+        :param k: position
+        :return : the rotation of `piece` with its GRAY sides exactly on the border sides of position `k` (the forced
+            orientation of a corner or edge piece in its frame slot), None if there is none (the piece does not belong
+            to the class of the position)
+        """
+        border_sides = self.border_sides[k]
+        for rotated in self.generate_rotation(piece):
+            gray_sides = 0
+            for side in range(4):
+                if rotated[side] == GRAY:
+                    gray_sides |= 1 << side
+            if gray_sides == border_sides:
+                return rotated
+        return None
+
     def generate_random_rotation(self, piece):
         rotation = random.randint(1,4)
         if rotation == 1:
@@ -101,6 +150,25 @@ class EternityPuzzle:
 
         return n_conflict
 
+    def get_total_n_conflict_batch(self, solutions):
+        """
+        Vectorized get_total_n_conflict for many solutions at once
+        :param solutions: array (batch, n_piece, 4) of rotated pieces (for example stacked Board.colors())
+        :return : array (batch,) with the number of conflicts of each solution
+        """
+        solutions = np.asarray(solutions)
+        batch = solutions.shape[0]
+        grids = solutions.reshape(batch, self.board_size, self.board_size, 4)  # [batch, j ligne, i colonne, side]
+
+        # Internal connections: west/east between columns and south/north between lines
+        n_horizontal = (grids[:, :, 1:, WEST] != grids[:, :, :-1, EAST]).reshape(batch, -1).sum(axis=1)
+        n_vertical = (grids[:, 1:, :, SOUTH] != grids[:, :-1, :, NORTH]).reshape(batch, -1).sum(axis=1)
+
+        # Border connections: the sides facing the border must be GRAY
+        n_border = ((solutions != GRAY) & self.border_mask).reshape(batch, -1).sum(axis=1)
+
+        return n_horizontal + n_vertical + n_border
+
     def get_local_n_conflict(self, k, solution):
         """
         :return : number of conflicts for piece `k` in `solution`
@@ -150,6 +218,21 @@ class EternityPuzzle:
 
         return n_conflict
 
+    def get_facing_colors(self, k, solution):
+        """
+        :return : colors facing the (NORTH, SOUTH, WEST, EAST) sides of position `k` in `solution`.
+            GRAY on the border of the board and -1 for a non-assigned neighbour
+        """
+        i = k % self.board_size
+        j = k // self.board_size
+
+        north = GRAY if j == self.board_size - 1 else solution[k + self.board_size][SOUTH]
+        south = GRAY if j == 0 else solution[k - self.board_size][NORTH]
+        west = GRAY if i == 0 else solution[k - 1][EAST]
+        east = GRAY if i == self.board_size - 1 else solution[k + 1][WEST]
+
+        return north, south, west, east
+
     def exist_conflict_between_pieces(self, k1, k2, solution):
         """
         :return : exist_conflict_between_pieces, areNeighbours
@@ -194,144 +277,91 @@ class EternityPuzzle:
 
         return False, False
 
-    def display_solution(self, solution, output_file):
-
-        if len(solution) < self.n_piece:
-            solution = solution + [(WHITE, WHITE, WHITE, WHITE)] * (self.n_piece - len(solution))
-
-        origin = 0
-        size = self.board_size + 2
-
-        color_dict = self.build_color_dict()
-
-        fig, ax = plt.subplots()
-
-        n_total_conflict = self.get_total_n_conflict(solution)
-
-        n_internal_conflict = 0
-
-        for j in range(size):  # y-axis
-            for i in range(size):  # x-axis
-                valid_draw = [0, size - 1]
-                if i in valid_draw or j in valid_draw:
-                    ax.add_patch(patches.Rectangle((i, j), i + 1, j + 1, fill=True, facecolor=color_dict[GRAY],
-                                                   edgecolor=color_dict[BLACK]))
-                else:
-                    # ax.add_patch(patches.Rectangle((i, j), i + 1, j + 1, fill=True, facecolor='white', edgecolor='k'))
-
-                    left_bot = (i, j)
-                    right_bot = (i + 1, j)
-                    right_top = (i + 1, j + 1)
-                    left_top = (i, j + 1)
-                    middle = (i + 0.5, j + 0.5)
-
-                    instructions = [Path.MOVETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY]
-
-                    triangle_south_path = Path([left_bot, middle, right_bot, left_bot], instructions)
-                    triangle_east_path = Path([right_top, middle, right_bot, right_top], instructions)
-                    triangle_north_path = Path([right_top, middle, left_top, right_top], instructions)
-                    triangle_west_path = Path([left_bot, middle, left_top, left_bot], instructions)
-
-                    is_triangle_south_valid = True
-                    is_triangle_north_valid = True
-                    is_triangle_east_valid = True
-                    is_triangle_west_valid = True
-
-                    k = self.board_size * (j - 1) + (i - 1)
-                    k_east = self.board_size * (j - 1) + (i - 2)
-                    k_south = self.board_size * (j - 2) + (i - 1)
-
-                    if i == 1:
-                        is_triangle_west_valid = (solution[k][WEST] == GRAY)  # 1 for Gray
-                    elif i == size - 2:
-                        is_triangle_east_valid = (solution[k][EAST] == GRAY)
-                        is_triangle_west_valid = solution[k][WEST] == solution[k_east][EAST]
-                    else:
-                        is_triangle_west_valid = solution[k][WEST] == solution[k_east][EAST]
-
-                    if j == 1:
-                        is_triangle_south_valid = (solution[k][SOUTH] == GRAY)
-                    elif j == size - 2:
-                        is_triangle_north_valid = (solution[k][NORTH] == GRAY)
-                        is_triangle_south_valid = solution[k][SOUTH] == solution[k_south][NORTH]
-                    else:
-                        is_triangle_south_valid = solution[k][SOUTH] == solution[k_south][NORTH]
-
-                    patch_south = patches.PathPatch(triangle_south_path, facecolor=color_dict[solution[k][SOUTH]],
-                                                    edgecolor=color_dict[BLACK])
-
-                    patch_north = patches.PathPatch(triangle_north_path, facecolor=color_dict[solution[k][NORTH]],
-                                                    edgecolor=color_dict[BLACK])
+    def get_rotated_piece(self, piece, rotation):
+        """
+        :return : `piece` after `rotation` quarter turns (same order as in generate_rotation) without building the 4 rotations
+        """
+        if rotation == 0:
+            return piece
+        if rotation == 1:
+            return (piece[2], piece[3], piece[1], piece[0])
+        if rotation == 2:
+            return (piece[1], piece[0], piece[3], piece[2])
+        return (piece[3], piece[2], piece[0], piece[1])
 
-                    patch_east = patches.PathPatch(triangle_east_path, facecolor=color_dict[solution[k][EAST]],
-                                                   edgecolor=color_dict[BLACK])
+    def get_pair_n_conflict(self, k1, k2, solution):
+        """
+        :return : number of conflicts around pieces `k1` and `k2` in `solution`, the edge shared by two neighbours is counted once
+        """
+        n_conflict = self.get_local_n_conflict(k1, solution)
+        if k1 == k2:
+            return n_conflict
 
-                    patch_west = patches.PathPatch(triangle_west_path, facecolor=color_dict[solution[k][WEST]],
-                                                   edgecolor=color_dict[BLACK])
+        n_conflict += self.get_local_n_conflict(k2, solution)
+        is_conflict, _ = self.exist_conflict_between_pieces(k1, k2, solution)
+        if is_conflict:
+            n_conflict -= 1
 
-                    if not is_triangle_south_valid:
-                        line_zip = list(zip(left_bot, right_bot))
-                        line = Line2D(line_zip[0], line_zip[1], color=color_dict[RED], lw=3)
-                        ax.add_line(line)
+        return n_conflict
 
-                        if j != 1:
-                            n_internal_conflict += 1
+    def apply_move(self, k1, piece1, k2, piece2, solution):
+        """
+        Place `piece1` at position `k1` and `piece2` at position `k2` in `solution` (in place).
+            If `k1` == `k2`, the position ends up holding `piece2`.
+        :return : the move to give to undo_move() to restore `solution`
+        """
+        undo = (k1, solution[k1], k2, solution[k2])
+        solution[k1] = piece1
+        solution[k2] = piece2
+        return undo
 
-                    if not is_triangle_north_valid:
-                        line_zip = list(zip(left_top, right_top))
-                        line = Line2D(line_zip[0], line_zip[1], color=color_dict[RED], lw=3)
-                        ax.add_line(line)
+    def undo_move(self, undo, solution):
+        """
+        Restore `solution` as it was before the apply_move() that returned `undo`
+        """
+        k1, piece1, k2, piece2 = undo
+        solution[k2] = piece2
+        solution[k1] = piece1
 
-                        if j != size - 2:
-                            n_internal_conflict += 1
+    def get_move_delta(self, k1, piece1, k2, piece2, solution):
+        """
+        Variation of the total number of conflicts if `piece1` is placed at position `k1` and `piece2` at position `k2`.
+            Only the edges around `k1` and `k2` are evaluated (O(1)) and `solution` is left unchanged.
+        :return : n_conflict(after the move) - n_conflict(before the move)
+        """
+        n_conflict_before = self.get_pair_n_conflict(k1, k2, solution)
+        undo = self.apply_move(k1, piece1, k2, piece2, solution)
+        n_conflict_after = self.get_pair_n_conflict(k1, k2, solution)
+        self.undo_move(undo, solution)
 
-                    if not is_triangle_west_valid:
-                        line_zip = list(zip(left_bot, left_top))
-                        line = Line2D(line_zip[0], line_zip[1], color=color_dict[RED], lw=3)
-                        ax.add_line(line)
+        return n_conflict_after - n_conflict_before
 
-                        if i != 1:
-                            n_internal_conflict += 1
+    def get_rotation_delta(self, k, rotation, solution):
+        """
+        :return : variation of the total number of conflicts if the piece at position `k` is turned `rotation` times
+        """
+        piece = self.get_rotated_piece(solution[k], rotation)
+        return self.get_move_delta(k, piece, k, piece, solution)
 
-                    if not is_triangle_east_valid:
-                        line_zip = list(zip(right_bot, right_top))
-                        line = Line2D(line_zip[0], line_zip[1], color=color_dict[RED], lw=3)
-                        ax.add_line(line)
+    def get_swap_delta(self, k1, k2, r1, r2, solution):
+        """
+        :return : variation of the total number of conflicts if the piece at position `k1` is moved to `k2` after `r1` turns
+            and the piece at position `k2` is moved to `k1` after `r2` turns
+        """
+        piece1 = self.get_rotated_piece(solution[k2], r2)
+        piece2 = self.get_rotated_piece(solution[k1], r1)
+        return self.get_move_delta(k1, piece1, k2, piece2, solution)
 
-                        if i != size - 2:
-                            n_internal_conflict += 1
-
-                    ax.add_patch(patch_south)
-                    ax.add_patch(patch_north)
-                    ax.add_patch(patch_east)
-                    ax.add_patch(patch_west)
-
-                    k += 1
-
-        plt.xlim(origin, size)
-        plt.ylim(origin, size)
-
-        title = 'Eternity of size %d X %d\n' \
-                'Total connections: %d    Internal connections: %d\n' \
-                'Total Valid connections: %d     Internal valid internal connections: %d\n' \
-                'Total Invalid connections: %d    Internal invalid connections: %d' % \
-                (self.board_size, self.board_size,
-                 self.n_total_connection, self.n_internal_connection,
-                 self.n_total_connection - n_total_conflict, self.n_internal_connection - n_internal_conflict,
-                 n_total_conflict, n_internal_conflict,
-                 )
-        ax.set_title(title)
-
-        plt.savefig(output_file)
+    def display_solution(self, solution, output_file):
+        # matplotlib is imported on the first drawing only (see visualization.py)
+        import visualization
+        visualization.display_solution(self, solution, output_file)
 
     def print_solution(self, solution, output_file):
         with open(output_file, "w") as file:
             file.write(str(self.get_total_n_conflict(solution)) + "\n")
             file.write(str(self.board_size))
-            for piece in solution:
-                file.write("\n")
-                for c in piece:
-                    file.write(str(c) + " ")
+            file.write("".join("\n%d %d %d %d " % tuple(piece) for piece in solution))
 
     def build_color_dict(self):
 
@@ -0,0 +1,111 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+from eternity_puzzle import NORTH, SOUTH, WEST, EAST
+
+
+def get_frame_ring(board_size):
+    """
+    :param board_size: number of positions on a side of the board
+    :return: list of the positions of the frame (border ring), starting from the south-west corner: the south row from
+        west to east, the east column upwards, the north row from east to west and the west column downwards
+    """
+    n = board_size
+    if n == 1:
+        return [0]
+    south = [i for i in range(n)]
+    east = [n * j + n - 1 for j in range(1, n)]
+    north = [n * (n - 1) + i for i in range(n - 2, -1, -1)]
+    west = [n * j for j in range(n - 2, 0, -1)]
+    return south + east + north + west
+
+
+def get_side_towards(k1, k2, board_size):
+    """
+    :return: side of position `k1` facing its neighbour `k2`
+    """
+    if k2 == k1 + 1:
+        return EAST
+    if k2 == k1 - 1:
+        return WEST
+    if k2 == k1 + board_size:
+        return NORTH
+    return SOUTH
+
+
+def solve_frame(eternity_puzzle, nodeLimit=None):
+    """
+    Depth-first search of a frame without conflict: the corner and edge pieces, in their forced orientation (see
+        EternityPuzzle.frame_rotation), are chained along the border ring (see get_frame_ring), each piece matching the
+        color of the previous one, until the chain closes on the first corner. The candidates of each position are
+        indexed by the color facing the previous position and tried in random order (the global random generator gives
+        a different frame at each call).
+    :param eternity_puzzle: object describing the input
+    :param nodeLimit: maximum number of pieces placed by the search (None for no limit)
+    :return: list of (position, piece, rotation) of the frame, None if no frame without conflict was found within the
+        node limit (the internal sides of the frame are not constrained)
+    """
+    n = eternity_puzzle.board_size
+    if n < 2:
+        return None
+    ring = get_frame_ring(n)
+    length = len(ring)
+
+    # candidates[t][color]: (piece, rotation, color towards the next position) of the pieces that fit position ring[t]
+    # with `color` towards the previous position
+    candidates = []
+    for t, k in enumerate(ring):
+        towardsPrevious = get_side_towards(k, ring[t - 1], n)
+        towardsNext = get_side_towards(k, ring[(t + 1) % length], n)
+        byColor = {}
+        for piece, pieceClass in enumerate(eternity_puzzle.piece_class):
+            if pieceClass != eternity_puzzle.position_class[k]:
+                continue
+            rotation = eternity_puzzle.frame_rotation[piece].get(eternity_puzzle.border_sides[k])
+            if rotation is None:
+                continue
+            colors = eternity_puzzle.piece_table[piece][rotation]
+            byColor.setdefault(int(colors[towardsPrevious]), []).append((piece, rotation, int(colors[towardsNext])))
+        candidates.append(byColor)
+
+    used = [False] * eternity_puzzle.n_piece
+    placement = [None] * length
+    nbNodes = 0
+    closingColor = None
+
+    # Depth-first search with an explicit stack (the ring has 4 * n - 4 positions, too deep for a recursion on large
+    # boards): choices[t] are the candidates of ring[t] in random order, nextChoice[t] the index of the next one to try
+    firstCorners = [option for options in candidates[0].values() for option in options]
+    choices = [random.sample(firstCorners, len(firstCorners))] + [None] * (length - 1)
+    nextChoice = [0] * length
+    t = 0
+    while t >= 0:
+        if nextChoice[t] == len(choices[t]):
+            # Every candidate of ring[t] was tried: backtrack
+            t -= 1
+            if t >= 0:
+                used[placement[t][0]] = False
+            continue
+        piece, rotation, nextColor = choices[t][nextChoice[t]]
+        nextChoice[t] += 1
+        if used[piece]:
+            continue
+        if t == 0:
+            # The first corner fixes the color closing the chain
+            closingColor = int(eternity_puzzle.piece_table[piece][rotation][get_side_towards(ring[0], ring[-1], n)])
+        else:
+            nbNodes += 1
+            if nodeLimit is not None and nbNodes > nodeLimit:
+                return None
+        placement[t] = (piece, rotation)
+        if t == length - 1:
+            if nextColor == closingColor:
+                return [(k, piece, rotation) for k, (piece, rotation) in zip(ring, placement)]
+            continue
+        used[piece] = True
+        t += 1
+        options = candidates[t].get(nextColor, [])
+        choices[t] = random.sample(options, len(options))
+        nextChoice[t] = 0
+    return None
@@ -0,0 +1,90 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import argparse
+import numpy as np
+import binary_format
+from eternity_puzzle import EternityPuzzle, GRAY, NORTH, SOUTH, WEST, EAST, ROTATION_SIDES
+
+
+def generate_instance(board_size, nbBorderColors=5, nbInteriorColors=17, seed=1):
+    """
+    Generate a solvable instance: a solution without conflict is planted by coloring the edges of the board, then its
+        pieces are shuffled and turned randomly. As in Eternity II, the edges between 2 pieces of the frame take the border
+        colors, the other edges between 2 pieces take the interior colors and the sides on the border are GRAY.
+    :param board_size: number of positions on a side of the board
+    :param nbBorderColors: number of colors of the edges of the frame (colors 1 to nbBorderColors)
+    :param nbInteriorColors: number of colors of the other edges (colors nbBorderColors + 1 to nbBorderColors + nbInteriorColors)
+    :param seed: seed of the random generator
+    :return: a tuple (pieces, solution) where pieces is an array (board_size ** 2, 4) of the pieces of the instance and
+        solution the array (board_size ** 2, 4) of the planted solution (pieces at each position, rotations applied)
+    """
+    if board_size < 1 or nbBorderColors < 1 or nbInteriorColors < 1:
+        raise Exception("The board size and the numbers of colors must be positive")
+    if nbBorderColors + nbInteriorColors > 255:
+        raise Exception("At most 255 colors (the binary format stores the colors on 1 byte)")
+
+    rng = np.random.default_rng(seed)
+    n = board_size
+    borderColors = (1, nbBorderColors + 1)
+    interiorColors = (nbBorderColors + 1, nbBorderColors + nbInteriorColors + 1)
+
+    # vertical[j, i]: color of the edge on the WEST side of position (i, j), vertical[j, n] is the EAST border
+    vertical = np.full((n, n + 1), GRAY)
+    vertical[:, 1:n] = rng.integers(*interiorColors, size=(n, n - 1))
+    vertical[[0, n - 1], 1:n] = rng.integers(*borderColors, size=(2, n - 1)) # between 2 pieces of the south/north rows
+
+    # horizontal[j, i]: color of the edge on the SOUTH side of position (i, j), horizontal[n, i] is the NORTH border
+    horizontal = np.full((n + 1, n), GRAY)
+    horizontal[1:n, :] = rng.integers(*interiorColors, size=(n - 1, n))
+    horizontal[1:n, [0, n - 1]] = rng.integers(*borderColors, size=(n - 1, 2)) # between 2 pieces of the west/east columns
+
+    # Planted solution, position k = board_size * j + i
+    solution = np.empty((n, n, 4), dtype=np.int64)
+    solution[:, :, NORTH] = horizontal[1:, :]
+    solution[:, :, SOUTH] = horizontal[:-1, :]
+    solution[:, :, WEST] = vertical[:, :-1]
+    solution[:, :, EAST] = vertical[:, 1:]
+    solution = solution.reshape(n * n, 4)
+
+    # Scramble: shuffled pieces, each one turned randomly
+    order = rng.permutation(n * n)
+    rotations = rng.integers(4, size=n * n)
+    pieces = np.take_along_axis(solution[order], np.array(ROTATION_SIDES)[rotations], axis=1)
+
+    return pieces, solution
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a solvable Eternity II instance and its hidden solution")
+    parser.add_argument('--size', type=int, default=16)
+    parser.add_argument('--border-colors', type=int, default=5)
+    parser.add_argument('--interior-colors', type=int, default=17)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--outfile', type=str, default=None, help="instance file, .e2b for the binary format "
+                                                                   "(generated_<size>.txt by default)")
+    parser.add_argument('--solution-file', type=str, default=None, help="hidden solution (<outfile>.solution by default)")
+    args = parser.parse_args()
+
+    outfile = args.outfile or 'generated_%d.txt' % args.size
+    solutionFile = args.solution_file or outfile + '.solution'
+
+    pieces, solution = generate_instance(args.size, args.border_colors, args.interior_colors, args.seed)
+    if outfile.endswith('.e2b'):
+        binary_format.write_boards(outfile, pieces[None], binary_format.INSTANCE)
+    else:
+        binary_format.write_text_instance(outfile, pieces)
+
+    # Check the instance written and the hidden solution
+    e = EternityPuzzle(outfile)
+    solution = list(map(tuple, solution.tolist()))
+    assert e.verify_solution(solution) and e.get_total_n_conflict(solution) == 0
+
+    if solutionFile.endswith('.e2b'):
+        binary_format.write_boards(solutionFile, [solution], binary_format.SOLUTIONS)
+    else:
+        e.print_solution(solution, solutionFile)
+
+    print("[INFO] instance %s: %d x %d, %d border colors, %d interior colors, seed %d" %
+          (outfile, args.size, args.size, args.border_colors, args.interior_colors, args.seed))
+    print("[INFO] hidden solution (0 conflicts): %s" % solutionFile)
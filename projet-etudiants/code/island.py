@@ -0,0 +1,187 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import json
+import multiprocessing
+import queue
+import random
+import time
+from collections import Counter
+from eternity_puzzle import GRAY, CORNER, INTERIOR
+from parallel import derive_seeds, init_worker
+
+
+class Migration:
+    """
+    Migration hook given to the solver of an island. The solver calls exchange() at each iteration with its current solution;
+        every `interval` seconds the best solution of the island is sent to the next island of the ring and the island
+        replaces its current solution if it received a better one.
+    """
+
+    def __init__(self, eternity_puzzle, islandId, inbox, outbox, interval, policy):
+        """
+        :param eternity_puzzle: object describing the input
+        :param islandId: index of the island
+        :param inbox: queue receiving the migrants of the previous island
+        :param outbox: queue of the next island
+        :param interval: number of seconds between two migrations
+        :param policy: 'replace' (the migrant replaces the current solution) or 'crossover' (the current solution is
+            recombined with the migrant)
+        """
+        self.eternity_puzzle = eternity_puzzle
+        self.islandId = islandId
+        self.inbox = inbox
+        self.outbox = outbox
+        self.interval = interval
+        self.policy = policy
+        self.startTime = time.time()
+        self.nextMigration = self.startTime + interval
+        self.bestScore = None
+        self.bestSolution = None
+        self.trajectory = [] # (elapsed seconds, best score of the island)
+        self.nbMigrantsAccepted = 0
+
+    def exchange(self, solution, score):
+        """
+        :param solution: current solution of the island
+        :param score: number of conflicts of `solution`
+        :return: a tuple (solution, cost) that replaces the current solution of the island, None to keep it
+        """
+        now = time.time()
+        if self.bestScore is None or score < self.bestScore:
+            self.bestScore = score
+            self.bestSolution = list(solution)
+            self.trajectory.append((round(now - self.startTime, 3), score))
+
+        if now < self.nextMigration:
+            return None
+        self.nextMigration = now + self.interval
+
+        # Send the best solution of the island (copied because the solver keeps modifying its solution)
+        self.outbox.put((self.bestScore, self.bestSolution))
+
+        # Keep the best migrant received since the last migration
+        migrant = None
+        while True:
+            try:
+                received = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if migrant is None or received[0] < migrant[0]:
+                migrant = received
+
+        # Only a weaker island takes the migrant
+        if migrant is None or migrant[0] >= score:
+            return None
+        self.nbMigrantsAccepted += 1
+
+        if self.policy == 'crossover':
+            child = crossover(self.eternity_puzzle, solution, migrant[1])
+            return child, self.eternity_puzzle.get_total_n_conflict(child)
+        return list(migrant[1]), migrant[0]
+
+
+def crossover(eternity_puzzle, solution, migrant):
+    """
+    Recombine `solution` with `migrant`: a random rectangle is copied from `migrant`, the other positions keep the pieces of
+        `solution` and the positions whose piece is already in the rectangle take the pieces left by the rectangle of the
+        same class (corner, edge or interior piece, frame pieces in their forced orientation), so the solvers moving the
+        pieces inside their pool (see get_position_pools) can still reach every arrangement
+    :return: the child solution (a copy of `solution` if the left pieces do not fit the freed positions)
+    """
+    n = eternity_puzzle.board_size
+    i1, i2 = sorted(random.sample(range(n + 1), 2))
+    j1, j2 = sorted(random.sample(range(n + 1), 2))
+    window = set(j * n + i for j in range(j1, j2) for i in range(i1, i2))
+
+    child = [None] * eternity_puzzle.n_piece
+    fromMigrant = Counter()
+    for k in window:
+        child[k] = migrant[k]
+        fromMigrant[eternity_puzzle.hash_piece(migrant[k])] += 1
+
+    # Pieces of `solution` in the window that are not taken from the migrant, by class (number of GRAY sides)
+    leftPieces = {}
+    for k in window:
+        pieceHash = eternity_puzzle.hash_piece(solution[k])
+        if fromMigrant[pieceHash] > 0:
+            fromMigrant[pieceHash] -= 1
+        else:
+            pieceClass = min(sum(1 for color in solution[k] if color == GRAY), CORNER)
+            leftPieces.setdefault(pieceClass, []).append(solution[k])
+
+    # `fromMigrant` now counts the migrant pieces that are still outside the window in `solution`
+    for k in range(eternity_puzzle.n_piece):
+        if k in window:
+            continue
+        pieceHash = eternity_puzzle.hash_piece(solution[k])
+        if fromMigrant[pieceHash] > 0:
+            fromMigrant[pieceHash] -= 1
+            positionClass = eternity_puzzle.position_class[k]
+            if not leftPieces.get(positionClass):
+                return list(solution)
+            piece = leftPieces[positionClass].pop()
+            if positionClass != INTERIOR:
+                piece = eternity_puzzle.get_frame_piece(piece, k)
+                if piece is None:
+                    return list(solution)
+            child[k] = piece
+        else:
+            child[k] = solution[k]
+
+    return child
+
+
+def run_island(solver, eternity_puzzle, islandId, seed, inbox, outbox, interval, policy, bestScore, results):
+    """
+    Entry point of the process of an island
+    """
+    init_worker(bestScore)
+    migration = Migration(eternity_puzzle, islandId, inbox, outbox, interval, policy)
+    solution, score = solver(eternity_puzzle, seed, migration)
+    migration.exchange(solution, score)  # last point of the trajectory
+    # Best solution seen by the migration hook over the whole run (at least as good as the one returned by the solver)
+    results.put((islandId, migration.bestSolution, migration.bestScore, migration.trajectory, migration.nbMigrantsAccepted))
+
+
+def solve_islands(eternity_puzzle, solver, nbIslands, interval, policy, seed=1, logFile=None):
+    """
+    Island model: `nbIslands` processes run `solver` on their own solution and periodically send their best solution to
+        the next island of a ring (see Migration)
+    :param eternity_puzzle: object describing the input
+    :param solver: function (eternity_puzzle, seed, migration) -> (solution, cost) run by each island
+    :param nbIslands: number of islands (processes)
+    :param interval: number of seconds between two migrations
+    :param policy: migration policy, 'replace' or 'crossover'
+    :param seed: master seed, each island gets its own seed derived from it
+    :param logFile: if given, the best score trajectory of each island is written in this file (one JSON line per island)
+    :return: a tuple (solution, cost) with the best solution of all the islands
+    """
+    assert policy in ('replace', 'crossover')
+
+    bestScore = multiprocessing.Value('i', 1000000)
+    inboxes = [multiprocessing.Queue() for _ in range(nbIslands)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_island,
+                                         args=(solver, eternity_puzzle, islandId, islandSeed, inboxes[islandId],
+                                               inboxes[(islandId + 1) % nbIslands], interval, policy, bestScore, results))
+                 for islandId, islandSeed in enumerate(derive_seeds(seed, nbIslands))]
+    for process in processes:
+        process.start()
+
+    # The results must be read before joining the processes (a process can't end while its queue is not emptied)
+    islands = sorted(results.get() for _ in range(nbIslands))
+    for process in processes:
+        process.join()
+
+    for islandId, solution, score, trajectory, nbMigrantsAccepted in islands:
+        print("[INFO] island %d: %d conflicts, %d migrants accepted" % (islandId, score, nbMigrantsAccepted))
+
+    if logFile is not None:
+        with open(logFile, "w") as file:
+            for islandId, solution, score, trajectory, nbMigrantsAccepted in islands:
+                file.write(json.dumps({"island": islandId, "best": score, "migrants": nbMigrantsAccepted,
+                                       "trajectory": trajectory}) + "\n")
+
+    _, solution, score, _, _ = min(islands, key=lambda island: island[2])
+    return solution, score
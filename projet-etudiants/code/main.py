@@ -2,22 +2,58 @@
 # Marco NOVAES 2166579
 
 import argparse
+import functools
+import sys
 import time
 import eternity_puzzle
-import solver_random
-import solver_heuristic
-import solver_local_search
-import solver_advanced
+import registry
+from checkpoint import Checkpoint
+from stats import SearchStats
+
+# Methods timed by --profile (calls made by every agent)
+PROFILED_METHODS = {
+    'puzzle': ['get_total_n_conflict', 'get_total_n_conflict_batch', 'get_local_n_conflict', 'get_facing_colors',
+               'exist_conflict_between_pieces', 'generate_rotation', 'get_move_delta', 'apply_move'],
+    'piece_index': ['lookup', 'restore_rotated_piece'],
+}
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser()
 
     # Instances parameters
-    parser.add_argument('--agent', type=str, default='random')
+    parser.add_argument('--agent', type=str, default='random', choices=registry.get_agent_names())
     parser.add_argument('--infile', type=str, default='input')
     parser.add_argument('--outfile', type=str, default='solution.txt')
     parser.add_argument('--visufile', type=str, default='visualization.png')
+    parser.add_argument('--no-visu', action='store_true', help="do not draw the solution (matplotlib is never imported)")
+
+    # Solver parameters
+    parser.add_argument('--workers', type=int, default=None, help="number of processes (advanced agent, 1 by default)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--node-limit', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=None, help="time budget in seconds (default of the agent otherwise)")
+    parser.add_argument('--target-conflicts', type=int, default=None, help="stop as soon as a solution has at most this "
+                                                                            "number of conflicts (0 by default)")
+    parser.add_argument('--config', type=str, default=None, help="JSON file with the hyperparameters of the agent")
+    parser.add_argument('--param', type=str, nargs='+', default=[], metavar='NAME=VALUE',
+                        help="hyperparameters of the agent (applied after --config)")
+
+    # Checkpoint parameters (advanced, tabu and annealing agents)
+    parser.add_argument('--checkpoint', type=str, default=None)
+    parser.add_argument('--checkpoint-interval', type=float, default=60.)
+    parser.add_argument('--resume', type=str, default=None)
+
+    # Island model parameters (advanced and local_search agents)
+    parser.add_argument('--islands', type=int, default=0)
+    parser.add_argument('--migration-interval', type=float, default=30.)
+    parser.add_argument('--migration-policy', type=str, default='replace', choices=['replace', 'crossover'])
+    parser.add_argument('--island-log', type=str, default=None)
+
+    # Telemetry parameters (JSON-lines progress events, '-' for stdout)
+    parser.add_argument('--telemetry', type=str, default=None)
+    parser.add_argument('--telemetry-interval', type=float, default=5.)
+    parser.add_argument('--profile', action='store_true')
 
     return parser.parse_args()
 
@@ -28,35 +64,74 @@ if __name__ == '__main__':
 
     e = eternity_puzzle.EternityPuzzle(args.infile)
 
+    # Only the module of the selected agent is imported
+    agentClass = registry.get_agent(args.agent)
+    config = agentClass.CONFIG.from_json(args.config) if args.config is not None else agentClass.CONFIG()
+    if 'workers' in config.DEFAULTS and args.workers is not None:
+        config.update(workers=args.workers)
+    if 'nodeLimit' in config.DEFAULTS and args.node_limit is not None:
+        config.update(nodeLimit=args.node_limit)
+    if 'timeLimit' in config.DEFAULTS and args.time_limit is not None:
+        config.update(timeLimit=args.time_limit)
+    if 'targetConflicts' in config.DEFAULTS and args.target_conflicts is not None:
+        config.update(targetConflicts=args.target_conflicts)
+    config.parse(args.param)
+    agent = agentClass(config)
+    workers = config.to_dict().get('workers', 1)
+
     print("***********************************************************")
     print("[INFO] Start the solving Eternity II")
     print("[INFO] input file: %s" % args.infile)
     print("[INFO] output file: %s" % args.outfile)
-    print("[INFO] visualization file: %s" % args.visufile)
+    print("[INFO] visualization file: %s" % (None if args.no_visu else args.visufile))
     print("[INFO] board size: %s x %s" % (e.board_size,e.board_size))
     print("[INFO] solver selected: %s" % args.agent)
+    print("[INFO] workers: %s" % workers)
+    print("[INFO] hyperparameters: %s" % config.to_dict())
     print("***********************************************************")
 
     start_time = time.time()
 
-
-    if args.agent == "random":
-        # Take the best of 1,000,000 random trials
-        solution, n_conflict = solver_random.solve_best_random(e, 100000)
-    elif args.agent == "heuristic":
-        # Agent based on a constructive heuristic (Phase 1)
-        solution, n_conflict = solver_heuristic.solve_heuristic(e)
-    elif args.agent == "local_search":
-        # Agent based on a local search (Phase 2)
-        solution, n_conflict = solver_local_search.solve_local_search(e)
-    elif args.agent == "advanced":
-        # Your nice agent (Phase 3 - main part of the project)
-        solution, n_conflict = solver_advanced.solve_advanced(e)
+    checkpoint = None
+    if args.checkpoint is not None or args.resume is not None:
+        if args.islands > 0 or not agentClass.supportsCheckpoint:
+            raise Exception("Checkpoints are only supported by the advanced, tabu and annealing agents")
+        # Periodic saves of the best solution, and/or a checkpoint or solution file as the starting solution
+        checkpoint = Checkpoint(e, args.checkpoint, args.checkpoint_interval, args.resume)
+        if checkpoint.incumbent is not None:
+            print("[INFO] resume from %s: %s conflicts" % (args.resume, checkpoint.bestScore))
+
+    # Progress events and opt-in timing of each call of the hot methods
+    if args.profile and (workers > 1 or args.islands > 0):
+        raise Exception("--profile is only supported with a single process (no --workers or --islands)")
+    if args.telemetry is None:
+        telemetry = None
+    elif args.telemetry == '-':
+        telemetry = sys.stdout
     else:
-        raise Exception("This agent does not exist")
+        telemetry = open(args.telemetry, 'w')
+    stats = SearchStats(telemetry, args.telemetry_interval, args.profile)
+    stats.profile_methods(e, PROFILED_METHODS['puzzle'])
+    if args.profile:
+        # Accessing piece_index builds it (see EternityPuzzle.piece_index): only for the searches profiled
+        stats.profile_methods(e.piece_index, PROFILED_METHODS['piece_index'])
+
+    if args.islands > 0 and agentClass.islandSearch is not None:
+        # Cooperative islands exchanging their best solutions every `migration_interval` seconds
+        import island
+        function = functools.partial(agentClass.islandSearch, timeLimit=config.timeLimit, targetConflicts=config.targetConflicts)
+        solution, n_conflict = island.solve_islands(e, function, args.islands, args.migration_interval,
+                                                    args.migration_policy, args.seed, args.island_log)
+    else:
+        solution, n_conflict = agent.solve(e, args.seed, stats, checkpoint)
     solving_time = round((time.time() - start_time) / 60,2)
+    stats.improve(n_conflict)
+    stats.close()
+    if telemetry is not None and telemetry is not sys.stdout:
+        telemetry.close()
 
-    e.display_solution(solution,args.visufile)
+    if not args.no_visu:
+        e.display_solution(solution,args.visufile)
     e.print_solution(solution, args.outfile)
 
 
@@ -67,3 +142,11 @@ if __name__ == '__main__':
     print("[INFO] Feasible solution: %s" % (n_conflict == 0))
     print("[INFO] Sanity check passed: %s" % e.verify_solution(solution))
     print("***********************************************************")
+
+    if args.profile:
+        print("[INFO] Time per function (cumulative, calls included)")
+        for name, (calls, seconds) in sorted(stats.functionTimes.items(), key=lambda item: -item[1][1]):
+            if calls == 0:
+                continue
+            print("[INFO] %-45s %10d calls %9.3f s %8.2f us/call" % (name, calls, seconds, 1e6 * seconds / max(calls, 1)))
+        print("***********************************************************")
@@ -0,0 +1,56 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import multiprocessing
+import numpy as np
+
+# Best score found by all the workers of the pool, set in each worker by init_worker()
+sharedBestScore = None
+
+
+def derive_seeds(seed, nbWorkers):
+    """
+    Derive independent seeds for the workers from a master seed (the same master seed always gives the same seeds)
+    :param seed: master seed
+    :param nbWorkers: number of seeds to generate
+    :return: list of `nbWorkers` seeds
+    """
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(nbWorkers)]
+
+
+def init_worker(bestScore):
+    """
+    Initialisation of each worker of the pool: keep a reference to the shared best score
+    :param bestScore: multiprocessing.Value shared by all the workers
+    """
+    global sharedBestScore
+    sharedBestScore = bestScore
+
+
+def publish_best_score(score):
+    """
+    Share `score` with the other workers if it is better than the best score found so far (no-op outside of a pool)
+    """
+    if sharedBestScore is None:
+        return
+    with sharedBestScore.get_lock():
+        if score < sharedBestScore.value:
+            sharedBestScore.value = score
+
+
+def is_solved_by_other_worker(targetConflicts=0):
+    """
+    :param targetConflicts: target number of conflicts of the search (None for no target)
+    :return: True if a worker of the pool has found a solution reaching the target (by default an optimal solution)
+    """
+    return sharedBestScore is not None and targetConflicts is not None and sharedBestScore.value <= targetConflicts
+
+
+def run_workers(function, argsList, nbWorkers):
+    """
+    Run `function` for each tuple of arguments of `argsList` in a pool of `nbWorkers` processes sharing their best score
+    :return: list of the results of `function` (same order as `argsList`)
+    """
+    bestScore = multiprocessing.Value('i', 1000000)
+    with multiprocessing.Pool(nbWorkers, initializer=init_worker, initargs=(bestScore,)) as pool:
+        return pool.starmap(function, argsList)
@@ -0,0 +1,133 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+
+class PieceIndex:
+    """
+    Index of the (piece, rotation) by color constraints. A pattern gives a color for each side (NORTH, SOUTH, WEST, EAST)
+        of a position, -1 meaning "any color". Each (piece, rotation) is stored once under the 16 patterns it matches, so the
+        pieces matching the colors around a position are found without testing all of them.
+        Removing or restoring a piece only changes its availability flag, the unavailable pieces are skipped by lookup().
+        Each (piece, rotation) is also stored by its GRAY sides, so lookup() can return only the legal placements of a
+        position: the corner and edge pieces in their forced orientation on the frame, the interior pieces inside.
+    """
+
+    def __init__(self, eternity_puzzle):
+        """
+        :param eternity_puzzle: object describing the input (all its pieces are available at the start)
+        """
+        self.eternity_puzzle = eternity_puzzle
+        # rotatedPieces[p][r] is the tuple of colors of piece `p` after `r` turns
+        self.rotatedPieces = [[tuple(rotatedPiece) for rotatedPiece in rotatedPieces]
+                              for rotatedPieces in eternity_puzzle.piece_table.tolist()]
+        self.available = [True] * eternity_puzzle.n_piece
+
+        self.buckets = {}
+        self.legalBuckets = {} # (GRAY sides, pattern) -> (piece, rotation)
+        for piece, rotatedPieces in enumerate(self.rotatedPieces):
+            for rotation, rotatedPiece in enumerate(rotatedPieces):
+                graySides = self.gray_sides(rotatedPiece)
+                for mask in range(16):
+                    pattern = self.pattern(rotatedPiece, mask)
+                    self.buckets.setdefault(pattern, []).append((piece, rotation))
+                    self.legalBuckets.setdefault((graySides, pattern), []).append((piece, rotation))
+
+        # Pieces with the same colors in some rotation (key: EternityPuzzle.hash_piece), used to restore a piece from its colors
+        self.sameColors = {}
+        for piece, rotatedPieces in enumerate(self.rotatedPieces):
+            self.sameColors.setdefault(min(rotatedPieces), []).append(piece)
+
+        # relaxedMasks[knownMask][d] are the sub-masks of `knownMask` with `d` sides less
+        self.relaxedMasks = [[[mask for mask in range(16) if mask & knownMask == mask
+                               and bin(knownMask).count("1") - bin(mask).count("1") == nbRelaxed]
+                              for nbRelaxed in range(bin(knownMask).count("1") + 1)] for knownMask in range(16)]
+
+    def pattern(self, colors, mask):
+        """
+        :return: the pattern keeping the colors of the sides in `mask` (bit `side` set) and -1 for the other sides
+        """
+        return (colors[0] if mask & 1 else -1, colors[1] if mask & 2 else -1,
+                colors[2] if mask & 4 else -1, colors[3] if mask & 8 else -1)
+
+    def gray_sides(self, colors):
+        """
+        :return: the sides of `colors` that are GRAY (color 0, bit `side` set)
+        """
+        return (colors[0] == 0) | (colors[1] == 0) << 1 | (colors[2] == 0) << 2 | (colors[3] == 0) << 3
+
+    def remove(self, piece):
+        """
+        Make `piece` unavailable (in all its rotations)
+        """
+        self.available[piece] = False
+
+    def restore(self, piece):
+        """
+        Make `piece` available again (in all its rotations)
+        """
+        self.available[piece] = True
+
+    def restore_rotated_piece(self, rotatedPiece):
+        """
+        Make available again a piece with the colors of `rotatedPiece` (in any rotation) that is currently unavailable
+        :return: index of the restored piece
+        """
+        for piece in self.sameColors.get(self.eternity_puzzle.hash_piece(rotatedPiece), []):
+            if not self.available[piece]:
+                self.available[piece] = True
+                return piece
+        raise Exception("No removed piece has the colors %s" % (rotatedPiece,))
+
+    def remove_all(self):
+        """
+        Make all the pieces unavailable
+        """
+        self.available = [False] * len(self.available)
+
+    def restore_all(self):
+        """
+        Make all the pieces available
+        """
+        self.available = [True] * len(self.available)
+
+    def lookup(self, facing, borderSides=None):
+        """
+        Find the available (piece, rotation) with the minimum number of conflicts for a position surrounded by `facing`.
+            The constraints are relaxed one side at a time: the pieces matching all the known sides have 0 conflict, the
+            pieces matching all the known sides but one have 1 conflict, ...
+        :param facing: colors facing the (NORTH, SOUTH, WEST, EAST) sides of the position, -1 for no constraint
+            (see get_facing_colors)
+        :param borderSides: border sides of the position (see EternityPuzzle.border_sides): only the (piece, rotation)
+            with their GRAY sides exactly on the border are returned, all of them if none is available.
+            None to consider all the (piece, rotation)
+        :return: a tuple (number of conflicts, sorted list of (piece, rotation)), (None, []) if no piece is available
+        """
+        if borderSides is not None:
+            n_conflict, candidates = self.search(facing, borderSides)
+            if candidates:
+                return n_conflict, candidates
+        return self.search(facing)
+
+    def search(self, facing, borderSides=None):
+        """
+        Relaxation search of lookup(), in the legal placements of a position with the border sides `borderSides` or in
+            all the placements if it is None
+        """
+        knownMask = 0
+        for side in range(4):
+            if facing[side] != -1:
+                knownMask |= 1 << side
+
+        available = self.available
+        buckets = self.buckets if borderSides is None else self.legalBuckets
+        for nbRelaxed, masks in enumerate(self.relaxedMasks[knownMask]):
+            candidates = set()
+            for mask in masks:
+                pattern = self.pattern(facing, mask)
+                for candidate in buckets.get(pattern if borderSides is None else (borderSides, pattern), ()):
+                    if available[candidate[0]]:
+                        candidates.add(candidate)
+            if candidates:
+                return nbRelaxed, sorted(candidates)
+
+        return None, []
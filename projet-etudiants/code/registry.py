@@ -0,0 +1,71 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import importlib
+
+# Module implementing each agent, imported only when the agent is selected
+AGENT_MODULES = {
+    'random': 'solver_random',
+    'heuristic': 'solver_heuristic',
+    'local_search': 'solver_local_search',
+    'advanced': 'solver_advanced',
+    'tabu': 'solver_tabu',
+    'annealing': 'solver_annealing',
+    'exact': 'solver_exact',
+}
+
+# Agent class of each registered agent (see register)
+AGENTS = {}
+
+
+def register(name):
+    """
+    Decorator registering an Agent subclass under `name`. The agents of this project register themselves when their module
+        is imported, an application can register its own agents the same way.
+    """
+    def decorator(agentClass):
+        AGENTS[name] = agentClass
+        agentClass.name = name
+        return agentClass
+    return decorator
+
+
+def get_agent_names():
+    """
+    :return: names of the agents of this project and of the agents registered by the application
+    """
+    return list(AGENT_MODULES) + [name for name in AGENTS if name not in AGENT_MODULES]
+
+
+def load_agent(agent):
+    """
+    :param agent: name of the agent (see AGENT_MODULES)
+    :return: the module implementing `agent` (imported on the first call)
+    """
+    if agent not in AGENT_MODULES:
+        raise Exception("This agent does not exist")
+    return importlib.import_module(AGENT_MODULES[agent])
+
+
+def get_agent(agent):
+    """
+    :param agent: name of the agent (see get_agent_names)
+    :return: the Agent subclass registered under `agent` (its module is imported on the first call)
+    """
+    if agent not in AGENTS:
+        load_agent(agent)
+    return AGENTS[agent]
+
+
+def create_agent(agent, config=None, **values):
+    """
+    :param agent: name of the agent (see get_agent_names)
+    :param config: Config of the agent (default values if None)
+    :param values: hyperparameters changed in the config
+    :return: a new instance of the agent, ready for setup()
+    """
+    agentClass = get_agent(agent)
+    if config is None:
+        config = agentClass.CONFIG()
+    config.update(**values)
+    return agentClass(config)
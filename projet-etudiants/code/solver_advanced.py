@@ -1,83 +1,210 @@
 # Myriam KIRIAKOS 1888929
 # Marco NOVAES 2166579
 
-import copy
-import time
+import json
+import math
+import os
 import random
+import time
 import numpy as np
+import registry
+from agent import Agent, Config, run_search
+from alns import OperatorWeights
+from assignment import get_placement_costs, solve_assignment
+from deadline import Deadline
 from eternity_puzzle import NORTH, SOUTH, WEST, EAST
+from frame import solve_frame
+from parallel import derive_seeds, publish_best_score, is_solved_by_other_worker, run_workers
+from solver_local_search import get_position_pools
+from trail import Trail
+from stats import SearchStats
+from checkpoint import Checkpoint
+from conflict_tracker import ConflictTracker
+from zobrist import ScoreCache, ZobristTable
+
+# Hyperparameters of each board size (proportionWorst, proportionRandom, limitIterNoImprovement, nbRepairIter)
+HYPERPARAMETERS = {
+    4: (0.15, 0.15, 150, 150), # Instance A
+    7: (0.075, 0.15, 75, 75), # Instance B
+    8: (0.075, 0.075, 75, 75), # Instance C
+    9: (0.075, 0.15, 150, 75), # Instance D
+    10: (0.15, 0.075, 150, 150), # Instance E
+    16: (0.075, 0.075, 75, 75), # Instance complet
+}
+HYPERPARAMETER_NAMES = ('proportionWorst', 'proportionRandom', 'limitIterNoImprovement', 'nbRepairIter')
+
+# Destroy operators of the ALNS (see iterate_advanced): 'independent' is repaired by optimal assignment, the others by
+# the greedy randomized repair
+DESTROY_OPERATORS = ('worst_random', 'window', 'lines', 'cluster', 'border', 'independent')
+
+# Hyperparameters of the ALNS and of the initial solutions, same values for every board size
+OPERATOR_HYPERPARAMETERS = {
+    'operators': DESTROY_OPERATORS, # destroy operators chosen by the ALNS
+    'proportionIndependent': 0.5, # maximum proportion of the positions de-assigned by the independent set destroy
+    'reactionFactor': 0.2, # weight of the last segment in the update of the weights of the operators (see OperatorWeights)
+    'segmentLength': 25, # number of iterations between two updates of the weights of the operators
+    'minOperatorWeight': 0.05, # minimum weight of an operator
+    'frameNodeLimit': 100000, # node limit of the frame solver of the initial solutions (see solve_frame), 0 to disable it
+}
+
+# Hyperparameters found by tuning.py for each board size, loaded on the first search and preferred to HYPERPARAMETERS
+TUNED_HYPERPARAMETERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tuned_hyperparameters.json')
+tunedHyperparameters = None
+
+def load_tuned_hyperparameters(path=TUNED_HYPERPARAMETERS_FILE):
+    """
+    :param path: JSON file {board size: {hyperparameter: value}} written by tuning.py
+    :return: dictionary {board size: {hyperparameter: value}}, empty if the file does not exist
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        tuned = {int(board_size): values for board_size, values in json.load(file).items()}
+    for board_size, values in tuned.items():
+        if not set(HYPERPARAMETER_NAMES) <= set(values) <= set(HYPERPARAMETER_NAMES) | set(OPERATOR_HYPERPARAMETERS):
+            raise Exception("%s: the hyperparameters of the board size %d must be %s (and optionally %s)" %
+                            (path, board_size, ", ".join(HYPERPARAMETER_NAMES), ", ".join(OPERATOR_HYPERPARAMETERS)))
+    return tuned
+
+def get_hyperparameters(board_size, hyperparameters=None):
+    """
+    :param board_size: number of positions on a side of the board
+    :param hyperparameters: dictionary {name: value} overriding the values of the board size (None values are ignored)
+    :return: dictionary {name: value} of the hyperparameters of the search (see HYPERPARAMETER_NAMES and
+        OPERATOR_HYPERPARAMETERS): the tuned values of the board size, else the values of HYPERPARAMETERS, else the values
+        of the closest board size
+    """
+    global tunedHyperparameters
+    if tunedHyperparameters is None:
+        tunedHyperparameters = load_tuned_hyperparameters()
+
+    known = {size: dict(zip(HYPERPARAMETER_NAMES, values)) for size, values in HYPERPARAMETERS.items()}
+    known.update(tunedHyperparameters)
+    closestSize = min(known, key=lambda size: (abs(size - board_size), size))
+    values = dict(OPERATOR_HYPERPARAMETERS)
+    values.update(known[closestSize])
+    if hyperparameters is not None:
+        values.update((name, value) for name, value in hyperparameters.items() if value is not None)
+    return values
 
-def solve_advanced(eternity_puzzle):
+def solve_advanced(eternity_puzzle, workers=1, seed=1, timeLimit=3600, stats=None, checkpoint=None, hyperparameters=None,
+                   targetConflicts=0):
     """
     Your solver for the problem
     :param eternity_puzzle: object describing the input
+    :param workers: number of processes running independent restarts (see search_advanced)
+    :param seed: master seed, each worker gets its own seed derived from it
+    :param timeLimit: time budget in seconds
+    :param stats: SearchStats recording the progress of the search (optional), with several workers only the final
+        best score is recorded
+    :param checkpoint: Checkpoint hook saving the best solution and giving the starting solution (optional), with several
+        workers all of them start from the same solution and only the final best solution is saved
+    :param hyperparameters: dictionary overriding the hyperparameters of the board size (see get_hyperparameters)
+    :param targetConflicts: the search stops when a solution has at most this number of conflicts
     :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
         cost is the cost of the solution
     """
-   
-    def get_conflict_one_piece(i, j, solution):
-        """
-        Get the number of conflict for position [i,j] in `solution`
-        :param i: line of the piece
-        :param j: column of the piece
-        :return: number of conflict for one position [i,j] in `solution` 
-        """
-        n_conflict = 0
+    if workers <= 1:
+        return search_advanced(eternity_puzzle, seed, timeLimit=timeLimit, stats=stats, checkpoint=checkpoint,
+                               hyperparameters=hyperparameters, targetConflicts=targetConflicts)
 
-        # The first condition in if statements is to ignore non-assigned neighboors
+    # Every worker stops as soon as one of them reaches the target, the best of all workers is kept
+    if checkpoint is not None and stats is not None:
+        checkpoint.restore_stats(stats)
+    workerCheckpoint = checkpoint.for_worker() if checkpoint is not None else None
+    results = run_workers(search_advanced_worker, [(eternity_puzzle, workerSeed, timeLimit, workerCheckpoint, hyperparameters,
+                                                    targetConflicts)
+                                                   for workerSeed in derive_seeds(seed, workers)], workers)
+    bestSolution, bestScore, _ = min(results, key=lambda result: result[1])
+    # One report for all the workers (their logs would interleave)
+    report = {'restarts': sum(report['restarts'] for _, _, report in results),
+              'iterations': sum(report['iterations'] for _, _, report in results),
+              'duplicateRepairs': sum(report['duplicateRepairs'] for _, _, report in results),
+              'operators': OperatorWeights.merge([report['operators'] for _, _, report in results])}
+    print_search_report(report, workers)
+    if stats is not None:
+        stats.improve(bestScore)
+        stats.tick(restarts=report['restarts'], iteration=report['iterations'], duplicateRepairs=report['duplicateRepairs'])
+    if checkpoint is not None:
+        checkpoint.improve(bestSolution, bestScore)
+        checkpoint.save(stats)
+    return bestSolution, bestScore
 
-        if solution[i+1][j] and solution[i][j][NORTH] != solution[i+1][j][SOUTH]:
-            n_conflict+=1
-
-        if solution[i-1][j] and solution[i][j][SOUTH] != solution[i-1][j][NORTH]:
-            n_conflict+=1
-        
-        if solution[i][j+1] and solution[i][j][EAST] != solution[i][j+1][WEST]:
-            n_conflict+=1
+def search_advanced_worker(eternity_puzzle, seed, timeLimit, checkpoint, hyperparameters, targetConflicts):
+    """
+    Search of a worker of solve_advanced(): the statistics of the search are returned to the parent process instead of
+        being printed
+    :return: a tuple (solution, cost, statistics of the search (see print_search_report))
+    """
+    report = {}
+    solution, score = search_advanced(eternity_puzzle, seed, None, timeLimit, None, checkpoint, hyperparameters,
+                                      targetConflicts, report)
+    return solution, score, report
 
-        if solution[i][j-1] and solution[i][j][WEST] != solution[i][j-1][EAST]:
-            n_conflict+=1
+def print_search_report(report, nbWorkers=1):
+    """
+    Print the statistics of a search, or of all the workers of solve_advanced()
+    :param report: dictionary {restarts, iterations, duplicateRepairs, operators (OperatorWeights)} filled by iterate_advanced()
+    :param nbWorkers: number of searches whose statistics are summed in `report`
+    """
+    print("[INFO] advanced search%s: %d restarts, %d iterations, %d duplicate repairs" %
+          ("" if nbWorkers == 1 else " (%d workers)" % nbWorkers, report['restarts'], report['iterations'],
+           report['duplicateRepairs']))
+    for line in report['operators'].report():
+        print("[INFO]   operator %s" % line)
 
-        return n_conflict
+def search_advanced(eternity_puzzle, seed, migration=None, timeLimit=3600, stats=None, checkpoint=None, hyperparameters=None,
+                    targetConflicts=0, report=None):
+    """
+    GRASP restarts + LNS until the time limit or a solution reaching the target (found by this search or another worker)
+    :param eternity_puzzle: object describing the input
+    :param seed: seed of the random generator
+    :param migration: migration hook of the island model (see island.Migration), None if the search runs alone
+    :param timeLimit: time budget in seconds, the search stops within a few milliseconds after it (see Deadline)
+    :param stats: SearchStats recording the progress of the search (optional), a repaired solution is counted as an
+        evaluation
+    :param checkpoint: Checkpoint hook saving the best solution and giving the starting solution of the first restart
+        (optional)
+    :param hyperparameters: dictionary overriding the hyperparameters of the board size (see get_hyperparameters)
+    :param targetConflicts: the search stops when a solution has at most this number of conflicts
+    :param report: dictionary filled with the statistics of the search instead of printing them (see print_search_report),
+        None to print them
+    :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
+        cost is the cost of the solution
+    """
+    return run_search(iterate_advanced(eternity_puzzle, seed, migration, timeLimit, stats, checkpoint, hyperparameters,
+                                       targetConflicts, report))
 
+def iterate_advanced(eternity_puzzle, seed, migration=None, timeLimit=3600, stats=None, checkpoint=None, hyperparameters=None,
+                     targetConflicts=0, report=None):
+    """
+    Search of search_advanced() as a generator yielding (best solution, best cost) after each destroy/repair iteration
+        (see Agent.iterate)
+    """
+   
     def choose_piece(i, j, solution, pieces):
         """
         Assign a piece to position [i,j] (criteria defined in dealing_with_piece() header)
         :param i: x coordinate of the position to fill
         :param j: y coordinate of the position to fill
-        :param solution: current solution (list of list)
-        :param pieces: list of remaining pieces
+        :param solution: current solution (flat list, (-1, -1, -1, -1) for non-assigned positions)
+        :param pieces: index of the remaining pieces (see PieceIndex)
         """
-        # Minimum number of conflicts for position [i,j] using the remaining pieces. 
-        # Initialised to 4 (upper bound) and the value will be reduced when testing all possibilities
-        n_less_conflict = 5
-        best_pieces = []
-        for index, piece in enumerate(pieces):
-
-            # Get list with the 4 possibles values for a piece applying rotations
-            all_rotation_for_piece = eternity_puzzle.generate_rotation(piece)
-            for rotatedPiece in all_rotation_for_piece:
-                # Check if `rotatedPiece` is the best choice (criteria defined in dealing_with_piece() header)
-                solution[i][j] = rotatedPiece
-                currentNbConflicts = get_conflict_one_piece(i, j, solution)
-
-                if currentNbConflicts < n_less_conflict:
-                    best_pieces = [(index, rotatedPiece)]
-                    n_less_conflict = currentNbConflicts
-                
-                elif currentNbConflicts == n_less_conflict:
-                    best_pieces.append(((index, rotatedPiece)))
-        
-        chosen_index, chosen_piece = random.choice(best_pieces)
-        solution[i][j] = chosen_piece
-        pieces.pop(chosen_index)
+        k = i * eternity_puzzle.board_size + j
+        # The index gives all the remaining (piece, rotation) with the minimum number of conflicts for position [i,j]
+        # (only the legal placements: forced orientation of the corner and edge pieces on the frame)
+        _, best_pieces = pieces.lookup(eternity_puzzle.get_facing_colors(k, solution), eternity_puzzle.border_sides[k])
+
+        chosen_piece, chosen_rotation = random.choice(best_pieces)
+        solution[k] = pieces.rotatedPieces[chosen_piece][chosen_rotation]
+        pieces.remove(chosen_piece)
         
     def add_corners(coord_corners, solution, pieces):
         """
         Assign a piece to each corner
         :param coord_corners: list with the coordinates of the corners of the current perimeter (from outside to inside)
-        :param solution: current solution (list of list)
-        :param pieces: list of remaining pieces
+        :param solution: current solution (flat list)
+        :param pieces: index of the remaining pieces (see PieceIndex)
         """
         # Check if perimeter of size 1
         if coord_corners[0] == coord_corners[1]: 
@@ -90,8 +217,8 @@ def solve_advanced(eternity_puzzle):
         """
         Assign a piece to each case in the current perimeter (execept corners)
         :param coord_corners: list with the coordinates of the corners of the current perimeter (from outside to inside)
-        :param solution: current solution (list of list)
-        :param pieces: list of remaining pieces
+        :param solution: current solution (flat list)
+        :param pieces: index of the remaining pieces (see PieceIndex)
         """
         size = coord_corners[1][1] - coord_corners[0][1] - 1
         # Loop to cover the 4 sides of the current perimeter (execept corners)
@@ -118,13 +245,22 @@ def solve_advanced(eternity_puzzle):
         """
         ### INITIALISATION ###
         n = eternity_puzzle.board_size
-        pieces = copy.copy(eternity_puzzle.piece_list)
-        m = n + 2
-        coord_corners = [[1, 1], [1, n], [n, n], [n, 1]]
+        pieces = eternity_puzzle.piece_index
+        pieces.restore_all()
+        coord_corners = [[0, 0], [0, n-1], [n-1, n-1], [n-1, 0]]
         notFinished = True
 
-        #Create format solution with an additional external perimeter fill with (0, 0, 0, 0) 
-        solution = [[(0, 0, 0, 0) if (i == 0 or j == 0 or i == m-1 or j == m-1) else None for i in range(m)] for j in range(m)] 
+        # Flat solution, -1 is a neutral value for non-assigned positions (see get_local_n_conflict)
+        solution = [(-1, -1, -1, -1)] * eternity_puzzle.n_piece
+
+        ### FRAME WITHOUT CONFLICT (DFS) ###
+        # The interior is built from a frame without conflict if the frame solver finds one within its node limit
+        frame = solve_frame(eternity_puzzle, frameNodeLimit) if frameNodeLimit != 0 and n > 2 else None
+        if frame is not None:
+            for k, piece, rotation in frame:
+                solution[k] = pieces.rotatedPieces[piece][rotation]
+                pieces.remove(piece)
+            update_corners(coord_corners)
 
         ### SOLUTION CONSTRUCTION (GREEDY HEURISTIC) ###
         while notFinished:
@@ -135,176 +271,445 @@ def solve_advanced(eternity_puzzle):
                 update_corners(coord_corners)
             else:
                 notFinished = False
-        
-        # remove the border and flatten to fit the formatting solution
-        solution = [pos for piece in solution for pos in piece if pos != (0,0,0,0)]
+
         return solution, eternity_puzzle.get_total_n_conflict(solution)
 
-    def repair_choose_piece(removedIdxs, solution, pieces):
+    def repair_choose_piece(removedIdxs, trail, pieces):
         """
         Assign a piece that generate the minimum number of conflicts to position `k` 
         :param removedIdxs: list of indexes of the cases to fill
-        :param solution: current solution (list of list)
-        :param pieces: list of remaining pieces
+        :param trail: Trail of the current solution, the pieces are placed in place through it
+        :param pieces: index of the remaining pieces (see PieceIndex)
+        :return: number of conflicts added by the placed pieces (with the border and the pieces already placed)
         """
+        solution = trail.solution
+        n_conflict = 0
         for k in removedIdxs:
-            # Minimum number of conflicts for position `k` using the remaining pieces. 
-            # Initialised to 5 (upper bound) and the value will be reduced while testing all possibilities
-            n_less_conflict = 5
-            optimalMatchFound = False
-            for index, piece in enumerate(pieces):
-
-                # Get list with the 4 possibles values for a piece applying rotations
-                all_rotation_for_piece = eternity_puzzle.generate_rotation(piece)
-                random.shuffle(all_rotation_for_piece) # Add some diversity
-                for rotatedPiece in all_rotation_for_piece:
-                    # Check if `rotatedPiece` is one of the best choices (criteria defined in header)
-                    solution[k] = rotatedPiece
-                    currentNbConflicts = eternity_puzzle.get_local_n_conflict(k, solution)
-
-                    if currentNbConflicts < n_less_conflict:
-                        best_piece = (index, rotatedPiece)
-                        n_less_conflict = currentNbConflicts
-                        # If a non-conflicting piece is found, the search is stopped
-                        if currentNbConflicts == 0:
-                            pieces.pop(index)
-                            optimalMatchFound = True # Bool to handle when a non-conflicting piece is found
-                            break
-                if optimalMatchFound:
-                    break # Force to move to the next index 
+            # The index gives all the remaining (piece, rotation) with the minimum number of conflicts for position `k`,
+            # one of them is picked randomly to add some diversity (only the legal placements, see PieceIndex.lookup)
+            n_relaxed, best_pieces = pieces.lookup(eternity_puzzle.get_facing_colors(k, solution), eternity_puzzle.border_sides[k])
 
-            # Update variables with the best non-optimal piece found
-            if not optimalMatchFound:        
-                chosen_index, chosen_piece = best_piece
-                solution[k] = chosen_piece
-                pieces.pop(chosen_index)
+            chosen_piece, chosen_rotation = random.choice(best_pieces)
+            trail.set(k, pieces.rotatedPieces[chosen_piece][chosen_rotation])
+            pieces.remove(chosen_piece)
+            # Each edge of `k` with an assigned neighbour or the border is counted once, when its last piece is placed
+            n_conflict += n_relaxed
+        return n_conflict
 
-    def destroy(solution, nbWorst, nbRandom):
+    def select_worst_random(nbWorst, nbRandom):
         """
-        De-assign `nbWorst` + `nbRandom` pieces from `solution`
-        :param solution: current solution 
-        :param nbWorst: number of pieces to be de-assigned by selecting the pieces with the most conflicts first
-        :param nbRandom: number of pieces to be de-assigned by selecting randomly
-        :return : destroyed solution, list of indexes of de-assigned cases, list of de-assigned pieces
+        :param nbWorst: number of positions selected by taking the positions with the most conflicts first
+        :param nbRandom: number of positions selected randomly
+        :return: list of the `nbWorst` + `nbRandom` selected positions
         """
         ### Selection of `nbWorst` worst pieces ###
-        if nbWorst != 0:
-            listConflicts = np.empty(eternity_puzzle.n_piece)
-            for index, piece in enumerate(solution):
-                np.put(listConflicts, index, eternity_puzzle.get_local_n_conflict(index, solution))
-            idxWorst = set(np.argpartition(listConflicts, -nbWorst)[-nbWorst:])
-        else:
-            idxWorst = set()
+        # The conflicts of each position are maintained by `tracker`, the worst positions are read in its buckets
+        idxWorst = set(tracker.worst(nbWorst))
 
         ### Selection of `nbRandom` random pieces ###
         # Make sure that `idxWorst` and `idxRandom` are disjoint sets
         randomCandidates = set(range(eternity_puzzle.n_piece)) - idxWorst 
-        idxRandom = random.sample(randomCandidates, nbRandom)
+        idxRandom = random.sample(sorted(randomCandidates), nbRandom)
+
+        return list(idxWorst) + idxRandom
+
+    def select_window(nbCells):
+        """
+        :return: positions of a random square window of about `nbCells` positions
+        """
+        n = eternity_puzzle.board_size
+        side = min(n, max(2, round(math.sqrt(nbCells))))
+        i0 = random.randint(0, n - side)
+        j0 = random.randint(0, n - side)
+        return [(j0 + j) * n + i0 + i for j in range(side) for i in range(side)]
+
+    def select_lines(nbCells):
+        """
+        :return: positions of random whole rows, or of random whole columns, about `nbCells` positions
+        """
+        n = eternity_puzzle.board_size
+        lines = random.sample(range(n), min(n, max(1, round(nbCells / n))))
+        if random.random() < 0.5:
+            return [j * n + i for j in lines for i in range(n)] # rows
+        return [j * n + i for i in lines for j in range(n)] # columns
+
+    def select_cluster(nbCells):
+        """
+        :return: `nbCells` positions grown from random conflicting positions through their conflicting neighbours, then
+            (when no conflicting position is left) through any neighbour
+        """
+        n = eternity_puzzle.board_size
+        selected = []
+        inCluster = set()
+
+        def neighbours(k):
+            i = k % n
+            return [neighbour for neighbour, isInside in ((k - 1, i > 0), (k + 1, i < n - 1), (k - n, k >= n),
+                                                          (k + n, k + n < eternity_puzzle.n_piece)) if isInside]
 
-        ### Generate variables to return ###
-        idxWorst = list(idxWorst)
-        removedIdxs = idxWorst + idxRandom
+        # Clusters of conflicting positions
+        while len(selected) < nbCells:
+            seeds = [k for k in tracker.conflicting() if k not in inCluster]
+            if not seeds:
+                break
+            frontier = [random.choice(seeds)]
+            inCluster.add(frontier[0])
+            while frontier and len(selected) < nbCells:
+                k = frontier.pop(random.randrange(len(frontier)))
+                selected.append(k)
+                for neighbour in neighbours(k):
+                    if neighbour not in inCluster and tracker.conflicts[neighbour] > 0:
+                        inCluster.add(neighbour)
+                        frontier.append(neighbour)
+
+        # Few conflicts: the clusters grow with the neighbours of the selected positions
+        if not selected:
+            selected.append(random.randrange(eternity_puzzle.n_piece))
+            inCluster.add(selected[0])
+        while len(selected) < nbCells:
+            boundary = sorted({neighbour for k in selected for neighbour in neighbours(k) if neighbour not in inCluster})
+            if not boundary:
+                break
+            k = random.choice(boundary)
+            inCluster.add(k)
+            selected.append(k)
+        return selected
+
+    def select_border(nbCells):
+        """
+        :return: up to `nbCells` random positions of the border ring (corners and edges)
+        """
+        return random.sample(borderRing, min(nbCells, len(borderRing)))
+
+    def destroy(trail, removedIdxs):
+        """
+        De-assign the pieces of the positions `removedIdxs` in place (reverted by trail.undo())
+        :param trail: Trail of the current solution
+        :param removedIdxs: positions to de-assign (see the select_* functions)
+        :return : a tuple (list of de-assigned pieces, number of conflicts removed with them)
+        """
+        solution = trail.solution
         removedPieces = [solution[idx] for idx in removedIdxs]
-        initDestroyedSolution = copy.copy(solution)
+        n_conflict = 0
         for idx in removedIdxs:
-            # -1 is a neutral value, it can't generate a conflict in function `get_local_n_conflict()`
-            initDestroyedSolution[idx] = (-1, -1, -1, -1)
+            # -1 is a neutral value, it can't generate a conflict in function `get_local_n_conflict()`: the edges with
+            # the positions already de-assigned are not counted twice
+            n_conflict += eternity_puzzle.get_local_n_conflict(idx, solution)
+            trail.set(idx, (-1, -1, -1, -1))
         
-        return initDestroyedSolution, removedIdxs, removedPieces
+        return removedPieces, n_conflict
+
+    def destroy_independent(solution, nbCells):
+        """
+        Select up to `nbCells` pairwise non-adjacent positions, the positions with conflicts first (in random order).
+            As no 2 selected positions share an edge, the best re-assignment of their pieces is an assignment problem
+            (see repair_assignment).
+        :param solution: current solution
+        :param nbCells: maximum number of positions to select
+        :return: list of the selected positions
+        """
+        n = eternity_puzzle.board_size
+        conflicting = tracker.conflicting()
+        others = list(tracker.buckets[0])
+        random.shuffle(conflicting)
+        random.shuffle(others)
+
+        selected = []
+        blocked = set() # selected positions and their neighbours
+        for k in conflicting + others:
+            if k in blocked:
+                continue
+            selected.append(k)
+            if len(selected) == nbCells:
+                break
+            i = k % n
+            blocked.add(k)
+            if i > 0:
+                blocked.add(k - 1)
+            if i < n - 1:
+                blocked.add(k + 1)
+            blocked.add(k - n)
+            blocked.add(k + n)
+        return selected
+
+    def repair_assignment(solution, cells):
+        """
+        Optimal re-assignment of the pieces of `cells` (pairwise non-adjacent, see destroy_independent): each piece with its
+            best rotation at each cell gives a cost matrix, the assignment of minimum cost is found with the Hungarian
+            algorithm
+        :param solution: current solution (unchanged)
+        :param cells: positions de-assigned
+        :return: a tuple (new pieces of `cells`, variation of the number of conflicts), the variation is never positive
+        """
+        pieces = [solution[k] for k in cells]
+        costs, rotations, placed = get_placement_costs(eternity_puzzle, cells, pieces, solution)
+        assigned = solve_assignment(costs)
+
+        newPieces = [tuple(placed[assigned[cell], rotations[cell, assigned[cell]]].tolist()) for cell in range(len(cells))]
+        # Cost of the current placement: each piece is at its own cell with its current rotation (rotation 0)
+        delta = int(costs[np.arange(len(cells)), assigned].sum()) - sum(eternity_puzzle.get_local_n_conflict(k, solution)
+                                                                        for k in cells)
+        return newPieces, delta
 
     ### INITIALISATION ###
-    start_time = time.time()  
-    random.seed(1)
-    isOptimal = False # Bool to stop search if optimal solution (zero conflicts) is found
+    deadline = Deadline(timeLimit, targetConflicts)
+    random.seed(seed)
+    if stats is None:
+        stats = SearchStats()
+    if checkpoint is None:
+        checkpoint = Checkpoint(eternity_puzzle)
+    checkpoint.restore_random()
+    checkpoint.restore_stats(stats)
+    # Opt-in timing of each call of the helpers (see SearchStats.profiled)
+    generate_initial_solution = stats.profiled(generate_initial_solution, 'generate_initial_solution')
+    repair_choose_piece = stats.profiled(repair_choose_piece, 'repair_choose_piece')
+    destroy = stats.profiled(destroy, 'destroy')
+    select_cluster = stats.profiled(select_cluster, 'select_cluster')
+    destroy_independent = stats.profiled(destroy_independent, 'destroy_independent')
+    repair_assignment = stats.profiled(repair_assignment, 'repair_assignment')
     bestSolution = None
-    bestScore = 1000 # init to upper bound
+    bestScore = eternity_puzzle.n_total_connection + 1 # upper bound: the first restart is always recorded
     solution = None
 
     # Hyperparameters
-    timeLimit = 60
-    if eternity_puzzle.board_size == 4: # Instance A
-        proportionWorst = 0.15
-        proportionRandom = 0.15
-        limitIterNoImprovement = 150
-        nbRepairIter = 150
-    elif eternity_puzzle.board_size == 7: # Instance B
-        proportionWorst = 0.075
-        proportionRandom = 0.15
-        limitIterNoImprovement = 75
-        nbRepairIter = 75
-    elif eternity_puzzle.board_size == 8: # Instance C
-        proportionWorst = 0.075
-        proportionRandom = 0.075
-        limitIterNoImprovement = 75
-        nbRepairIter = 75
-    elif eternity_puzzle.board_size == 9: # Instance D
-        proportionWorst = 0.075
-        proportionRandom = 0.15
-        limitIterNoImprovement = 150
-        nbRepairIter = 75
-    elif eternity_puzzle.board_size == 10: # Instance E
-        proportionWorst = 0.15
-        proportionRandom = 0.075
-        limitIterNoImprovement = 150
-        nbRepairIter = 150
-    elif eternity_puzzle.board_size == 16: # Instance complet
-        proportionWorst = 0.075
-        proportionRandom = 0.075
-        limitIterNoImprovement = 75
-        nbRepairIter = 75
-    else: # Unknown instance
-        proportionWorst = 0.075
-        proportionRandom = 0.075
-        limitIterNoImprovement = 75
-        nbRepairIter = 75
+    hyperparameters = get_hyperparameters(eternity_puzzle.board_size, hyperparameters)
+    proportionWorst = hyperparameters['proportionWorst']
+    proportionRandom = hyperparameters['proportionRandom']
+    limitIterNoImprovement = hyperparameters['limitIterNoImprovement']
+    nbRepairIter = hyperparameters['nbRepairIter']
+    if nbRepairIter < 1:
+        raise Exception("nbRepairIter must be at least 1, not %s" % nbRepairIter)
+
+    proportionIndependent = hyperparameters['proportionIndependent']
+    frameNodeLimit = hyperparameters['frameNodeLimit']
 
     nbWorst = round(eternity_puzzle.n_piece*proportionWorst)
     nbRandom = round(eternity_puzzle.n_piece*proportionRandom)
+    nbDestroyed = max(1, nbWorst + nbRandom) # size of the destroy of the other greedy repaired operators
+    nbIndependent = max(2, round(eternity_puzzle.n_piece*proportionIndependent))
+
+    # ALNS: the destroy operator of each iteration is chosen by roulette wheel on weights learned during the search
+    for operator in hyperparameters['operators']:
+        if operator not in DESTROY_OPERATORS:
+            raise Exception("Unknown destroy operator %s (operators: %s)" % (operator, ", ".join(DESTROY_OPERATORS)))
+    operatorWeights = OperatorWeights(hyperparameters['operators'], hyperparameters['reactionFactor'],
+                                      hyperparameters['segmentLength'], hyperparameters['minOperatorWeight'])
+    selections = {
+        'worst_random': lambda: select_worst_random(nbWorst, nbRandom),
+        'window': lambda: select_window(nbDestroyed),
+        'lines': lambda: select_lines(nbDestroyed),
+        'cluster': lambda: select_cluster(nbDestroyed),
+        'border': lambda: select_border(nbDestroyed),
+    }
+    corners, edges, _ = get_position_pools(eternity_puzzle)
+    borderRing = corners + edges
+
+    # Boards already scored: the restarts revisiting a board are not re-scored (the score of a repair is counted during
+    # the repair, its hash only detects the repairs rebuilding the same board)
+    zobrist = ZobristTable(eternity_puzzle)
+    scoreCache = ScoreCache()
+    nbDuplicates = 0 # repairs identical to another repair of the same batch
     
     ### RESTART ###
     nbRestart = 0
-    while round((time.time() - start_time) / 60,2) < timeLimit and not isOptimal:
+    nbIterations = 0
+    # The first restart always runs, so that a solution is returned even with a tiny time limit
+    while nbRestart == 0 or (not deadline.reached(bestScore) and not deadline.expired()
+                             and not is_solved_by_other_worker(targetConflicts)):
         nbRestart += 1
 
         ### GENERATE INITIAL SOLUTION (GRASP) ###
-        solution, nbConflicts = generate_initial_solution()
+        if nbRestart == 1 and checkpoint.incumbent is not None:
+            # Resume: the first restart improves the solution of the checkpoint
+            solution = list(checkpoint.incumbent)
+        else:
+            with stats.phase('construct'):
+                solution, nbConflicts = generate_initial_solution()
         
         ### LOCAL SEARCH (LNS) ###
         destroyIter = 0
-        bestScoreRestart = eternity_puzzle.get_total_n_conflict(solution)
-        while destroyIter < limitIterNoImprovement and round((time.time() - start_time) / 60,2) < timeLimit and not isOptimal:
+        solutionHash = zobrist.hash_solution(solution)
+        tracker = ConflictTracker(eternity_puzzle, solution)
+        bestScoreRestart = scoreCache.get(solutionHash)
+        if bestScoreRestart is None:
+            bestScoreRestart = eternity_puzzle.get_total_n_conflict(solution)
+            scoreCache.put(solutionHash, bestScoreRestart)
+        stats.improve(bestScoreRestart)
+        checkpoint.improve(solution, bestScoreRestart)
+        while destroyIter < limitIterNoImprovement and not deadline.reached(bestScoreRestart) and not deadline.expired() \
+                and not is_solved_by_other_worker(targetConflicts):
             destroyIter += 1
+            nbIterations += 1
+            checkpoint.tick(stats)
+
+            operator = operatorWeights.choose()
+            startCpu = time.process_time()
+            scoreBeforeIteration = bestScoreRestart
 
-            ### DESTROY ###
-            initDestroyedSolution, removedIdxs, removedPieces = destroy(solution, nbWorst, nbRandom)
-
-            ### REPAIR ###
-            for repairIter in range(nbRepairIter):
-
-                # Init and shuffle
-                destroyedSolution = copy.copy(initDestroyedSolution)
-                localRemovedPieces = copy.copy(removedPieces)
-                random.shuffle(localRemovedPieces)
-                if repairIter != 0:
-                    random.shuffle(removedIdxs)
-
-                # Repair solution
-                repair_choose_piece(removedIdxs, destroyedSolution, localRemovedPieces)
-                
-                # Check if the repaired solution is a local upgrade
-                localScore = eternity_puzzle.get_total_n_conflict(destroyedSolution)
-                if localScore < bestScoreRestart:
-                    bestScoreRestart = localScore
-                    solution = copy.copy(destroyedSolution)
+            if operator == 'independent':
+                ### INDEPENDENT SET DESTROY + ASSIGNMENT REPAIR ###
+                with stats.phase('destroy'):
+                    cells = destroy_independent(solution, nbIndependent)
+                with stats.phase('repair'):
+                    newPieces, delta = repair_assignment(solution, cells)
+                    for k, piece in zip(cells, newPieces):
+                        solutionHash ^= zobrist.placement(k, solution[k]) ^ zobrist.placement(k, piece)
+                        solution[k] = piece
+                stats.count(1)
+                # The repair is never worse: a move with the same number of conflicts is also applied (plateau move),
+                # only an improvement resets the count of iterations without improvement
+                tracker.refresh(cells, solution)
+                if delta < 0:
+                    bestScoreRestart += delta
                     destroyIter = 0
+                    stats.improve(bestScoreRestart)
+                    checkpoint.improve(solution, bestScoreRestart)
+            else:
+                # The solution is destroyed and repaired in place, `trail` records the changes to revert them
+                trail = Trail(solution)
+
+                ### DESTROY ###
+                with stats.phase('destroy'):
+                    removedIdxs = selections[operator]()
+                    destroyedHash = solutionHash
+                    for k in removedIdxs:
+                        destroyedHash ^= zobrist.placement(k, solution[k])
+                    removedPieces, n_conflict_removed = destroy(trail, removedIdxs)
+                    destroyedScore = bestScoreRestart - n_conflict_removed
+                    destroyedMark = trail.mark()
+
+                    # Only the removed pieces are available to repair the solution, each repair uses all of them
+                    pieces = eternity_puzzle.piece_index
+                    pieces.remove_all()
+                    removedPieceIds = [pieces.restore_rotated_piece(piece) for piece in removedPieces]
+
+                ### REPAIR ###
+                with stats.phase('repair'):
+                    bestRepair = None # (score, hash, placements) of the best repair of the batch
+                    # Hashes of the boards rebuilt by the repairs of this batch. The greedy repair picks randomly among
+                    # the best pieces, so its board is only known once it is done: a duplicate is detected after the
+                    # repair and only skips its comparison with the best repair (and the copy of its placements)
+                    batchHashes = set()
+                    nbRepairs = 0
+                    for repairIter in range(nbRepairIter):
+
+                        # Shuffle and make the removed pieces available again
+                        if repairIter != 0:
+                            random.shuffle(removedIdxs)
+                            for piece in removedPieceIds:
+                                pieces.restore(piece)
+
+                        # Repair solution in place, its score is counted during the repair
+                        repairedScore = destroyedScore + repair_choose_piece(removedIdxs, trail, pieces)
+                        nbRepairs += 1
+
+                        # Hash of the repaired board: the placements of the removed positions are added to the destroyed board
+                        repairedHash = destroyedHash
+                        for k in removedIdxs:
+                            repairedHash ^= zobrist.placement(k, solution[k])
+                        if repairedHash in batchHashes:
+                            nbDuplicates += 1
+                        else:
+                            batchHashes.add(repairedHash)
+                            if bestRepair is None or repairedScore < bestRepair[0]:
+                                bestRepair = (repairedScore, repairedHash, [(k, solution[k]) for k in removedIdxs])
+
+                        # Back to the destroyed solution
+                        trail.undo(destroyedMark)
+
+                        # The time limit is also checked between two repairs, a batch does not overrun it
+                        if deadline.expired():
+                            break
+
+                stats.count(nbRepairs)
+                # Keep the best repair if it is a local upgrade, else revert the destroy (also if the time limit ended the
+                # batch before a repair was recorded)
+                if bestRepair is not None and bestRepair[0] < bestScoreRestart:
+                    bestScoreRestart, solutionHash, placements = bestRepair
+                    for k, piece in placements:
+                        solution[k] = piece
+                    trail.commit()
+                    tracker.refresh(removedIdxs, solution)
+                    destroyIter = 0
+                    stats.improve(bestScoreRestart)
+                    checkpoint.improve(solution, bestScoreRestart)
+                else:
+                    trail.undo()
+
+            operatorWeights.record(operator, scoreBeforeIteration - bestScoreRestart, time.process_time() - startCpu)
+
+            # Island model: the current solution can be replaced by a migrant of another island
+            if migration is not None:
+                migrant = migration.exchange(solution, bestScoreRestart)
+                if migrant is not None:
+                    # The migrant (or crossover child) can be worse: the incumbent of the restart is kept first
+                    if bestScoreRestart < bestScore:
+                        bestSolution = list(solution)
+                        bestScore = bestScoreRestart
+                        publish_best_score(bestScore)
+                    solution, bestScoreRestart = migrant
+                    solutionHash = zobrist.hash_solution(solution)
+                    tracker.reset(solution)
+                    destroyIter = 0
+                    stats.improve(bestScoreRestart)
+                    checkpoint.improve(solution, bestScoreRestart)
+
+            stats.tick(restarts=nbRestart, iteration=nbIterations, duplicateRepairs=nbDuplicates,
+                       operators=operatorWeights.summary())
+            yield (solution, bestScoreRestart) if bestScoreRestart < bestScore else (bestSolution, bestScore)
      
         
         # Check if the local search has found a better global solution
         if bestScoreRestart < bestScore:
             bestSolution = solution
             bestScore = bestScoreRestart
-            # Stop search if optimal solution is founds
-            if bestScore == 0:
-                isOptimal = True
+            publish_best_score(bestScore)
+
+    checkpoint.save(stats)
+    searchReport = {'restarts': nbRestart, 'iterations': nbIterations, 'duplicateRepairs': nbDuplicates,
+                    'operators': operatorWeights}
+    if report is None:
+        print_search_report(searchReport)
+    else:
+        report.update(searchReport)
 
     return bestSolution, bestScore        
+
+
+class AdvancedConfig(Config):
+    DEFAULTS = {
+        'timeLimit': 3600, # time budget in seconds
+        'targetConflicts': 0,
+        'workers': 1, # number of processes, with several workers the search is run in a single step
+        # None: value of the board size (see get_hyperparameters)
+        'proportionWorst': None,
+        'proportionRandom': None,
+        'limitIterNoImprovement': None,
+        'nbRepairIter': None,
+        'operators': None,
+        'proportionIndependent': None,
+        'reactionFactor': None,
+        'segmentLength': None,
+        'minOperatorWeight': None,
+        'frameNodeLimit': None,
+    }
+
+
+@registry.register('advanced')
+class AdvancedAgent(Agent):
+    """
+    GRASP restarts + LNS (see search_advanced), one step is one destroy/repair iteration
+    """
+
+    CONFIG = AdvancedConfig
+    supportsCheckpoint = True
+    islandSearch = staticmethod(search_advanced)
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        config = self.config
+        hyperparameters = {name: getattr(config, name) for name in HYPERPARAMETER_NAMES + tuple(OPERATOR_HYPERPARAMETERS)}
+        if config.workers > 1:
+            return solve_advanced(eternity_puzzle, config.workers, seed, config.timeLimit, stats, checkpoint, hyperparameters,
+                                  config.targetConflicts)
+        return (yield from iterate_advanced(eternity_puzzle, seed, None, config.timeLimit, stats, checkpoint, hyperparameters,
+                                            config.targetConflicts))
@@ -0,0 +1,205 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import math
+import random
+import time
+import registry
+from agent import Agent, Config, run_search
+from deadline import Deadline
+from eternity_puzzle import INTERIOR
+from parallel import publish_best_score, is_solved_by_other_worker
+from solver_local_search import generate_initial_solution, get_position_pools
+from stats import SearchStats
+from checkpoint import Checkpoint
+
+def solve_annealing(eternity_puzzle, seed=1, timeLimit=600, stats=None, checkpoint=None, targetConflicts=0):
+    """
+    Simulated annealing solution of the problem. A move swaps the pieces of two positions of the same pool (corners, edges or
+        internal positions) with random rotations, or turns one piece. A worse move is accepted with the Metropolis
+        probability exp(-delta / T). The initial temperature is calibrated on sampled moves, the temperature decreases
+        geometrically and is raised again when the search stagnates (reheating).
+    :param eternity_puzzle: object describing the input
+    :param seed: seed of the random generator
+    :param timeLimit: time budget in seconds
+    :param stats: SearchStats recording the progress of the search (optional)
+    :param checkpoint: Checkpoint hook saving the best solution and giving the starting solution (optional)
+    :param targetConflicts: the search stops when a solution has at most this number of conflicts
+    :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
+        cost is the cost of the solution
+    """
+    return run_search(iterate_annealing(eternity_puzzle, seed, timeLimit, stats, checkpoint, targetConflicts))
+
+def iterate_annealing(eternity_puzzle, seed=1, timeLimit=600, stats=None, checkpoint=None, targetConflicts=0,
+                      initialAcceptance=0.5, coolingRate=0.99, movesPerTemperature=None, stagnationLimit=100, reheatRatio=0.5):
+    """
+    Search of solve_annealing() as a generator yielding (best solution, best cost) every checkInterval moves
+        (see Agent.iterate)
+    :param initialAcceptance: probability to accept an average worse move at the initial temperature
+    :param coolingRate: ratio between 2 successive temperatures
+    :param movesPerTemperature: number of moves at each temperature (None for 10 * n_piece)
+    :param stagnationLimit: number of temperature steps without new best solution before reheating
+    :param reheatRatio: the temperature goes back to reheatRatio * initial temperature
+    """
+
+    def random_move():
+        """
+        :return: a random move (k1, piece1, k2, piece2) for apply_move(), k1 == k2 turns the piece at k1
+        """
+        k1 = random.randrange(n_piece)
+        k2 = random.choice(poolOf[k1])
+        if eternity_puzzle.position_class[k1] != INTERIOR:
+            # Frame: the pieces are swapped in their forced orientations (see get_frame_piece), a frame piece without
+            # forced orientation here (unusual instance) is turned randomly like an interior piece
+            framePiece1 = eternity_puzzle.get_frame_piece(solution[k2], k1)
+            framePiece2 = eternity_puzzle.get_frame_piece(solution[k1], k2)
+            if framePiece1 is not None and framePiece2 is not None:
+                return k1, framePiece1, k2, framePiece2
+        return (k1, eternity_puzzle.get_rotated_piece(solution[k2], random.randrange(4)),
+                k2, eternity_puzzle.get_rotated_piece(solution[k1], random.randrange(4)))
+
+    def acceptance_probabilities(temperature):
+        """
+        :return: list with the probability to accept a move increasing the number of conflicts by `delta` (index),
+            a move changes at most the 8 sides of 2 pieces
+        """
+        return [1.] + [math.exp(-delta / temperature) for delta in range(1, 9)]
+
+    ### INITIALISATION ###
+    deadline = Deadline(timeLimit, targetConflicts)
+    start_time = time.time()
+    random.seed(seed)
+    if stats is None:
+        stats = SearchStats()
+    if checkpoint is None:
+        checkpoint = Checkpoint(eternity_puzzle)
+    checkpoint.restore_random()
+    checkpoint.restore_stats(stats)
+    n_piece = eternity_puzzle.n_piece
+
+    # Moves stay inside a pool: corners with corners, edges with edges and internal positions with internal positions
+    pools = [pool for pool in get_position_pools(eternity_puzzle) if pool]
+    poolOf = [None] * n_piece
+    for pool in pools:
+        for k in pool:
+            poolOf[k] = pool
+
+    if checkpoint.incumbent is not None:
+        solution = list(checkpoint.incumbent)
+    else:
+        with stats.phase('construct'):
+            solution = generate_initial_solution(eternity_puzzle)
+    score = eternity_puzzle.get_total_n_conflict(solution)
+    bestSolution = list(solution)
+    bestScore = score
+    publish_best_score(bestScore)
+    stats.improve(bestScore)
+    checkpoint.improve(bestSolution, bestScore)
+
+    # Hyperparameters
+    if movesPerTemperature is None:
+        movesPerTemperature = 10 * n_piece
+    checkInterval = 10000 # number of moves between two updates of the statistics and checks of the other workers
+    reportInterval = 10 # number of seconds between two reports
+
+    ### CALIBRATION OF THE INITIAL TEMPERATURE ###
+    worseDeltas = []
+    for _ in range(1000):
+        delta = eternity_puzzle.get_move_delta(*random_move(), solution)
+        if delta > 0:
+            worseDeltas.append(delta)
+    if worseDeltas:
+        initialTemperature = -(sum(worseDeltas) / len(worseDeltas)) / math.log(initialAcceptance)
+    else:
+        initialTemperature = 1.
+    temperature = initialTemperature
+    acceptance = acceptance_probabilities(temperature)
+
+    nbMoves = 0
+    nbAccepted = 0
+    nbSteps = 0
+    lastImprovementStep = 0
+    lastReport = start_time
+    reportMoves = 0
+    reportAccepted = 0
+
+    ### ANNEALING ###
+    while not deadline.reached(bestScore) and not deadline.expired():
+        nbMoves += 1
+
+        # Metropolis criterion with an O(1) evaluation of the move (no copy of the solution)
+        move = random_move()
+        delta = eternity_puzzle.get_move_delta(*move, solution)
+        if delta <= 0 or random.random() < acceptance[delta]:
+            eternity_puzzle.apply_move(*move, solution)
+            score += delta
+            nbAccepted += 1
+            if score < bestScore:
+                bestScore = score
+                bestSolution = list(solution)
+                lastImprovementStep = nbSteps
+                publish_best_score(bestScore)
+                stats.improve(bestScore)
+                checkpoint.improve(bestSolution, bestScore)
+
+        # Cooling, and reheating if the best solution has not changed for `stagnationLimit` temperatures
+        if nbMoves % movesPerTemperature == 0:
+            nbSteps += 1
+            if nbSteps - lastImprovementStep >= stagnationLimit:
+                temperature = reheatRatio * initialTemperature
+                lastImprovementStep = nbSteps
+            else:
+                temperature *= coolingRate
+            acceptance = acceptance_probabilities(temperature)
+
+        if nbMoves % checkInterval == 0:
+            stats.count(checkInterval)
+            stats.tick(iteration=nbMoves, temperature=temperature, score=score)
+            now = time.time()
+            if is_solved_by_other_worker(targetConflicts):
+                break
+            checkpoint.tick(stats)
+            if now - lastReport >= reportInterval:
+                print("[INFO] annealing: %d moves, T = %.3f, acceptance rate %.1f%%, %d moves/sec, best %d conflicts" %
+                      (nbMoves, temperature, 100. * (nbAccepted - reportAccepted) / (nbMoves - reportMoves),
+                       (nbMoves - reportMoves) / (now - lastReport), bestScore))
+                lastReport = now
+                reportMoves = nbMoves
+                reportAccepted = nbAccepted
+            yield bestSolution, bestScore
+
+    stats.count(nbMoves % checkInterval)
+    checkpoint.save(stats)
+    solvingTime = time.time() - start_time
+    print("[INFO] annealing: %d moves, acceptance rate %.1f%%, %d moves/sec" %
+          (nbMoves, 100. * nbAccepted / max(nbMoves, 1), nbMoves / max(solvingTime, 1e-9)))
+
+    return bestSolution, bestScore
+
+
+class AnnealingConfig(Config):
+    DEFAULTS = {
+        'timeLimit': 600, # time budget in seconds
+        'targetConflicts': 0,
+        'initialAcceptance': 0.5,
+        'coolingRate': 0.99,
+        'movesPerTemperature': None, # None: 10 * n_piece
+        'stagnationLimit': 100,
+        'reheatRatio': 0.5,
+    }
+
+
+@registry.register('annealing')
+class AnnealingAgent(Agent):
+    """
+    Simulated annealing (see solve_annealing), one step is checkInterval moves
+    """
+
+    CONFIG = AnnealingConfig
+    supportsCheckpoint = True
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        config = self.config
+        return (yield from iterate_annealing(eternity_puzzle, seed, config.timeLimit, stats, checkpoint, config.targetConflicts,
+                                             config.initialAcceptance, config.coolingRate, config.movesPerTemperature,
+                                             config.stagnationLimit, config.reheatRatio))
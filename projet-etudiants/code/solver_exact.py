@@ -0,0 +1,220 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import sys
+import time
+import registry
+from agent import Agent, Config
+from deadline import Deadline
+from eternity_puzzle import GRAY, NORTH, SOUTH, WEST, EAST
+from stats import SearchStats
+
+def solve_exact(eternity_puzzle, nodeLimit=None, timeLimit=600, stats=None, targetConflicts=0):
+    """
+    Exact solution of the problem: depth-first search of a solution without conflict.
+        The domain of each position is a bitset of (piece, rotation) (bit 4 * piece + rotation), reduced by forward checking
+        on the edge colors. The position with the smallest domain is filled first (fail-first).
+        If the node or time budget runs out, the deepest partial fill found is completed greedily.
+    :param eternity_puzzle: object describing the input
+    :param nodeLimit: maximum number of nodes of the search tree (None for no limit)
+    :param timeLimit: time budget in seconds
+    :param stats: SearchStats recording the progress of the search (optional), a node is counted as an evaluation
+    :param targetConflicts: the search stops as soon as the greedy completion of its deepest partial fill has at most
+        this number of conflicts (only checked for a positive target, 0 waits for a solution without conflict)
+    :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
+        cost is the cost of the solution
+    """
+
+    ### INITIALISATION ###
+    start_time = time.time()
+    deadline = Deadline(timeLimit)
+    if stats is None:
+        stats = SearchStats()
+    n = eternity_puzzle.board_size
+    n_piece = eternity_puzzle.n_piece
+    table = eternity_puzzle.piece_table.tolist()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), n_piece + 100))
+
+    # sideMasks[side][color]: bitset of the (piece, rotation) having `color` on `side`
+    sideMasks = [[0] * eternity_puzzle.n_color for _ in range(4)]
+    for piece in range(n_piece):
+        for rotation in range(4):
+            for side in range(4):
+                sideMasks[side][table[piece][rotation][side]] |= 1 << (4 * piece + rotation)
+
+    # pieceMasks[piece]: bitset of the 4 rotations of `piece`
+    pieceMasks = [0b1111 << (4 * piece) for piece in range(n_piece)]
+
+    # Border partition: corner positions only take corner pieces, edge positions edge pieces and internal positions
+    # internal pieces. Only used when the instance has the pieces of a standard frame.
+    classMasks = [0, 0, 0]
+    for piece, colors in enumerate(eternity_puzzle.piece_list):
+        if colors.count(GRAY) <= 2:
+            classMasks[colors.count(GRAY)] |= pieceMasks[piece]
+    usePartition = n >= 2 and [bin(mask).count("1") // 4 for mask in classMasks] == [(n - 2) ** 2, 4 * (n - 2), 4]
+
+    # Initial domains (the sides on the border must be GRAY) and neighbours (position, side facing it) of each position
+    domains = []
+    neighbours = []
+    for k in range(n_piece):
+        i = k % n
+        j = k // n
+        domain = (1 << (4 * n_piece)) - 1
+        nbBorderSides = 0
+        neighboursK = []
+        for side, isBorder, neighbour in ((NORTH, j == n - 1, k + n), (SOUTH, j == 0, k - n),
+                                          (WEST, i == 0, k - 1), (EAST, i == n - 1, k + 1)):
+            if isBorder:
+                domain &= sideMasks[side][GRAY]
+                nbBorderSides += 1
+            else:
+                neighboursK.append((neighbour, side))
+        if usePartition:
+            domain &= classMasks[nbBorderSides]
+        domains.append(domain)
+        neighbours.append(neighboursK)
+
+    placement = [None] * n_piece # (piece, rotation) at each position
+    unassigned = set(range(n_piece))
+    free = (1 << (4 * n_piece)) - 1 # bitset of the (piece, rotation) of the pieces not placed yet
+    nbNodes = 0
+    outOfBudget = False
+    targetReached = False
+    bestPlacement = list(placement)
+    bestNbPlaced = 0
+
+    def complete(partialPlacement):
+        """
+        Fill the positions not assigned by `partialPlacement` with the pieces left, minimising the conflicts greedily
+        :param partialPlacement: (piece, rotation) at each position, None for the positions not assigned
+        :return: a tuple (solution, cost)
+        """
+        pieces = eternity_puzzle.piece_index
+        pieces.restore_all()
+        solution = [(-1, -1, -1, -1)] * n_piece
+        for k, pieceRotation in enumerate(partialPlacement):
+            if pieceRotation is not None:
+                piece, rotation = pieceRotation
+                solution[k] = pieces.rotatedPieces[piece][rotation]
+                pieces.remove(piece)
+        for k in range(n_piece):
+            if partialPlacement[k] is None:
+                _, candidates = pieces.lookup(eternity_puzzle.get_facing_colors(k, solution))
+                piece, rotation = candidates[0]
+                solution[k] = pieces.rotatedPieces[piece][rotation]
+                pieces.remove(piece)
+        return solution, eternity_puzzle.get_total_n_conflict(solution)
+
+    def search(nbPlaced):
+        """
+        Fill the remaining positions without conflict
+        :param nbPlaced: number of positions already filled
+        :return: True if a solution without conflict has been found (in `placement`)
+        """
+        nonlocal free, nbNodes, outOfBudget, targetReached, bestPlacement, bestNbPlaced
+
+        # The node limit is checked at each node, the clock is read every few nodes only (see Deadline.expired)
+        if (nodeLimit is not None and nbNodes >= nodeLimit) or deadline.expired():
+            outOfBudget = True
+        if outOfBudget:
+            return False
+        nbNodes += 1
+        if nbNodes % 1024 == 0:
+            stats.count(1024)
+            stats.tick(iteration=nbNodes, depth=bestNbPlaced)
+
+        if nbPlaced > bestNbPlaced:
+            bestNbPlaced = nbPlaced
+            bestPlacement = list(placement)
+            # Early stop: the deepest partial fill completed greedily is good enough
+            if 0 < targetConflicts and nbPlaced < n_piece and complete(bestPlacement)[1] <= targetConflicts:
+                targetReached = outOfBudget = True
+                return False
+        if nbPlaced == n_piece:
+            return True
+
+        # Fail-first: the position with the smallest domain
+        k = None
+        smallestSize = 4 * n_piece + 1
+        for position in unassigned:
+            size = bin(domains[position] & free).count("1")
+            if size < smallestSize:
+                k = position
+                smallestSize = size
+                if size == 0:
+                    return False
+
+        unassigned.remove(k)
+        domain = domains[k] & free
+        while domain and not outOfBudget:
+            lowestBit = domain & -domain
+            domain ^= lowestBit
+            piece, rotation = divmod(lowestBit.bit_length() - 1, 4)
+            colors = table[piece][rotation]
+            free &= ~pieceMasks[piece]
+
+            # Forward checking: the neighbours must keep at least one (piece, rotation) matching the new colors
+            trail = []
+            consistent = True
+            for neighbour, side in neighbours[k]:
+                if placement[neighbour] is None:
+                    trail.append((neighbour, domains[neighbour]))
+                    domains[neighbour] &= sideMasks[side ^ 1][colors[side]] # side ^ 1 is the opposite side
+                    if domains[neighbour] & free == 0:
+                        consistent = False
+                        break
+
+            if consistent:
+                placement[k] = (piece, rotation)
+                if search(nbPlaced + 1):
+                    return True
+                placement[k] = None
+
+            for neighbour, oldDomain in trail:
+                domains[neighbour] = oldDomain
+            free |= pieceMasks[piece]
+        unassigned.add(k)
+
+        return False
+
+    ### SEARCH ###
+    isSolved = search(0)
+    stats.count(nbNodes % 1024)
+    solvingTime = time.time() - start_time
+    print("[INFO] exact search: %d nodes in %.2f s (%d nodes/sec)" % (nbNodes, solvingTime, nbNodes / max(solvingTime, 1e-9)))
+    if isSolved:
+        print("[INFO] exact search: solution without conflict found")
+    elif targetReached:
+        print("[INFO] exact search: target of %d conflicts reached with a partial fill of %d / %d positions" %
+              (targetConflicts, bestNbPlaced, n_piece))
+    elif not outOfBudget:
+        print("[INFO] exact search: complete search, no solution without conflict exists")
+    else:
+        print("[INFO] exact search: budget exhausted, best partial fill of %d / %d positions" % (bestNbPlaced, n_piece))
+
+    ### SOLUTION ###
+    # Fill the positions not assigned by the search with the pieces left, minimising the conflicts greedily
+    solution, cost = complete(bestPlacement)
+    stats.improve(cost)
+    return solution, cost
+
+
+class ExactConfig(Config):
+    DEFAULTS = {
+        'nodeLimit': None, # maximum number of nodes of the search tree (None for no limit)
+        'timeLimit': 600, # time budget in seconds
+        'targetConflicts': 0, # stop when the greedy completion of the deepest partial fill reaches this number of conflicts
+    }
+
+
+@registry.register('exact')
+class ExactAgent(Agent):
+    """
+    Depth-first search (see solve_exact), the search is run in a single step
+    """
+
+    CONFIG = ExactConfig
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        return solve_exact(eternity_puzzle, self.config.nodeLimit, self.config.timeLimit, stats, self.config.targetConflicts)
+        yield # generator without intermediate solution
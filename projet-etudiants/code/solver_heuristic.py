@@ -2,42 +2,46 @@
 # Marco NOVAES 2166579
 
 from eternity_puzzle import NORTH, SOUTH, WEST, EAST
-import random
+import registry
+from agent import Agent
+from stats import SearchStats
 
-def solve_heuristic(eternity_puzzle):
+def solve_heuristic(eternity_puzzle, stats=None):
     """
     Heuristic solution of the problem
     :param eternity_puzzle: object describing the input
+    :param stats: SearchStats recording the progress of the search (optional), a tested (piece, rotation) is counted
+        as an evaluation
     :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
         cost is the cost of the solution
     """
-    def get_conflict_one_piece(i, j, solution):
+    def get_conflict_one_piece(piece, facing):
         """
-        Get the number of conflict for position [i,j] in `solution`
-        :param i: line of the piece
-        :param j: column of the piece
-        :return: number of conflict for one position [i,j] in `solution` + list of the color involved in each conflicts
+        Get the number of conflict for `piece` placed in a position surrounded by the colors `facing`
+        :param piece: the (rotated) piece
+        :param facing: colors facing each side of the position (see get_facing_colors)
+        :return: number of conflict for `piece` + list of the color involved in each conflicts
         """
         n_conflict = 0
         colors_in_conflict = []
 
         # The first condition in if statements is to ignore non-assigned neighboors
 
-        if solution[i+1][j] and solution[i][j][NORTH] != solution[i+1][j][SOUTH]:
+        if facing[NORTH] != -1 and piece[NORTH] != facing[NORTH]:
             n_conflict+=1
-            colors_in_conflict.append(solution[i][j][NORTH])
+            colors_in_conflict.append(piece[NORTH])
 
-        if solution[i-1][j] and solution[i][j][SOUTH] != solution[i-1][j][NORTH]:
+        if facing[SOUTH] != -1 and piece[SOUTH] != facing[SOUTH]:
             n_conflict+=1
-            colors_in_conflict.append(solution[i][j][SOUTH])
+            colors_in_conflict.append(piece[SOUTH])
         
-        if solution[i][j+1] and solution[i][j][EAST] != solution[i][j+1][WEST]:
+        if facing[EAST] != -1 and piece[EAST] != facing[EAST]:
             n_conflict+=1
-            colors_in_conflict.append(solution[i][j][EAST])
+            colors_in_conflict.append(piece[EAST])
 
-        if solution[i][j-1] and solution[i][j][WEST] != solution[i][j-1][EAST]:
+        if facing[WEST] != -1 and piece[WEST] != facing[WEST]:
             n_conflict+=1
-            colors_in_conflict.append(solution[i][j][WEST])
+            colors_in_conflict.append(piece[WEST])
 
         return n_conflict, colors_in_conflict
 
@@ -55,22 +59,19 @@ def solve_heuristic(eternity_puzzle):
             color_stat_piece *= float(colors[c]) / numberOfAllRemainingEdges
         return color_stat_piece
 
-    def dealing_with_piece(solution, piece, i, j, n_less_conflict, piece_less_conflict, color_stat_less_conflict, colors):
+    def dealing_with_piece(facing, piece, n_less_conflict, piece_less_conflict, color_stat_less_conflict, colors):
         """
         Check if `piece` is better than `piece_less_conflict`. A piece is considered better than another one if it has less conflicts. 
             In case of a tie, the piece with the minimum color_stat (see calculate_color_stat) is considered better.
-        :param solution: current solution (list of list)
+        :param facing: colors facing each side of the position to fill (see get_facing_colors)
         :param piece: current piece
-        :param i: x coordinate of the position to fill
-        :param j: y coordinate of the position to fill
         :param n_less_conflict: current minimum number of conflicts for position [i,j] using the remaining pieces
         :param piece_less_conflict: current best piece 
         :param color_stat_less_conflict: color_stat (see calculate_color_stat) of `piece_less_conflict`
         :param colors: dictionary with the cardinality of each colour for the remaining pieces
         """
-        solution[i][j] = piece
         has_piece_changed = False
-        n_conflict_for_this_piece, conflict_colors = get_conflict_one_piece(i, j, solution)
+        n_conflict_for_this_piece, conflict_colors = get_conflict_one_piece(piece, facing)
         color_stat_piece = calculate_color_stat(conflict_colors, colors)
 
         # `piece` is the new best option because it has less conflicts than all previous options
@@ -95,37 +96,40 @@ def solve_heuristic(eternity_puzzle):
         Assign a piece to position [i,j] (criteria defined in dealing_with_piece() header)
         :param i: x coordinate of the position to fill
         :param j: y coordinate of the position to fill
-        :param solution: current solution (list of list)
+        :param solution: current solution (flat list, -1 for non-assigned positions)
         :param colors: dictionary with the cardinality of each colour for the remaining pieces
-        :param pieces: list of remaining pieces
+        :param pieces: index of the remaining pieces (see PieceIndex)
         """
+        k = i * n + j
+        facing = eternity_puzzle.get_facing_colors(k, solution)
         # Minimum number of conflicts for position [i,j] using the remaining pieces. 
         # Initialised to 5 (upper bound) and the value will be reduced when testing all possibilities
         n_less_conflict = 5 
         chosen_piece = None
         color_stat = 1.
-        index_to_remove = None
-        for index, piece in enumerate(pieces):
-            # Get list with the 4 possibles values for a piece apllying rotations
-            all_rotation_for_piece = eternity_puzzle.generate_rotation(piece)
-            for possible_rotation in all_rotation_for_piece:
-                # Check if `possible_rotation` is the best choice (criteria defined in dealing_with_piece() header)
-                chosen_piece, color_stat, n_less_conflict, has_piece_changed = dealing_with_piece(solution, possible_rotation, i, j, 
-                                                                                n_less_conflict, chosen_piece, color_stat
-                                                                                , colors)
-                if has_piece_changed:
-                    index_to_remove = index
-
-        solution[i][j] = chosen_piece
-        pieces.pop(index_to_remove)
+        piece_to_remove = None
+        # Only the remaining (piece, rotation) with the minimum number of conflicts are tested (see PieceIndex.lookup)
+        _, candidates = pieces.lookup(facing)
+        stats.count(len(candidates))
+        for piece, rotation in candidates:
+            possible_rotation = pieces.rotatedPieces[piece][rotation]
+            # Check if `possible_rotation` is the best choice (criteria defined in dealing_with_piece() header)
+            chosen_piece, color_stat, n_less_conflict, has_piece_changed = dealing_with_piece(facing, possible_rotation,
+                                                                            n_less_conflict, chosen_piece, color_stat
+                                                                            , colors)
+            if has_piece_changed:
+                piece_to_remove = piece
+
+        solution[k] = chosen_piece
+        pieces.remove(piece_to_remove)
         
     def add_corners(coord_corners, solution, colors, pieces):
         """
         Assign a piece to each corner
         :param coord_corners: list with the coordinates of the corners of the current perimeter (from outside to inside)
-        :param solution: current solution (list of list)
+        :param solution: current solution (flat list)
         :param colors: dictionary with the cardinality of each colour for the remaining pieces
-        :param pieces: list of remaining pieces
+        :param pieces: index of the remaining pieces (see PieceIndex)
         """
         # Check if perimeter of size 1
         if coord_corners[0] == coord_corners[1]: 
@@ -138,9 +142,9 @@ def solve_heuristic(eternity_puzzle):
         """
         Assign a piece to each case in the current perimeter (execept corners)
         :param coord_corners: list with the coordinates of the corners of the current perimeter (from outside to inside)
-        :param solution: current solution (list of list)
+        :param solution: current solution (flat list)
         :param colors: dictionary with the cardinality of each colour for the remaining pieces
-        :param pieces: list of remaining pieces
+        :param pieces: index of the remaining pieces (see PieceIndex)
         """
         size = coord_corners[1][1] - coord_corners[0][1] - 1
         # Loop to cover the 4 sides of the current perimeter (execept corners)
@@ -162,21 +166,22 @@ def solve_heuristic(eternity_puzzle):
 
 
     ### INITIALISATION ###
-    random.seed(1)
+    if stats is None:
+        stats = SearchStats()
     n = eternity_puzzle.board_size
-    pieces = eternity_puzzle.piece_list
-    flatten = [pos for piece in pieces for pos in piece]
-    m = n + 2
+    pieces = eternity_puzzle.piece_index
+    pieces.restore_all()
+    flatten = [pos for piece in eternity_puzzle.piece_list for pos in piece]
     colors = {}
-    coord_corners = [[1, 1], [1, n], [n, n], [n, 1]]
+    coord_corners = [[0, 0], [0, n-1], [n-1, n-1], [n-1, 0]]
     notFinished = True
 
     # Count the number of pieces of each colour
     for i in range(eternity_puzzle.n_color):
         colors[i] = flatten.count(i)
 
-    #Create format solution with an additional external perimeter fill with (0, 0, 0, 0) 
-    solution = [[(0, 0, 0, 0) if (i == 0 or j == 0 or i == m-1 or j == m-1) else None for i in range(m)] for j in range(m)] 
+    # Flat solution, (-1, -1, -1, -1) is a non-assigned position (see get_facing_colors)
+    solution = [(-1, -1, -1, -1)] * eternity_puzzle.n_piece
 
     ### SOLUTION CONSTRUCTION (GREEDY HEURISTIC) ###
     while notFinished:
@@ -187,9 +192,20 @@ def solve_heuristic(eternity_puzzle):
             update_corners(coord_corners)
         else:
             notFinished = False
-    
-    # remove the border and flatten to fit the formatting solution
-    solution = [pos for piece in solution for pos in piece if pos != (0,0,0,0)]
-    return solution, eternity_puzzle.get_total_n_conflict(solution)
 
+    cost = eternity_puzzle.get_total_n_conflict(solution)
+    stats.improve(cost)
+    return solution, cost
+
+
+@registry.register('heuristic')
+class HeuristicAgent(Agent):
+    """
+    Constructive heuristic (see solve_heuristic), the solution is built in a single step. It has no hyperparameter: the
+        construction runs in one shot, so the time limit and the target number of conflicts do not apply, and it is
+        deterministic, so the seed does not change the solution
+    """
 
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        return solve_heuristic(eternity_puzzle, stats)
+        yield # generator without intermediate solution
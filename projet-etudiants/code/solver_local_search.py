@@ -2,128 +2,241 @@
 # Marco NOVAES 2166579
 
 import random
-from eternity_puzzle import NORTH, SOUTH, WEST, EAST
-import copy
-import time
-
-def solve_local_search(eternity_puzzle):
+import registry
+from agent import Agent, Config, run_search
+from conflict_tracker import ConflictTracker
+from deadline import Deadline
+from eternity_puzzle import INTERIOR, EDGE
+from parallel import publish_best_score, is_solved_by_other_worker
+from stats import SearchStats
+
+def generate_initial_solution(eternity_puzzle):
+    """
+    Random solution such that the corner pieces are placed randomly in the corner positions and the same applies to the edge pieces and internal pieces.  
+        The corner and edge pieces are placed in their forced orientation (GRAY sides on the border).
+    :param eternity_puzzle: object describing the input
+    :return: an initial solution      
+    """
+    size = eternity_puzzle.board_size
+    pieces = eternity_puzzle.piece_list
+    solution = []
+    limits = (0,size-1)
+
+    # Split pieces in 3 lists (corners, edges and interns) + shuffle
+    corners = []
+    edges = []
+    interns = []
+    for piece, pieceClass in zip(pieces, eternity_puzzle.piece_class):
+        if pieceClass == INTERIOR:
+            interns.append(piece)
+        elif pieceClass == EDGE:
+            edges.append(piece)
+        else:
+            corners.append(piece)
+    random.shuffle(corners)
+    random.shuffle(edges)
+    random.shuffle(interns)
+            
+    # Create random solution
+    for i in range(size):
+        for j in range(size):
+            if i in limits and j in limits: #corner
+                piece = corners.pop()
+            elif i in limits or j in limits: #edge
+                piece = edges.pop()
+            else: # intern
+                solution.append(interns.pop())
+                continue
+            # A frame piece keeps its rotation if it has no forced orientation here (unusual instance)
+            framePiece = eternity_puzzle.get_frame_piece(piece, len(solution))
+            solution.append(piece if framePiece is None else framePiece)
+
+    return solution
+
+def get_position_pools(eternity_puzzle):
+    """
+    Split the positions like generate_initial_solution() splits the pieces
+    :param eternity_puzzle: object describing the input
+    :return: a tuple (corner positions, edge positions, internal positions)
+    """
+    size = eternity_puzzle.board_size
+    limits = (0,size-1)
+    corners = []
+    edges = []
+    interns = []
+    for k in range(eternity_puzzle.n_piece):
+        i = k // size
+        j = k % size
+        if i in limits and j in limits: #corner
+            corners.append(k)
+        elif i in limits or j in limits: #edge
+            edges.append(k)
+        else: # intern
+            interns.append(k)
+
+    return corners, edges, interns
+
+def solve_local_search(eternity_puzzle, seed=1, migration=None, timeLimit=600, stats=None, targetConflicts=0):
     """
     Local search solution of the problem
     :param eternity_puzzle: object describing the input
+    :param seed: seed of the random generator
+    :param migration: migration hook of the island model (see island.Migration), None if the search runs alone
+    :param timeLimit: time budget in seconds
+    :param stats: SearchStats recording the progress of the search (optional)
+    :param targetConflicts: the search stops when a solution has at most this number of conflicts
     :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
         cost is the cost of the solution
     """
+    return run_search(iterate_local_search(eternity_puzzle, seed, migration, timeLimit, stats, targetConflicts))
 
-    def generate_initial_solution():
-        """
-        Random solution such that the corner pieces are placed randomly in the corner positions and the same applies to the edge pieces and internal pieces.  
-        :return: an initial solution      
-        """
-        # Create format solution with an additional external perimeter fill with (0, 0, 0, 0) 
-        size = eternity_puzzle.board_size
-        bigSize = size + 2
-        pieces = eternity_puzzle.piece_list
-        solution = [[(0, 0, 0, 0) if (i == 0 or j == 0 or i == bigSize-1 or j == bigSize-1) else None for i in range(bigSize)] for j in range(bigSize)] 
-        limits = (1,size)
-
-        # Split pieces in 3 lists (corners, edges and interns) + shuffle
-        corners = []
-        edges = []
-        interns = []
-        for piece in pieces:
-            if piece.count(0) == 0:
-                interns.append(piece)
-            elif piece.count(0) == 1:
-                edges.append(piece)
-            else:
-                corners.append(piece)
-        random.shuffle(corners)
-        random.shuffle(edges)
-        random.shuffle(interns)
-                
-        # Create random solution
-        for i in range(1, size+1):
-            for j in range(1, size+1):
-                if i in limits and j in limits: #corner
-                    solution[i][j] = corners.pop()
-                elif i in limits or j in limits: #edge
-                    solution[i][j] = edges.pop()
-                else: # intern
-                    solution[i][j] = interns.pop()
-
-        return solution
+def iterate_local_search(eternity_puzzle, seed=1, migration=None, timeLimit=600, stats=None, targetConflicts=0,
+                         limitIterNoImprovement=5000):
+    """
+    Search of solve_local_search() as a generator yielding (best solution, best cost) after each iteration (see Agent.iterate)
+    :param limitIterNoImprovement: number of iterations without improvement before a restart
+    """
 
     ### INITIALISATION ###
 
-    start_time = time.time()  
+    deadline = Deadline(timeLimit, targetConflicts)
     size = eternity_puzzle.board_size
-    timeLimit = 10
-    random.seed(1)
+    random.seed(seed)
+    if stats is None:
+        stats = SearchStats()
 
     # Initialisation for bestScore and bestSolution
-    solution = generate_initial_solution()
-    flatSolution = [pos for piece in solution for pos in piece if pos != (0,0,0,0)]
-    bestSolution = flatSolution
-    bestScore = eternity_puzzle.get_total_n_conflict(flatSolution)
+    solution = generate_initial_solution(eternity_puzzle)
+    bestSolution = solution
+    bestScore = eternity_puzzle.get_total_n_conflict(solution)
+    stats.improve(bestScore)
 
-    # Bool to stop search if optimal solution (zero conflicts) is found
-    isOptimal = False
+    # Moves stay inside a pool: corners with corners, edges with edges and internal positions with internal positions
+    poolOf = [None] * eternity_puzzle.n_piece
+    for pool in get_position_pools(eternity_puzzle):
+        for k in pool:
+            poolOf[k] = pool
+
+    nbRestart = 0
+    nbIterations = 0
 
     ### (RE)START SEARCH ###
-    while round((time.time() - start_time) / 60,2) < timeLimit and not isOptimal:
+    while not deadline.reached(bestScore) and not deadline.expired() and not is_solved_by_other_worker(targetConflicts):
+        nbRestart += 1
 
         # Initialisation    
-        solution = generate_initial_solution()
-        flatSolution = [pos for piece in solution for pos in piece if pos != (0,0,0,0)]
-        bestLocalScore = eternity_puzzle.get_total_n_conflict(flatSolution)
+        with stats.phase('construct'):
+            solution = generate_initial_solution(eternity_puzzle)
+            bestLocalScore = eternity_puzzle.get_total_n_conflict(solution)
+            tracker = ConflictTracker(eternity_puzzle, solution)
         if bestLocalScore < bestScore:
             bestScore = bestLocalScore
-            bestSolution = flatSolution
+            bestSolution = list(solution)
+            stats.improve(bestScore)
 
         ### LOCAL SEARCH ###
         count = 0
-        limitIterNoImprovement = 5000
-        while count < limitIterNoImprovement and round((time.time() - start_time) / 60,2) < timeLimit and not isOptimal:
+        while count < limitIterNoImprovement and not deadline.reached(bestScore) and not deadline.expired() \
+                and not is_solved_by_other_worker(targetConflicts):
             count += 1
-
-            # Random selection of 2 pieces
-            coord1 = (random.randint(1, size), random.randint(1, size))
-            coord2 = (random.randint(1, size), random.randint(1, size))
-            piece1 = solution[coord1[0]][coord1[1]]
-            piece2 = solution[coord2[0]][coord2[1]]
-        
-            # Try all the possible changes (4*4*2=32) and choose the best one
-            # 4 rotation for piece1, 4 rotation for piece2, bool for swap/no-swap pieces 
-            mutableSolution = copy.deepcopy(solution)
-            rotations_piece1 = eternity_puzzle.generate_rotation(piece1)
-            rotations_piece2 = eternity_puzzle.generate_rotation(piece2)
-            for i in range(4): #turn piece1
-                for j in range(4): #turn piece2
-                    for k in range(2): #swap pieces1 <-> piece2
-                        if k:
-                            mutableSolution[coord1[0]][coord1[1]] = rotations_piece1[i]
-                            mutableSolution[coord2[0]][coord2[1]] = rotations_piece2[j]
-                        else:
-                            mutableSolution[coord1[0]][coord1[1]] = rotations_piece2[j]
-                            mutableSolution[coord2[0]][coord2[1]] = rotations_piece1[i]
-                        
-                        # Update if better local solution is found
-                        flatmutableSolution = [pos for piece in mutableSolution for pos in piece if pos != (0,0,0,0)]
-                        currentScore = eternity_puzzle.get_total_n_conflict(flatmutableSolution)
-                        if currentScore < bestLocalScore:
-                            bestLocalScore = currentScore
-                            solution = copy.deepcopy(mutableSolution)
-                            count = 0
+            nbIterations += 1
+
+            # Selection of 2 pieces: the first one has conflicts (conflict-directed), the second one is random in the
+            # same pool (an interior piece is never moved onto the frame)
+            k1 = tracker.sample_conflicting()
+            if k1 is None:
+                k1 = size * random.randint(0, size-1) + random.randint(0, size-1)
+            k2 = random.choice(poolOf[k1])
+            piece1 = solution[k1]
+            piece2 = solution[k2]
+
+            bestDelta = 0
+            bestMove = None
+            framePiece1 = eternity_puzzle.get_frame_piece(piece2, k1) if eternity_puzzle.position_class[k1] != INTERIOR else None
+            framePiece2 = eternity_puzzle.get_frame_piece(piece1, k2) if framePiece1 is not None else None
+            if framePiece2 is not None:
+                # Frame: the only legal change is to swap the 2 pieces in their forced orientations
+                stats.count(1)
+                move = (k1, framePiece1, k2, framePiece2)
+                delta = eternity_puzzle.get_move_delta(*move, solution)
+                if delta < bestDelta:
+                    bestDelta = delta
+                    bestMove = move
+            else:
+                # Try all the possible changes (4*4*2=32) and choose the best one
+                # 4 rotation for piece1, 4 rotation for piece2, bool for swap/no-swap pieces 
+                # Each change is evaluated incrementally on the edges around k1 and k2 (no copy of the solution)
+                stats.count(32)
+                rotations_piece1 = eternity_puzzle.generate_rotation(piece1)
+                rotations_piece2 = eternity_puzzle.generate_rotation(piece2)
+                for i in range(4): #turn piece1
+                    for j in range(4): #turn piece2
+                        for k in range(2): #swap pieces1 <-> piece2
+                            if k:
+                                move = (k1, rotations_piece1[i], k2, rotations_piece2[j])
+                            else:
+                                move = (k1, rotations_piece2[j], k2, rotations_piece1[i])
+                            
+                            # Keep the move if better local solution is found
+                            delta = eternity_puzzle.get_move_delta(*move, solution)
+                            if delta < bestDelta:
+                                bestDelta = delta
+                                bestMove = move
+
+            if bestMove is not None:
+                eternity_puzzle.apply_move(*bestMove, solution)
+                tracker.refresh((k1, k2), solution)
+                bestLocalScore += bestDelta
+                count = 0
+
+            # Island model: the current solution can be replaced by a migrant of another island
+            if migration is not None:
+                migrant = migration.exchange(solution, bestLocalScore)
+                if migrant is not None:
+                    # The migrant (or crossover child) can be worse: the current solution is kept first
+                    if bestLocalScore < bestScore:
+                        bestScore = bestLocalScore
+                        bestSolution = list(solution)
+                        publish_best_score(bestScore)
+                        stats.improve(bestScore)
+                    solution, bestLocalScore = migrant
+                    tracker.reset(solution)
+                    count = 0
 
             # Update if better global solution is found
             if bestLocalScore < bestScore:
-                flatSolution = [pos for piece in solution for pos in piece if pos != (0,0,0,0)]
                 bestScore = bestLocalScore
-                bestSolution = flatSolution
-                if bestScore == 0:
-                    isOptimal = True
+                bestSolution = list(solution)
+                publish_best_score(bestScore)
+                stats.improve(bestScore)
+                if deadline.reached(bestScore):
                     break
-                                   
+
+            stats.tick(restarts=nbRestart, iteration=nbIterations)
+            yield bestSolution, bestScore
+
     return bestSolution, bestScore
 
 
+class LocalSearchConfig(Config):
+    DEFAULTS = {
+        'timeLimit': 600, # time budget in seconds
+        'targetConflicts': 0,
+        'limitIterNoImprovement': 5000, # number of iterations without improvement before a restart
+    }
+
+
+@registry.register('local_search')
+class LocalSearchAgent(Agent):
+    """
+    Local search with restarts (see solve_local_search), one step is one move
+    """
+
+    CONFIG = LocalSearchConfig
+    islandSearch = staticmethod(solve_local_search)
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        config = self.config
+        return (yield from iterate_local_search(eternity_puzzle, seed, None, config.timeLimit, stats, config.targetConflicts,
+                                                config.limitIterNoImprovement))
+
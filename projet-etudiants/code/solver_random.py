@@ -1,5 +1,9 @@
 import numpy as np
-import copy
+import registry
+from agent import Agent, Config, run_search
+from board import Board
+from deadline import Deadline
+from stats import SearchStats
 
 
 def solve_random(eternity_puzzle):
@@ -10,45 +14,89 @@ def solve_random(eternity_puzzle):
         cost is the cost of the solution
     """
 
-    solution = []
-    remaining_piece = copy.deepcopy(eternity_puzzle.piece_list)
-
-    for i in range(eternity_puzzle.n_piece):
-        range_remaining = np.arange(len(remaining_piece))
-        piece_idx = np.random.choice(range_remaining)
-
-        piece = remaining_piece[piece_idx]
-
-        permutation_idx = np.random.choice(np.arange(4))
-
-        piece_permuted = eternity_puzzle.generate_rotation(piece)[permutation_idx]
-
-        solution.append(piece_permuted)
-
-        remaining_piece.remove(piece)
+    board = Board(eternity_puzzle, np.random.permutation(eternity_puzzle.n_piece),
+                  np.random.randint(4, size=eternity_puzzle.n_piece))
+    solution = board.to_solution()
 
     return solution, eternity_puzzle.get_total_n_conflict(solution)
 
-def solve_best_random(eternity_puzzle, n_trial):
+def solve_best_random(eternity_puzzle, n_trial, batch_size=1000, seed=None, timeLimit=None, stats=None, targetConflicts=0):
     """
     Random solution of the problem (best of n_trial random solution generated)
     :param eternity_puzzle: object describing the input
     :param n_trial: number of random solution generated
+    :param batch_size: number of random solutions generated and scored together (see get_total_n_conflict_batch)
+    :param seed: seed of the random generator (None to keep its current state)
+    :param timeLimit: time budget in seconds, the generation stops after the batch exceeding it (None for no limit)
+    :param stats: SearchStats recording the progress of the search (optional)
+    :param targetConflicts: the generation stops when a solution has at most this number of conflicts
     :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
         cost is the cost of the solution, the solution is the best among the n_trial generated ones
     """
+    return run_search(iterate_best_random(eternity_puzzle, n_trial, batch_size, seed, timeLimit, stats, targetConflicts))
+
+def iterate_best_random(eternity_puzzle, n_trial, batch_size=1000, seed=None, timeLimit=None, stats=None, targetConflicts=0):
+    """
+    Search of solve_best_random() as a generator yielding (best solution, best cost) after each batch (see Agent.iterate)
+    """
+    deadline = Deadline(timeLimit, targetConflicts)
+    if seed is not None:
+        np.random.seed(seed)
+    if stats is None:
+        stats = SearchStats()
+
     best_n_conflict = 1000000
 
-    best_solution = None
+    best_board = None
+
+    for start in range(0, n_trial, batch_size):
+        cur_batch_size = min(batch_size, n_trial - start)
 
-    for i in range(n_trial):
+        # One random permutation of the pieces and random rotations per solution of the batch
+        with stats.phase('construct'):
+            pieces = np.argsort(np.random.random((cur_batch_size, eternity_puzzle.n_piece)), axis=1)
+            rotations = np.random.randint(4, size=(cur_batch_size, eternity_puzzle.n_piece))
 
-        cur_sol, cur_n_conflict = solve_random(eternity_puzzle)
+        with stats.phase('score'):
+            n_conflicts = eternity_puzzle.get_total_n_conflict_batch(eternity_puzzle.piece_table[pieces, rotations])
+            best_idx = np.argmin(n_conflicts)
+        stats.count(cur_batch_size)
+        stats.tick(iteration=start // batch_size + 1)
 
-        if cur_n_conflict < best_n_conflict:
-            best_n_conflict = cur_n_conflict
-            best_solution = cur_sol
+        if n_conflicts[best_idx] < best_n_conflict:
+            best_n_conflict = int(n_conflicts[best_idx])
+            best_board = Board(eternity_puzzle, pieces[best_idx], rotations[best_idx])
+            best_solution = best_board.to_solution()
+            stats.improve(best_n_conflict)
 
-    assert best_solution != None
+        if deadline.reached(best_n_conflict) or deadline.expired():
+            break
+
+        yield best_solution, best_n_conflict
+
+    assert best_board != None
 
     return best_solution, best_n_conflict
+
+
+class RandomConfig(Config):
+    DEFAULTS = {
+        'nbTrial': 100000, # number of random solutions generated
+        'batchSize': 1000,
+        'timeLimit': None, # time budget in seconds (None for no limit)
+        'targetConflicts': 0,
+    }
+
+
+@registry.register('random')
+class RandomAgent(Agent):
+    """
+    Best of `nbTrial` random solutions
+    """
+
+    CONFIG = RandomConfig
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        config = self.config
+        return (yield from iterate_best_random(eternity_puzzle, config.nbTrial, config.batchSize, seed, config.timeLimit, stats,
+                                               config.targetConflicts))
@@ -0,0 +1,208 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+import time
+import registry
+from agent import Agent, Config, run_search
+from board import Board
+from checkpoint import Checkpoint
+from deadline import Deadline
+from eternity_puzzle import INTERIOR
+from parallel import publish_best_score, is_solved_by_other_worker
+from solver_local_search import generate_initial_solution, get_position_pools
+from stats import SearchStats
+
+def solve_tabu(eternity_puzzle, seed=1, fullNeighbourhood=False, timeLimit=600, stats=None, checkpoint=None, targetConflicts=0):
+    """
+    Tabu search solution of the problem. At each iteration the best move of the neighbourhood is applied, even if it is worse.
+        A move swaps the pieces of two positions of the same pool (corners, edges or internal positions) with their best
+        rotations, or turns one piece. The pieces moved recently are tabu, unless the move gives a new best solution (aspiration).
+    :param eternity_puzzle: object describing the input
+    :param seed: seed of the random generator
+    :param fullNeighbourhood: evaluate all the pairs of positions of each pool at each iteration instead of a sample
+    :param timeLimit: time budget in seconds
+    :param stats: SearchStats recording the progress of the search (optional)
+    :param checkpoint: Checkpoint hook saving the best solution and giving the starting solution (optional)
+    :param targetConflicts: the search stops when a solution has at most this number of conflicts
+    :return: a tuple (solution, cost) where solution is a list of the pieces (rotations applied) and
+        cost is the cost of the solution
+    """
+    return run_search(iterate_tabu(eternity_puzzle, seed, fullNeighbourhood, timeLimit, stats, checkpoint, targetConflicts))
+
+def iterate_tabu(eternity_puzzle, seed=1, fullNeighbourhood=False, timeLimit=600, stats=None, checkpoint=None,
+                 targetConflicts=0, nbSampledPairs=None, tabuTenure=None):
+    """
+    Search of solve_tabu() as a generator yielding (best solution, best cost) after each iteration (see Agent.iterate)
+    :param nbSampledPairs: number of pairs of positions evaluated at each iteration (None for 3 * n_piece)
+    :param tabuTenure: minimum number of iterations a moved piece stays tabu (None for max(5, n_piece // 10))
+    """
+
+    def best_swap(k1, k2, solution):
+        """
+        Best rotations to swap the pieces at positions `k1` and `k2`, or to turn the piece at `k1` if `k1` == `k2`
+        :param solution: current solution
+        :return: a tuple (delta, move) where delta is the variation of the number of conflicts and move is given to apply_move(),
+            None if there is no move (a frame piece already in its forced orientation is not turned)
+        """
+        piece1 = solution[k1]
+        piece2 = solution[k2]
+
+        if eternity_puzzle.position_class[k1] != INTERIOR:
+            # Frame: the only legal change is to swap the 2 pieces in their forced orientations (see get_frame_piece),
+            # a frame piece without forced orientation here (unusual instance) is turned like an interior piece
+            framePiece1 = eternity_puzzle.get_frame_piece(piece2, k1)
+            framePiece2 = eternity_puzzle.get_frame_piece(piece1, k2)
+            if framePiece1 is not None and framePiece2 is not None:
+                if framePiece1 == piece1 and framePiece2 == piece2:
+                    return None
+                stats.count(1)
+                move = (k1, framePiece1, k2, framePiece2)
+                return eternity_puzzle.get_move_delta(*move, solution), move
+
+        if k1 == k2:
+            stats.count(3)
+            return min((eternity_puzzle.get_move_delta(k1, rotated, k1, rotated, solution), (k1, rotated, k1, rotated))
+                       for rotated in eternity_puzzle.generate_rotation(piece1)[1:])
+
+        _, areNeighbours = eternity_puzzle.exist_conflict_between_pieces(k1, k2, solution)
+        if areNeighbours:
+            # The shared edge links the 2 rotations, the 16 combinations are evaluated
+            stats.count(16)
+            return min((eternity_puzzle.get_move_delta(k1, rotated2, k2, rotated1, solution), (k1, rotated2, k2, rotated1))
+                       for rotated1 in eternity_puzzle.generate_rotation(piece1)
+                       for rotated2 in eternity_puzzle.generate_rotation(piece2))
+
+        # The 2 rotations are independent: best rotation of piece2 at `k1` + best rotation of piece1 at `k2`
+        stats.count(8)
+        delta1, rotated2 = min((eternity_puzzle.get_move_delta(k1, rotated, k1, rotated, solution), rotated)
+                               for rotated in eternity_puzzle.generate_rotation(piece2))
+        delta2, rotated1 = min((eternity_puzzle.get_move_delta(k2, rotated, k2, rotated, solution), rotated)
+                               for rotated in eternity_puzzle.generate_rotation(piece1))
+        return delta1 + delta2, (k1, rotated2, k2, rotated1)
+
+    ### INITIALISATION ###
+    deadline = Deadline(timeLimit, targetConflicts)
+    random.seed(seed)
+    if stats is None:
+        stats = SearchStats()
+    if checkpoint is None:
+        checkpoint = Checkpoint(eternity_puzzle)
+    checkpoint.restore_random()
+    checkpoint.restore_stats(stats)
+    n_piece = eternity_puzzle.n_piece
+
+    # Moves stay inside a pool: corners with corners, edges with edges and internal positions with internal positions
+    pools = [pool for pool in get_position_pools(eternity_puzzle) if pool]
+    poolOf = [None] * n_piece
+    for pool in pools:
+        for k in pool:
+            poolOf[k] = pool
+
+    if checkpoint.incumbent is not None:
+        solution = list(checkpoint.incumbent)
+    else:
+        with stats.phase('construct'):
+            solution = generate_initial_solution(eternity_puzzle)
+    pieceIds = Board.from_solution(eternity_puzzle, solution).pieces.tolist() # piece at each position, for the tabu list
+    score = eternity_puzzle.get_total_n_conflict(solution)
+    bestSolution = list(solution)
+    bestScore = score
+    publish_best_score(bestScore)
+    stats.improve(bestScore)
+    checkpoint.improve(bestSolution, bestScore)
+
+    # Hyperparameters
+    if nbSampledPairs is None:
+        nbSampledPairs = 3 * n_piece
+    if tabuTenure is None:
+        tabuTenure = max(5, n_piece // 10)
+    tabuUntil = [0] * n_piece # a piece is tabu until this iteration
+
+    iteration = 0
+
+    ### TABU SEARCH ###
+    while not deadline.reached(bestScore) and not deadline.expired() and not is_solved_by_other_worker(targetConflicts):
+        iteration += 1
+        checkpoint.tick(stats)
+
+        # Neighbourhood: sampled or all the pairs of positions of each pool (a pair (k, k) turns the piece at k)
+        if fullNeighbourhood:
+            pairs = [(k1, k2) for pool in pools for index, k1 in enumerate(pool) for k2 in pool[index:]]
+        else:
+            pairs = []
+            for _ in range(nbSampledPairs):
+                k1 = random.randrange(n_piece)
+                pairs.append((k1, random.choice(poolOf[k1])))
+
+        # Best non-tabu move (or tabu move giving a new best solution)
+        bestDelta = None
+        bestMove = None
+        for k1, k2 in pairs:
+            swap = best_swap(k1, k2, solution)
+            if swap is None:
+                continue
+            delta, move = swap
+            isTabu = tabuUntil[pieceIds[k1]] > iteration or tabuUntil[pieceIds[k2]] > iteration
+            if isTabu and score + delta >= bestScore:
+                continue
+            if bestDelta is None or delta < bestDelta:
+                bestDelta = delta
+                bestMove = move
+            # The full neighbourhood of a large board takes a while, the time limit is checked during its evaluation
+            if deadline.expired():
+                break
+
+        if bestMove is None:
+            yield bestSolution, bestScore
+            continue
+
+        # Apply the move (even if it is worse) and make the moved pieces tabu
+        k1, _, k2, _ = bestMove
+        eternity_puzzle.apply_move(*bestMove, solution)
+        pieceIds[k1], pieceIds[k2] = pieceIds[k2], pieceIds[k1]
+        tabuUntil[pieceIds[k1]] = iteration + tabuTenure + random.randint(0, tabuTenure)
+        tabuUntil[pieceIds[k2]] = iteration + tabuTenure + random.randint(0, tabuTenure)
+        score += bestDelta
+
+        if score < bestScore:
+            bestScore = score
+            bestSolution = list(solution)
+            publish_best_score(bestScore)
+            stats.improve(bestScore)
+            checkpoint.improve(bestSolution, bestScore)
+
+        stats.tick(iteration=iteration, score=score)
+        yield bestSolution, bestScore
+
+    checkpoint.save(stats)
+    solvingTime = time.monotonic() - deadline.startTime
+    print("[INFO] tabu search: %d iterations, %d moves evaluated (%d moves/sec)" %
+          (iteration, stats.nbEvaluations, stats.nbEvaluations / max(solvingTime, 1e-9)))
+
+    return bestSolution, bestScore
+
+
+class TabuConfig(Config):
+    DEFAULTS = {
+        'timeLimit': 600, # time budget in seconds
+        'targetConflicts': 0,
+        'fullNeighbourhood': False,
+        'nbSampledPairs': None, # None: 3 * n_piece
+        'tabuTenure': None, # None: max(5, n_piece // 10)
+    }
+
+
+@registry.register('tabu')
+class TabuAgent(Agent):
+    """
+    Tabu search (see solve_tabu), one step is one move
+    """
+
+    CONFIG = TabuConfig
+    supportsCheckpoint = True
+
+    def iterate(self, eternity_puzzle, seed, stats, checkpoint):
+        config = self.config
+        return (yield from iterate_tabu(eternity_puzzle, seed, config.fullNeighbourhood, config.timeLimit, stats, checkpoint,
+                                        config.targetConflicts, config.nbSampledPairs, config.tabuTenure))
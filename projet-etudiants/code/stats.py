@@ -0,0 +1,178 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import contextlib
+import functools
+import json
+import time
+
+# Counters of the solvers counting from the start of the search, continued from their saved value by a resumed search
+CUMULATIVE_COUNTERS = ('iteration', 'restarts', 'duplicateRepairs')
+
+
+class SearchStats:
+    """
+    Progress of a search, filled by the solvers: trajectory of the best score, number of evaluations (moves or solutions
+        scored), counters of the solver (iteration, restarts, ...) and time spent in each phase (construct, destroy, ...).
+        With a telemetry file, a JSON line describing the progress is written every `interval` seconds, so a stalled search
+        (no new best score) can be told from a slow one (few evaluations per second).
+    """
+
+    def __init__(self, telemetry=None, interval=5., profile=False):
+        """
+        :param telemetry: file object receiving the JSON-lines events (None for no telemetry)
+        :param interval: minimum number of seconds between two progress events
+        :param profile: time each call of the functions given to profiled() and profile_methods() (slows the search down)
+        """
+        self.startTime = time.time()
+        self.trajectory = [] # (elapsed seconds, best score)
+        self.nbEvaluations = 0
+        self.counters = {} # counters of the solver given to tick()
+        self.counterOffsets = {} # values of the cumulative counters when the search was resumed (see resume)
+        self.phaseTimes = {} # phase -> seconds
+        self.telemetry = telemetry
+        self.interval = interval
+        self.nextReport = self.startTime + interval
+        self.lastReportTime = self.startTime
+        self.lastReportEvaluations = 0
+        self.profile = profile
+        self.functionTimes = {} # function -> [number of calls, seconds]
+        self.patchedMethods = [] # (object, method name) patched by profile_methods()
+
+    def to_checkpoint(self):
+        """
+        :return: dictionary of the statistics saved in a checkpoint, given to resume() by the resumed search
+        """
+        return {'trajectory': self.trajectory, 'nbEvaluations': self.nbEvaluations, 'elapsed': self.elapsed(),
+                'phaseTimes': self.phaseTimes, 'counters': self.counters}
+
+    def resume(self, saved):
+        """
+        Continue the statistics of a search saved in a checkpoint: the elapsed time, the trajectory, the number of
+            evaluations and the time of each phase go on from the saved values, the cumulative counters of the solver
+            (iteration, restarts, ...) are added to their saved value
+        :param saved: statistics saved in the checkpoint (see to_checkpoint)
+        """
+        now = time.time()
+        self.startTime = now - saved['elapsed']
+        self.trajectory = list(saved['trajectory'])
+        self.nbEvaluations = saved['nbEvaluations']
+        self.phaseTimes = dict(saved.get('phaseTimes', {}))
+        self.counters = dict(saved.get('counters', {}))
+        self.counterOffsets = {name: value for name, value in self.counters.items() if name in CUMULATIVE_COUNTERS}
+        self.lastReportTime = now
+        self.lastReportEvaluations = self.nbEvaluations
+
+    def improve(self, score):
+        """
+        Record `score` in the trajectory if it is a new best score
+        """
+        if not self.trajectory or score < self.trajectory[-1][1]:
+            self.trajectory.append((time.time() - self.startTime, score))
+
+    def count(self, nbEvaluations=1):
+        """
+        Add `nbEvaluations` moves or solutions scored
+        """
+        self.nbEvaluations += nbEvaluations
+
+    def elapsed(self):
+        """
+        :return: number of seconds since the start of the search
+        """
+        return time.time() - self.startTime
+
+    def best_score(self):
+        """
+        :return: best score recorded, None if there is none
+        """
+        return self.trajectory[-1][1] if self.trajectory else None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager adding the time spent in its block to the phase `name`
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phaseTimes[name] = self.phaseTimes.get(name, 0.) + time.perf_counter() - start
+
+    def tick(self, **counters):
+        """
+        Update the counters of the solver (iteration, restarts, ...) and write a progress event if the last one is older
+            than `interval` seconds
+        """
+        for name, value in counters.items():
+            self.counters[name] = value + self.counterOffsets[name] if name in self.counterOffsets else value
+        if self.telemetry is not None and time.time() >= self.nextReport:
+            self.report('progress')
+
+    def report(self, event):
+        """
+        Write the event `event` with the current progress of the search to the telemetry file (no-op without telemetry)
+        """
+        if self.telemetry is None:
+            return
+        now = time.time()
+        record = {
+            'event': event,
+            'time': round(now - self.startTime, 3),
+            'best': self.best_score(),
+            'evaluations': self.nbEvaluations,
+            'evaluations_per_sec': round((self.nbEvaluations - self.lastReportEvaluations) / max(now - self.lastReportTime, 1e-9), 1),
+        }
+        record.update(self.counters)
+        record['phases'] = {name: round(seconds, 3) for name, seconds in self.phaseTimes.items()}
+        if event == 'end' and self.profile:
+            record['functions'] = {name: {'calls': calls, 'seconds': round(seconds, 3)}
+                                   for name, (calls, seconds) in self.functionTimes.items() if calls > 0}
+        self.telemetry.write(json.dumps(record) + '\n')
+        self.telemetry.flush()
+
+        self.nextReport = now + self.interval
+        self.lastReportTime = now
+        self.lastReportEvaluations = self.nbEvaluations
+
+    def profiled(self, function, name=None):
+        """
+        :param function: function to time
+        :param name: name of the function in the report (`function.__qualname__` by default)
+        :return: `function` wrapped to count its calls and their cumulative time (including the timed functions it calls)
+            in profile mode, `function` itself otherwise
+        """
+        if not self.profile:
+            return function
+        name = name or function.__qualname__
+        times = self.functionTimes.setdefault(name, [0, 0.])
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[0] += 1
+                times[1] += time.perf_counter() - start
+
+        return wrapper
+
+    def profile_methods(self, obj, names):
+        """
+        In profile mode, time the calls of the methods `names` of `obj` (also the calls made by the solvers), until close()
+        """
+        if not self.profile:
+            return
+        for name in names:
+            setattr(obj, name, self.profiled(getattr(obj, name), type(obj).__name__ + '.' + name))
+            self.patchedMethods.append((obj, name))
+
+    def close(self):
+        """
+        End of the search: write the final event (with the time of each profiled function) and remove the timed methods
+        """
+        self.report('end')
+        for obj, name in self.patchedMethods:
+            delattr(obj, name)
+        self.patchedMethods = []
@@ -0,0 +1,40 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import os
+import random
+import sys
+import pytest
+
+# The modules of the solver are flat modules of the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import binary_format
+from eternity_puzzle import EternityPuzzle
+from generator import generate_instance
+
+
+@pytest.fixture
+def make_puzzle(tmp_path):
+    """
+    :return: function (board size, seed) -> (EternityPuzzle of a generated instance, its planted solution without conflict)
+    """
+    def make(board_size=6, seed=1):
+        pieces, solution = generate_instance(board_size, 3, 5, seed)
+        path = str(tmp_path / ('generated_%d_%d.txt' % (board_size, seed)))
+        binary_format.write_text_instance(path, pieces)
+        return EternityPuzzle(path), list(map(tuple, solution.tolist()))
+    return make
+
+
+@pytest.fixture
+def random_solution():
+    """
+    :return: function (eternity_puzzle, seed) -> solution with the pieces of the instance shuffled and turned randomly
+    """
+    def make(eternity_puzzle, seed=1):
+        generator = random.Random(seed)
+        solution = [eternity_puzzle.get_rotated_piece(piece, generator.randrange(4)) for piece in eternity_puzzle.piece_list]
+        generator.shuffle(solution)
+        return solution
+    return make
@@ -0,0 +1,40 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import itertools
+import random
+from assignment import hungarian, solve_assignment, get_placement_costs
+
+
+def brute_force_cost(cost):
+    """
+    :return: minimum cost of an assignment, over all the permutations
+    """
+    n = len(cost)
+    return min(sum(cost[row][column] for row, column in enumerate(permutation))
+               for permutation in itertools.permutations(range(n)))
+
+
+def test_hungarian_matches_brute_force():
+    generator = random.Random(1)
+    for n in range(1, 7):
+        for _ in range(20):
+            cost = [[generator.randrange(5) for _ in range(n)] for _ in range(n)]
+            for assigned in (hungarian(cost), solve_assignment(cost).tolist()):
+                assert sorted(assigned) == list(range(n))
+                assert sum(cost[row][column] for row, column in enumerate(assigned)) == brute_force_cost(cost)
+
+
+def test_placement_costs(make_puzzle, random_solution):
+    e, _ = make_puzzle(6)
+    solution = random_solution(e)
+    cells = [7, 9, 20, 28] # pairwise non-adjacent
+    pieces = [solution[k] for k in cells]
+    costs, rotations, placed = get_placement_costs(e, cells, pieces, solution)
+    for c, k in enumerate(cells):
+        for p in range(len(pieces)):
+            trial = list(solution)
+            trial[k] = tuple(placed[p, rotations[c, p]].tolist())
+            assert costs[c, p] == e.get_local_n_conflict(k, trial)
+            assert costs[c, p] == min(e.get_local_n_conflict(k, trial[:k] + [rotated] + trial[k + 1:])
+                                      for rotated in e.generate_rotation(pieces[p]))
@@ -0,0 +1,17 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import numpy as np
+
+
+def test_batch_scoring_matches_a_loop(make_puzzle, random_solution):
+    e, planted = make_puzzle(7)
+    solutions = [planted] + [random_solution(e, seed) for seed in range(20)]
+    scores = e.get_total_n_conflict_batch(np.array(solutions))
+    assert scores.tolist() == [e.get_total_n_conflict(solution) for solution in solutions]
+    assert scores[0] == 0
+
+
+def test_batch_scoring_of_a_single_piece_board(make_puzzle):
+    e, planted = make_puzzle(1)
+    assert e.get_total_n_conflict_batch(np.array([planted])).tolist() == [e.get_total_n_conflict(planted)]
@@ -0,0 +1,46 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import numpy as np
+import pytest
+import binary_format
+from eternity_puzzle import EternityPuzzle
+from generator import generate_instance
+
+
+def test_instance_round_trip(tmp_path):
+    pieces, _ = generate_instance(8, seed=4)
+    textPath = str(tmp_path / 'instance.txt')
+    binaryPath = str(tmp_path / 'instance.e2b')
+    binary_format.write_text_instance(textPath, pieces)
+    binary_format.write_boards(binaryPath, pieces[None], binary_format.INSTANCE)
+
+    assert binary_format.is_binary(binaryPath) and not binary_format.is_binary(textPath)
+    boardSize, boards = binary_format.read_boards(binaryPath, binary_format.INSTANCE)
+    assert boardSize == 8 and (boards[0] == pieces).all()
+
+    # The binary instance is mapped as the piece table of the text instance
+    text = EternityPuzzle(textPath)
+    binary = EternityPuzzle(binaryPath)
+    assert isinstance(binary.piece_table, np.memmap)
+    assert (binary.piece_table == text.piece_table).all()
+    assert binary.piece_list == text.piece_list
+
+    # Conversion back to the text format
+    convertedPath = str(tmp_path / 'converted.txt')
+    binary_format.convert(binaryPath, convertedPath)
+    assert (binary_format.read_text_instance(convertedPath)[1] == pieces).all()
+
+
+def test_solutions_round_trip(tmp_path):
+    pieces, solution = generate_instance(5, seed=2)
+    path = str(tmp_path / 'solutions.e2b')
+    binary_format.write_boards(path, [solution], binary_format.SOLUTIONS)
+    binary_format.write_boards(path, [pieces, solution], binary_format.SOLUTIONS, append=True)
+
+    boardSize, boards = binary_format.read_boards(path, binary_format.SOLUTIONS)
+    assert boardSize == 5 and boards.shape == (3, 25, 4)
+    assert (boards[0] == solution).all() and (boards[1] == pieces).all() and (boards[2] == solution).all()
+    assert binary_format.count_conflicts(boards[0]) == 0
+    with pytest.raises(Exception):
+        binary_format.read_boards(path, binary_format.INSTANCE)
@@ -0,0 +1,33 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import pytest
+from board import Board
+
+
+def test_board_round_trip(make_puzzle, random_solution):
+    e, planted = make_puzzle(6)
+    for solution in (planted, random_solution(e)):
+        board = Board.from_solution(e, solution)
+        assert board.to_solution() == solution
+        assert board.get_n_conflict() == e.get_total_n_conflict(solution)
+
+
+def test_board_moves_match_the_solution(make_puzzle, random_solution):
+    e, _ = make_puzzle(5, seed=2)
+    solution = random_solution(e)
+    board = Board.from_solution(e, solution)
+    copy = board.copy()
+    board.swap(3, 17)
+    board.rotate(3, 1)
+    solution[3], solution[17] = e.get_rotated_piece(solution[17], 1), solution[3]
+    assert board.to_solution() == solution
+    assert copy.to_solution() != solution
+
+
+def test_board_rejects_foreign_pieces(make_puzzle):
+    e, planted = make_puzzle(4)
+    solution = list(planted)
+    solution[0] = (99, 99, 99, 99)
+    with pytest.raises(Exception):
+        Board.from_solution(e, solution)
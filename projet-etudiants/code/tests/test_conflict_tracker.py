@@ -0,0 +1,61 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+from conflict_tracker import ConflictTracker
+
+
+def check_tracker(e, tracker, solution):
+    """
+    Compare the tracker with a full recount of the conflicts of each position
+    """
+    expected = [0 if solution[k][0] == -1 else e.get_local_n_conflict(k, solution) for k in range(e.n_piece)]
+    assert tracker.conflicts == expected
+    for n_conflict, bucket in enumerate(tracker.buckets):
+        assert sorted(bucket) == [k for k in range(e.n_piece) if expected[k] == n_conflict]
+        assert all(tracker.position[k] == index for index, k in enumerate(bucket))
+    assert sorted(tracker.conflicting()) == [k for k in range(e.n_piece) if expected[k] > 0]
+
+
+def test_tracker_matches_full_recount(make_puzzle, random_solution):
+    e, _ = make_puzzle(6)
+    solution = random_solution(e)
+    tracker = ConflictTracker(e, solution)
+    check_tracker(e, tracker, solution)
+
+    generator = random.Random(1)
+    removed = []
+    for _ in range(300):
+        move = generator.random()
+        k1 = generator.randrange(e.n_piece)
+        k2 = generator.randrange(e.n_piece)
+        if move < 0.2 and solution[k1][0] != -1:
+            # De-assign a position
+            removed.append(solution[k1])
+            solution[k1] = (-1, -1, -1, -1)
+            cells = [k1]
+        elif move < 0.4 and removed and solution[k1][0] == -1:
+            # Place a removed piece back
+            solution[k1] = removed.pop()
+            cells = [k1]
+        else:
+            # Swap 2 positions (possibly unassigned), the piece moved to `k2` is turned
+            piece1 = solution[k1] if solution[k1][0] == -1 else e.get_rotated_piece(solution[k1], generator.randrange(4))
+            solution[k1], solution[k2] = solution[k2], piece1
+            cells = [k1, k2]
+        tracker.refresh(cells, solution)
+        check_tracker(e, tracker, solution)
+
+
+def test_worst_and_sample_conflicting(make_puzzle, random_solution):
+    e, planted = make_puzzle(5)
+    tracker = ConflictTracker(e, planted)
+    assert tracker.nb_conflicting() == 0 and tracker.sample_conflicting() is None
+
+    solution = random_solution(e)
+    tracker.reset(solution)
+    worst = tracker.worst(6)
+    assert len(set(worst)) == 6
+    threshold = min(tracker.conflicts[k] for k in worst)
+    assert all(tracker.conflicts[k] <= threshold for k in range(e.n_piece) if k not in worst)
+    assert tracker.conflicts[tracker.sample_conflicting()] > 0
@@ -0,0 +1,57 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+from eternity_puzzle import GRAY, INTERIOR
+from frame import get_frame_ring, get_side_towards, solve_frame
+
+
+def check_frame(e, frame):
+    """
+    Check that `frame` holds each frame position once, with distinct pieces in their forced orientation and no conflict
+        between 2 consecutive positions of the ring
+    """
+    ring = get_frame_ring(e.board_size)
+    assert [k for k, _, _ in frame] == ring
+    assert len(set(piece for _, piece, _ in frame)) == len(ring)
+    colors = {k: e.piece_table[piece][rotation].tolist() for k, piece, rotation in frame}
+    for k in ring:
+        assert all((colors[k][side] == GRAY) == e.border_mask[k][side] for side in range(4))
+    for t, k in enumerate(ring):
+        following = ring[(t + 1) % len(ring)]
+        assert colors[k][get_side_towards(k, following, e.board_size)] == \
+            colors[following][get_side_towards(following, k, e.board_size)]
+
+
+def test_frame_ring():
+    ring = get_frame_ring(4)
+    assert ring == [0, 1, 2, 3, 7, 11, 15, 14, 13, 12, 8, 4]
+    assert all(get_side_towards(k, ring[(t + 1) % len(ring)], 4) != get_side_towards(k, ring[t - 1], 4)
+               for t, k in enumerate(ring))
+
+
+def test_solved_frame_has_no_conflict(make_puzzle):
+    for board_size, seed in ((4, 1), (7, 2), (12, 3)):
+        e, _ = make_puzzle(board_size, seed)
+        random.seed(seed)
+        frame = solve_frame(e)
+        assert frame is not None
+        check_frame(e, frame)
+        assert all(e.piece_class[piece] != INTERIOR for _, piece, _ in frame)
+
+
+def test_frame_of_a_large_board(make_puzzle):
+    # The ring of a 260 x 260 board has 1036 positions, more than the default recursion limit
+    e, _ = make_puzzle(260)
+    random.seed(1)
+    frame = solve_frame(e, nodeLimit=200000)
+    assert frame is not None
+    check_frame(e, frame)
+
+
+def test_node_limit(make_puzzle):
+    # A frame of 12 positions needs at least 11 pieces placed after the first corner
+    e, _ = make_puzzle(4)
+    random.seed(1)
+    assert solve_frame(e, nodeLimit=10) is None
+    assert solve_frame(e, nodeLimit=None) is not None
@@ -0,0 +1,40 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+
+
+def test_move_delta_matches_full_recount(make_puzzle, random_solution):
+    e, _ = make_puzzle(6)
+    solution = random_solution(e)
+    generator = random.Random(2)
+    for _ in range(500):
+        k1 = generator.randrange(e.n_piece)
+        k2 = generator.randrange(e.n_piece)
+        piece1 = e.get_rotated_piece(solution[k2], generator.randrange(4))
+        piece2 = e.get_rotated_piece(solution[k1], generator.randrange(4))
+        if k1 == k2:
+            piece1 = piece2
+        before = e.get_total_n_conflict(solution)
+        delta = e.get_move_delta(k1, piece1, k2, piece2, solution)
+        assert e.get_total_n_conflict(solution) == before # the solution is left unchanged
+
+        e.apply_move(k1, piece1, k2, piece2, solution)
+        assert e.get_total_n_conflict(solution) == before + delta
+
+
+def test_swap_and_rotation_deltas_match_full_recount(make_puzzle, random_solution):
+    e, _ = make_puzzle(5, seed=3)
+    solution = random_solution(e, seed=3)
+    before = e.get_total_n_conflict(solution)
+    for k1 in range(e.n_piece):
+        for rotation in range(4):
+            turned = list(solution)
+            turned[k1] = e.get_rotated_piece(solution[k1], rotation)
+            assert e.get_rotation_delta(k1, rotation, solution) == e.get_total_n_conflict(turned) - before
+        for k2 in range(k1 + 1, e.n_piece):
+            r1, r2 = (k1 + k2) % 4, k2 % 4
+            swapped = list(solution)
+            swapped[k1] = e.get_rotated_piece(solution[k2], r2)
+            swapped[k2] = e.get_rotated_piece(solution[k1], r1)
+            assert e.get_swap_delta(k1, k2, r1, r2, solution) == e.get_total_n_conflict(swapped) - before
@@ -0,0 +1,53 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+from piece_index import PieceIndex
+
+
+def brute_force_lookup(e, available, facing, borderSides=None):
+    """
+    :return: (number of conflicts, sorted list of (piece, rotation)) of the available placements with the fewest conflicts
+        with `facing` (only the placements with their GRAY sides on `borderSides` if given)
+    """
+    placements = {}
+    for piece in available:
+        for rotation, colors in enumerate(e.piece_table[piece].tolist()):
+            graySides = sum(1 << side for side in range(4) if colors[side] == 0)
+            if borderSides is not None and graySides != borderSides:
+                continue
+            n_conflict = sum(1 for side in range(4) if facing[side] != -1 and colors[side] != facing[side])
+            placements.setdefault(n_conflict, []).append((piece, rotation))
+    if not placements:
+        return None, []
+    n_conflict = min(placements)
+    return n_conflict, sorted(placements[n_conflict])
+
+
+def test_lookup_matches_brute_force(make_puzzle):
+    e, _ = make_puzzle(6)
+    index = PieceIndex(e)
+    generator = random.Random(1)
+    available = set(range(e.n_piece))
+    for _ in range(300):
+        if len(available) > 1 and generator.random() < 0.5:
+            piece = generator.choice(sorted(available))
+            index.remove(piece)
+            available.remove(piece)
+        facing = tuple(generator.choice([-1, 0] + list(range(1, e.n_color))) for _ in range(4))
+        assert index.lookup(facing) == brute_force_lookup(e, available, facing)
+
+        k = generator.randrange(e.n_piece)
+        expected = brute_force_lookup(e, available, facing, e.border_sides[k])
+        if not expected[1]: # no legal placement left: lookup() falls back on all the placements
+            expected = brute_force_lookup(e, available, facing)
+        assert index.lookup(facing, e.border_sides[k]) == expected
+
+
+def test_restore_rotated_piece(make_puzzle):
+    e, planted = make_puzzle(4)
+    index = PieceIndex(e)
+    index.remove_all()
+    restored = sorted(index.restore_rotated_piece(piece) for piece in planted)
+    assert restored == list(range(e.n_piece))
+    assert all(index.available)
@@ -0,0 +1,34 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+from trail import Trail
+
+
+def test_undo_to_a_mark_and_commit(make_puzzle, random_solution):
+    e, _ = make_puzzle(5)
+    solution = random_solution(e)
+    initial = list(solution)
+    trail = Trail(solution)
+    generator = random.Random(1)
+
+    # Destroy, then repair several times from the destroyed state
+    for k in generator.sample(range(e.n_piece), 8):
+        trail.set(k, (-1, -1, -1, -1))
+    destroyed = list(solution)
+    destroyedMark = trail.mark()
+    for _ in range(5):
+        for k in generator.sample(range(e.n_piece), 6):
+            trail.set(k, initial[generator.randrange(e.n_piece)])
+        trail.undo(destroyedMark)
+        assert solution == destroyed
+
+    trail.undo()
+    assert solution == initial
+
+    # Committed changes are kept by a later undo
+    trail.set(0, initial[1])
+    trail.set(1, initial[0])
+    trail.commit()
+    trail.undo()
+    assert solution[:2] == [initial[1], initial[0]] and solution[2:] == initial[2:]
@@ -0,0 +1,44 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import random
+from zobrist import ScoreCache, ZobristTable
+
+
+def test_incremental_hash_matches_full_hash(make_puzzle, random_solution):
+    e, _ = make_puzzle(6)
+    zobrist = ZobristTable(e)
+    solution = random_solution(e)
+    solutionHash = zobrist.hash_solution(solution)
+    generator = random.Random(1)
+    for _ in range(200):
+        k1 = generator.randrange(e.n_piece)
+        k2 = generator.randrange(e.n_piece)
+        piece1 = e.get_rotated_piece(solution[k2], generator.randrange(4))
+        piece2 = e.get_rotated_piece(solution[k1], generator.randrange(4))
+        if k1 == k2:
+            piece1 = piece2
+        solutionHash ^= zobrist.placement(k1, solution[k1])
+        if k2 != k1:
+            solutionHash ^= zobrist.placement(k2, solution[k2])
+        e.apply_move(k1, piece1, k2, piece2, solution)
+        solutionHash ^= zobrist.placement(k1, solution[k1])
+        if k2 != k1:
+            solutionHash ^= zobrist.placement(k2, solution[k2])
+        assert solutionHash == zobrist.hash_solution(solution)
+
+    # An unassigned position does not change the hash
+    destroyed = list(solution)
+    destroyed[0] = (-1, -1, -1, -1)
+    assert zobrist.hash_solution(destroyed) == solutionHash ^ zobrist.placement(0, solution[0])
+
+
+def test_score_cache_evicts_the_least_recently_used():
+    cache = ScoreCache(capacity=2)
+    cache.put(1, 10)
+    cache.put(2, 20)
+    assert cache.get(1) == 10 # 2 is now the least recently used
+    cache.put(3, 30)
+    assert cache.get(2) is None
+    assert cache.get(1) == 10 and cache.get(3) == 30
+    assert cache.nbHits == 3 and cache.nbMisses == 1
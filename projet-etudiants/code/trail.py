@@ -0,0 +1,46 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+
+class Trail:
+    """
+    Undo stack of the changes of a solution modified in place: each set() records the piece it replaces, undo() puts the
+        pieces back in reverse order. Reverting or keeping the changes costs time proportional to the number of changed
+        positions, the solution is never copied.
+    """
+
+    def __init__(self, solution):
+        """
+        :param solution: solution (list of pieces) modified in place through the trail
+        """
+        self.solution = solution
+        self.changes = [] # (position, previous piece)
+
+    def set(self, k, piece):
+        """
+        Place `piece` at position `k`, (-1, -1, -1, -1) to de-assign it
+        """
+        self.changes.append((k, self.solution[k]))
+        self.solution[k] = piece
+
+    def mark(self):
+        """
+        :return: current state of the trail, to give to undo()
+        """
+        return len(self.changes)
+
+    def undo(self, mark=0):
+        """
+        Revert the changes made since mark() returned `mark` (all the changes by default)
+        """
+        changes = self.changes
+        solution = self.solution
+        while len(changes) > mark:
+            k, piece = changes.pop()
+            solution[k] = piece
+
+    def commit(self):
+        """
+        Keep all the changes (they can no longer be reverted)
+        """
+        self.changes.clear()
@@ -0,0 +1,156 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+import eternity_puzzle
+import registry
+import solver_advanced
+
+# Values tried for each hyperparameter of the advanced agent (see solver_advanced.HYPERPARAMETER_NAMES)
+SPACE = {
+    'proportionWorst': [0.025, 0.05, 0.075, 0.1, 0.15, 0.2],
+    'proportionRandom': [0.025, 0.05, 0.075, 0.1, 0.15, 0.2],
+    'limitIterNoImprovement': [25, 50, 75, 150, 300],
+    'nbRepairIter': [25, 50, 75, 150, 300],
+}
+
+# Instances loaded by each process of the pool
+puzzles = {}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Tune the hyperparameters of the advanced agent for each board size by "
+                                                 "successive halving")
+
+    parser.add_argument('--instances', type=str, nargs='+',
+                        default=sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instances', 'eternity_*.txt'))))
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--candidates', type=int, default=27, help="number of configurations of the first round")
+    parser.add_argument('--eta', type=int, default=3, help="1 / eta of the configurations are kept after each round")
+    parser.add_argument('--budget', type=float, default=1800., help="CPU seconds for the tuning of each board size")
+    parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--seed', type=int, default=1, help="seed of the sampling of the configurations")
+    parser.add_argument('--outfile', type=str, default=solver_advanced.TUNED_HYPERPARAMETERS_FILE)
+
+    return parser.parse_args()
+
+
+def sample_candidates(board_size, nbCandidates, seed):
+    """
+    :param board_size: number of positions on a side of the board
+    :param nbCandidates: number of configurations
+    :param seed: seed of the sampling
+    :return: list of `nbCandidates` distinct configurations {hyperparameter: value}, the first one is the current
+        configuration of the board size (the tuning never keeps a configuration worse than it on the tuning runs)
+    """
+    current = {name: value for name, value in solver_advanced.get_hyperparameters(board_size).items() if name in SPACE}
+    grid = [dict(zip(SPACE, values)) for values in itertools.product(*SPACE.values())]
+    grid = [candidate for candidate in grid if candidate != current]
+    return [current] + random.Random(seed).sample(grid, min(nbCandidates - 1, len(grid)))
+
+
+def run_candidate(instance, hyperparameters, seed, seconds):
+    """
+    One run of the advanced agent, stopped after `seconds` CPU seconds whatever its own time limit (CPU time, so the runs
+        get the same budget even if there are more jobs than processors)
+    :return: a tuple (number of conflicts of the best solution found, CPU seconds used)
+    """
+    if instance not in puzzles:
+        puzzles[instance] = eternity_puzzle.EternityPuzzle(instance)
+    agent = registry.create_agent('advanced', timeLimit=float('inf'), **hyperparameters)
+    agent.setup(puzzles[instance], seed)
+    startTime = time.process_time()
+    deadline = startTime + seconds
+    while agent.step() and time.process_time() < deadline:
+        pass
+    return agent.best()[1], time.process_time() - startTime
+
+
+def run_candidate_star(args):
+    index, instance, seed, hyperparameters, seconds = args
+    return index, run_candidate(instance, hyperparameters, seed, seconds)
+
+
+def successive_halving(pool, instances, seeds, candidates, eta, budget):
+    """
+    Successive halving with a fixed budget: each round gets the same share of the budget, shared by all the runs of the
+        round (every configuration kept is run on every instance with every seed), then the best 1 / eta of the
+        configurations (lowest mean number of conflicts, then lowest mean time as a run stops when it finds a solution
+        without conflict) are kept for the next, longer, round
+    :param pool: pool of processes running the runs
+    :param instances: paths of the instances (same board size)
+    :param seeds: seeds of the runs
+    :param candidates: list of configurations
+    :param eta: reduction factor between 2 rounds
+    :param budget: CPU seconds of the whole tuning
+    :return: a tuple (best configuration, its mean number of conflicts in the last round)
+    """
+    nbRounds = 1
+    nbKept = len(candidates)
+    while nbKept > eta:
+        nbKept //= eta
+        nbRounds += 1
+    remaining = list(range(len(candidates)))
+    for roundIndex in range(nbRounds):
+        seconds = budget / nbRounds / (len(remaining) * len(instances) * len(seeds))
+        runs = [(index, instance, seed, candidates[index], seconds) for index in remaining for instance in instances for seed in seeds]
+        scores = {index: [] for index in remaining}
+        for index, result in pool.imap_unordered(run_candidate_star, runs):
+            scores[index].append(result)
+        meanScores = {index: sum(n_conflict for n_conflict, _ in results) / len(results) for index, results in scores.items()}
+        meanTimes = {index: sum(cpuTime for _, cpuTime in results) / len(results) for index, results in scores.items()}
+
+        remaining.sort(key=lambda index: (meanScores[index], meanTimes[index], index))
+        print("[INFO] round %d: %d configurations, %.2f s per run, best %.2f conflicts %s" %
+              (roundIndex + 1, len(remaining), seconds, meanScores[remaining[0]], candidates[remaining[0]]))
+        if len(remaining) == 1:
+            break
+        remaining = remaining[:max(1, len(remaining) // eta)]
+
+    return candidates[remaining[0]], meanScores[remaining[0]]
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+
+    # The configurations are tuned for each board size separately
+    instancesBySize = {}
+    for instance in args.instances:
+        instancesBySize.setdefault(eternity_puzzle.EternityPuzzle(instance).board_size, []).append(instance)
+
+    print("***********************************************************")
+    print("[INFO] Start the tuning of the advanced agent")
+    print("[INFO] board sizes: %s" % ", ".join("%d (%d instances)" % (size, len(instances))
+                                              for size, instances in sorted(instancesBySize.items())))
+    print("[INFO] seeds: %s" % ", ".join(str(seed) for seed in args.seeds))
+    print("[INFO] %d configurations, eta %d, %s CPU seconds per board size, %d jobs" %
+          (args.candidates, args.eta, args.budget, args.jobs))
+    print("***********************************************************")
+
+    start_time = time.time()
+
+    tuned = solver_advanced.load_tuned_hyperparameters(args.outfile) if os.path.exists(args.outfile) else {}
+    with multiprocessing.get_context('spawn').Pool(args.jobs) as pool:
+        for board_size, instances in sorted(instancesBySize.items()):
+            print("[INFO] board size %d" % board_size)
+            candidates = sample_candidates(board_size, args.candidates, args.seed)
+            best, meanScore = successive_halving(pool, instances, args.seeds, candidates, args.eta, args.budget)
+            tuned[board_size] = best
+            print("[INFO] board size %d: %s (%.2f conflicts, current configuration: %s)" %
+                  (board_size, best, meanScore, "kept" if best == candidates[0] else "replaced"))
+
+            # Written after each board size, an interrupted tuning keeps the board sizes already tuned
+            with open(args.outfile, 'w') as f:
+                json.dump({str(size): tuned[size] for size in sorted(tuned)}, f, indent=1)
+
+    print("***********************************************************")
+    print("[INFO] Tuning finished in %.1f minutes" % ((time.time() - start_time) / 60))
+    print("[INFO] configurations: %s" % args.outfile)
+    print("***********************************************************")
@@ -0,0 +1,188 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.animation import PillowWriter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from eternity_puzzle import GRAY, BLACK, RED, WHITE, NORTH, SOUTH, WEST, EAST
+
+# Renderer of each board size, the figure is built once and reused by every drawing
+renderers = {}
+
+
+class Renderer:
+    """
+    Drawing of the solutions of a board size. All the triangles of the pieces are one PolyCollection and all the conflicts
+        one LineCollection: drawing a solution only changes the colors of the triangles and the conflict segments of the
+        cached figure. The figure is not registered in pyplot, so drawing many solutions never accumulates open figures.
+    """
+
+    def __init__(self, board_size, color_dict):
+        """
+        :param board_size: number of positions on a side of the board
+        :param color_dict: name of the color of each color index (see build_color_dict)
+        """
+        self.board_size = board_size
+        n = board_size
+        size = n + 2 # the board is surrounded by a gray frame
+
+        # RGBA of each color index, the colors missing from `color_dict` are taken from a qualitative colormap
+        nbColors = max(max(color_dict) + 1, WHITE + 1)
+        fallback = colormaps['tab20']
+        self.rgba = np.array([to_rgba(color_dict[c]) if c in color_dict else fallback(c % 20) for c in range(nbColors)])
+
+        self.figure = Figure()
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_xlim(0, size)
+        self.ax.set_ylim(0, size)
+
+        # Gray frame: one square per position around the board
+        frame = [(i, j) for j in range(size) for i in range(size) if i in (0, size - 1) or j in (0, size - 1)]
+        squares = [[(i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)] for i, j in frame]
+        self.ax.add_collection(PolyCollection(squares, facecolors=color_dict[GRAY], edgecolors=color_dict[BLACK]))
+
+        # 4 triangles per position k (i = k % n + 1, j = k // n + 1), in the side order NORTH, SOUTH, WEST, EAST,
+        # so the facecolors are the colors of the solution in the same order
+        k = np.arange(n * n)
+        i = (k % n + 1)[:, None].astype(float)
+        j = (k // n + 1)[:, None].astype(float)
+        leftBot = np.stack([i, j], axis=-1)
+        rightBot = np.stack([i + 1, j], axis=-1)
+        rightTop = np.stack([i + 1, j + 1], axis=-1)
+        leftTop = np.stack([i, j + 1], axis=-1)
+        middle = np.stack([i + 0.5, j + 0.5], axis=-1)
+        triangles = np.empty((n * n, 4, 3, 2))
+        triangles[:, NORTH] = np.concatenate([rightTop, middle, leftTop], axis=1)
+        triangles[:, SOUTH] = np.concatenate([leftBot, middle, rightBot], axis=1)
+        triangles[:, WEST] = np.concatenate([leftBot, middle, leftTop], axis=1)
+        triangles[:, EAST] = np.concatenate([rightTop, middle, rightBot], axis=1)
+        self.triangles = PolyCollection(triangles.reshape(-1, 3, 2), edgecolors=color_dict[BLACK])
+        self.ax.add_collection(self.triangles)
+
+        self.conflicts = LineCollection([], colors=color_dict[RED], linewidths=3)
+        self.ax.add_collection(self.conflicts)
+
+    def update(self, solution):
+        """
+        Draw `solution` on the cached figure
+        :param solution: list of the pieces (rotations applied), completed with white pieces if it is partial
+            (the non-assigned positions (-1, -1, -1, -1) are white too)
+        """
+        n = self.board_size
+        colors = np.full((n * n, 4), WHITE)
+        if len(solution) > 0:
+            colors[:len(solution)] = np.array(solution, dtype=int).reshape(-1, 4)
+        colors[colors < 0] = WHITE
+        self.triangles.set_facecolor(self.rgba[colors.reshape(-1)])
+
+        # Conflicts: grid[j, i, side] with j the row (from the south) and i the column (from the west)
+        grid = colors.reshape(n, n, 4)
+        segments = []
+        nbInternalConflicts = 0
+
+        # Vertical edges (x, y) -> (x, y + 1): between 2 columns, on the west border and on the east border
+        for conflicts, offset in ((grid[:, 1:, WEST] != grid[:, :-1, EAST], 2), (grid[:, :1, WEST] != GRAY, 1),
+                                  (grid[:, -1:, EAST] != GRAY, n + 1)):
+            rows, columns = np.nonzero(conflicts)
+            x = columns + offset
+            y = rows + 1
+            segments.append(np.stack([np.stack([x, y], axis=-1), np.stack([x, y + 1], axis=-1)], axis=1))
+        nbInternalConflicts += len(segments[0])
+
+        # Horizontal edges (x, y) -> (x + 1, y): between 2 rows, on the south border and on the north border
+        for conflicts, offset in ((grid[1:, :, SOUTH] != grid[:-1, :, NORTH], 2), (grid[:1, :, SOUTH] != GRAY, 1),
+                                  (grid[-1:, :, NORTH] != GRAY, n + 1)):
+            rows, columns = np.nonzero(conflicts)
+            x = columns + 1
+            y = rows + offset
+            segments.append(np.stack([np.stack([x, y], axis=-1), np.stack([x + 1, y], axis=-1)], axis=1))
+        nbInternalConflicts += len(segments[3])
+
+        segments = np.concatenate(segments).astype(float)
+        self.conflicts.set_segments(segments)
+        nbConflicts = len(segments)
+
+        nbInternalConnections = 2 * n * (n - 1)
+        nbConnections = nbInternalConnections + 4 * n
+        self.ax.set_title('Eternity of size %d X %d\n'
+                          'Total connections: %d    Internal connections: %d\n'
+                          'Total Valid connections: %d     Internal valid internal connections: %d\n'
+                          'Total Invalid connections: %d    Internal invalid connections: %d' %
+                          (n, n, nbConnections, nbInternalConnections, nbConnections - nbConflicts,
+                           nbInternalConnections - nbInternalConflicts, nbConflicts, nbInternalConflicts))
+
+    def save(self, solution, output_file):
+        """
+        Draw `solution` and save the figure in `output_file`
+        """
+        self.update(solution)
+        self.figure.savefig(output_file)
+
+
+def get_renderer(eternity_puzzle):
+    """
+    :return: the cached renderer of the board size of `eternity_puzzle` (built on the first call)
+    """
+    if eternity_puzzle.board_size not in renderers:
+        renderers[eternity_puzzle.board_size] = Renderer(eternity_puzzle.board_size, eternity_puzzle.build_color_dict())
+    return renderers[eternity_puzzle.board_size]
+
+
+def clear_renderers():
+    """
+    Release the cached figures
+    """
+    renderers.clear()
+
+
+def display_solution(eternity_puzzle, solution, output_file):
+    """
+    Draw `solution` (conflicts in red) and save the figure in `output_file`. This module is only imported when a solution
+        is drawn, so a solve without visualization never loads matplotlib.
+    :param eternity_puzzle: object describing the input
+    :param solution: list of the pieces (rotations applied), completed with white pieces if it is partial
+    :param output_file: image file
+    """
+    get_renderer(eternity_puzzle).save(solution, output_file)
+
+
+def save_snapshots(eternity_puzzle, solutions, output_pattern):
+    """
+    Draw a sequence of solutions (e.g. the best solutions of a search) in one image file each
+    :param eternity_puzzle: object describing the input
+    :param solutions: iterable of solutions
+    :param output_pattern: name of the image files with the index of the snapshot, e.g. 'snapshot_%04d.png'
+    :return: number of snapshots saved
+    """
+    renderer = get_renderer(eternity_puzzle)
+    nbSnapshots = 0
+    for index, solution in enumerate(solutions):
+        renderer.save(solution, output_pattern % index)
+        nbSnapshots += 1
+    return nbSnapshots
+
+
+def save_animation(eternity_puzzle, solutions, output_file, fps=5):
+    """
+    Draw a sequence of solutions as an animated GIF, each solution is one frame (the frames are written one at a time,
+        the sequence can be a generator)
+    :param eternity_puzzle: object describing the input
+    :param solutions: iterable of solutions
+    :param output_file: GIF file
+    :param fps: number of frames per second
+    :return: number of frames saved
+    """
+    renderer = get_renderer(eternity_puzzle)
+    writer = PillowWriter(fps=fps)
+    nbFrames = 0
+    with writer.saving(renderer.figure, output_file, renderer.figure.dpi):
+        for solution in solutions:
+            renderer.update(solution)
+            writer.grab_frame()
+            nbFrames += 1
+    return nbFrames
@@ -0,0 +1,90 @@
+# Myriam KIRIAKOS 1888929
+# Marco NOVAES 2166579
+
+import collections
+import random
+
+
+class ZobristTable:
+    """
+    Zobrist hashing of the boards: a random 64 bits key for each (position, side, color), the hash of a board is the XOR
+        of the keys of its placed pieces. A rotated piece is given by its 4 colors, so the key of a placement
+        (position, piece, rotation) is the XOR of the keys of its 4 sides (2 identical pieces get the same key, their
+        boards have the same score). Placing or removing a piece XORs its key, so the hash follows the changes of a board
+        in O(1) per piece.
+    """
+
+    def __init__(self, eternity_puzzle, seed=0):
+        """
+        :param eternity_puzzle: object describing the input
+        :param seed: seed of the random keys (the keys do not depend on the seed of the search)
+        """
+        generator = random.Random(seed)
+        # keys[k][side][color]
+        self.keys = [[[generator.getrandbits(64) for _ in range(eternity_puzzle.n_color)] for _ in range(4)]
+                     for _ in range(eternity_puzzle.n_piece)]
+
+    def placement(self, k, piece):
+        """
+        :param k: position
+        :param piece: rotated piece placed at `k`, (-1, -1, -1, -1) for an unassigned position
+        :return: key of the placement, to XOR with the hash of the board to place or remove the piece
+        """
+        if piece[0] == -1:
+            return 0
+        keys = self.keys[k]
+        return keys[0][piece[0]] ^ keys[1][piece[1]] ^ keys[2][piece[2]] ^ keys[3][piece[3]]
+
+    def hash_solution(self, solution):
+        """
+        :param solution: list of the pieces (rotations applied), unassigned positions allowed
+        :return: hash of the board
+        """
+        boardHash = 0
+        for k, piece in enumerate(solution):
+            boardHash ^= self.placement(k, piece)
+        return boardHash
+
+
+class ScoreCache:
+    """
+    Bounded cache board hash -> number of conflicts, the least recently used board is evicted first. Counts its hits and
+        misses, so the scorings saved by the cache can be checked (see hit_rate).
+    """
+
+    def __init__(self, capacity=100000):
+        """
+        :param capacity: maximum number of boards in the cache
+        """
+        self.capacity = capacity
+        self.scores = collections.OrderedDict()
+        self.nbHits = 0
+        self.nbMisses = 0
+
+    def get(self, boardHash):
+        """
+        :return: number of conflicts of the board `boardHash`, None if it is not in the cache
+        """
+        score = self.scores.get(boardHash)
+        if score is None:
+            self.nbMisses += 1
+            return None
+        self.nbHits += 1
+        self.scores.move_to_end(boardHash)
+        return score
+
+    def put(self, boardHash, score):
+        """
+        Record the number of conflicts `score` of the board `boardHash`
+        """
+        self.scores[boardHash] = score
+        self.scores.move_to_end(boardHash)
+        if len(self.scores) > self.capacity:
+            self.scores.popitem(last=False)
+
+    def hit_rate(self):
+        """
+        :return: proportion of the lookups found in the cache (0 if there was no lookup)
+        """
+        nbLookups = self.nbHits + self.nbMisses
+        return self.nbHits / nbLookups if nbLookups else 0.